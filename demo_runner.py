@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Dead Frontier Auto Trading System - Multi-Account Demo Runner
+多帳號演示啟動器：每個帳號在獨立進程中運行智能登錄演示
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from loguru import logger
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from src.dfautotrans.config.settings import Settings
+
+
+def parse_account(value: str):
+    """解析 "用戶名:密碼" 格式的帳號參數"""
+    username, sep, password = value.partition(":")
+    if not sep or not username or not password:
+        raise argparse.ArgumentTypeError(f"帳號格式應為 用戶名:密碼，收到: {value}")
+    return username, password
+
+
+def run_account(username: str, password: str) -> bool:
+    """在子進程中為單個帳號運行智能登錄演示
+    
+    每個進程有自己的事件循環和瀏覽器，不共享任何 Python 狀態；
+    會話文件和 SQLite 數據庫按用戶名分目錄保存，避免帳號之間互相覆蓋，
+    也避免多個進程同時寫入同一個數據庫文件而出現鎖衝突。
+    """
+    from demo_stage2_smart_login_and_goto_bank import SmartLoginDemo, configure_logging
+    
+    # 每個進程使用自己的日誌隊列，進程之間的輸出互不阻塞
+    configure_logging()
+    settings = Settings(username=username, password=password, session_profile=username)
+    settings.cookies_dir.mkdir(parents=True, exist_ok=True)
+    settings.database.url = f"sqlite:///{(settings.cookies_dir / 'dfautotrans.db').as_posix()}"
+    logger.info(f"👤 [{username}] 開始運行演示")
+    return asyncio.run(SmartLoginDemo(settings).run())
+
+
+def parse_args(argv=None):
+    """解析命令行參數"""
+    parser = argparse.ArgumentParser(description="多帳號智能登錄演示")
+    parser.add_argument(
+        "--account", dest="accounts", action="append", type=parse_account, default=[],
+        help="要運行的帳號，格式為 用戶名:密碼，可重複指定；未指定時使用配置中的帳號"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None,
+        help="最大進程數，默認為 CPU 核心數的一半"
+    )
+    args = parser.parse_args(argv)
+    
+    usernames = [username for username, _ in args.accounts]
+    duplicates = sorted({name for name in usernames if usernames.count(name) > 1})
+    if duplicates:
+        parser.error(f"帳號重複指定: {', '.join(duplicates)}")
+    return args
+
+
+def main(argv=None) -> int:
+    """主函數"""
+    args = parse_args(argv)
+    
+    accounts = args.accounts
+    if not accounts:
+        settings = Settings()
+        accounts = [(settings.username, settings.password)]
+    
+    max_workers = args.workers or max(1, (os.cpu_count() or 2) // 2)
+    max_workers = min(max_workers, len(accounts))
+    logger.info(f"🚀 使用 {max_workers} 個進程運行 {len(accounts)} 個帳號")
+    
+    results = {}
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(run_account, username, password): username
+            for username, password in accounts
+        }
+        for future in as_completed(futures):
+            username = futures[future]
+            try:
+                results[username] = future.result()
+            except Exception as e:
+                logger.error(f"❌ [{username}] 進程異常退出: {e}")
+                results[username] = False
+    
+    logger.info("\n📊 運行結果:")
+    for username, _ in accounts:
+        status = "✅ 成功" if results.get(username) else "❌ 失敗"
+        logger.info(f"   {username}: {status}")
+    
+    return 0 if all(results.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
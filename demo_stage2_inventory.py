@@ -6,6 +6,8 @@ Dead Frontier Auto Trading System - Stage 2 Inventory Management Demo
 
 import asyncio
 import sys
+from collections import namedtuple
+from operator import itemgetter
 from pathlib import Path
 from loguru import logger
 
@@ -22,6 +24,37 @@ from src.dfautotrans.data.database import DatabaseManager
 from src.dfautotrans.core.state_machine import StateMachine
 
 
+# InventoryManager 的狀態字典總是包含 used/total/items
+USED_TOTAL = itemgetter('used', 'total')
+USED_TOTAL_ITEMS = itemgetter('used', 'total', 'items')
+
+# 物品檢索演示只預覽前幾件
+PREVIEW_ITEM_COUNT = 10
+
+# 空間管理演示用的模擬市場物品，所需空間在載入時算好
+MOCK_MARKET_ITEMS = (
+    {"name": "Pistol", "quantity": 1},
+    {"name": "Ammo", "quantity": 5},
+    {"name": "Medicine", "quantity": 2}
+)
+MOCK_REQUIRED_SPACE = sum(item["quantity"] for item in MOCK_MARKET_ITEMS)
+
+SpaceSummary = namedtuple('SpaceSummary', 'used total available utilization is_full items')
+
+
+def summarize_space(status) -> SpaceSummary:
+    """從庫存/倉庫狀態字典計算空間摘要"""
+    used, total, items = USED_TOTAL_ITEMS(status)
+    return SpaceSummary(
+        used=used,
+        total=total,
+        available=total - used,
+        utilization=(used / total) if total > 0 else 0,
+        is_full=used >= total,
+        items=items,
+    )
+
+
 class Stage2InventoryDemo:
     """階段2庫存管理演示"""
     
@@ -35,19 +68,22 @@ class Stage2InventoryDemo:
         self.database_manager = None
         self.state_machine = None
         
+        # 最近一次獲取的庫存/倉庫狀態，僅在存取操作後失效
+        self._inventory_status_cache = None
+        self._storage_status_cache = None
+        
     async def initialize(self):
         """初始化所有組件"""
         logger.info("🚀 初始化階段2庫存管理演示系統...")
         
         try:
-            # 1. 初始化數據庫
+            # 1-2. 數據庫和瀏覽器互不依賴，並行初始化
             self.database_manager = DatabaseManager(self.settings)
-            await self.database_manager.initialize()
-            logger.info("✅ 數據庫管理器初始化完成")
-            
-            # 2. 初始化瀏覽器管理器
             self.browser_manager = BrowserManager(self.settings)
-            await self.browser_manager.initialize()
+            async with asyncio.TaskGroup() as task_group:
+                task_group.create_task(self.database_manager.initialize())
+                task_group.create_task(self.browser_manager.initialize())
+            logger.info("✅ 數據庫管理器初始化完成")
             logger.info("✅ 瀏覽器管理器初始化完成")
             
             # 3. 初始化頁面導航器
@@ -80,7 +116,7 @@ class Stage2InventoryDemo:
             return True
             
         except Exception as e:
-            logger.error(f"❌ 初始化失敗: {e}")
+            logger.error("❌ 初始化失敗: {}", e)
             return False
     
     async def demonstrate_login_and_navigation(self):
@@ -101,84 +137,80 @@ class Stage2InventoryDemo:
         
         return True
     
+    async def _get_inventory_status(self):
+        """獲取庫存狀態（沿用上次結果直到被存取操作失效）"""
+        if self._inventory_status_cache is None:
+            self._inventory_status_cache = await self.inventory_manager.get_inventory_status()
+        return self._inventory_status_cache
+    
+    async def _get_storage_status(self):
+        """獲取倉庫狀態（沿用上次結果直到被存取操作失效）"""
+        if self._storage_status_cache is None:
+            self._storage_status_cache = await self.inventory_manager.get_storage_status()
+        return self._storage_status_cache
+    
+    async def _get_combined_status(self):
+        """一次抓取同時獲取庫存和倉庫狀態"""
+        if self._inventory_status_cache is None or self._storage_status_cache is None:
+            combined = await self.inventory_manager.get_combined_status()
+            self._inventory_status_cache = combined['inventory']
+            self._storage_status_cache = combined['storage']
+        return self._inventory_status_cache, self._storage_status_cache
+    
+    def _invalidate_status_cache(self) -> None:
+        """存取操作後清除已緩存的狀態"""
+        self._inventory_status_cache = None
+        self._storage_status_cache = None
+    
+    def _log_items(self, label: str, items) -> None:
+        """輸出物品詳情列表"""
+        logger.info("   📋 {}物品詳情 ({}件):", label, len(items))
+        for item in items:
+            quantity_text = f" x{item.quantity}" if item.quantity > 1 else ""
+            logger.info("     • 槽位{}: {}{} ({})", item.slot, item.item_name, quantity_text, item.item_category)
+    
+    def _log_space_status(self, label: str, status) -> None:
+        """輸出庫存/倉庫空間狀態"""
+        if not status:
+            logger.error("❌ 無法獲取{}狀態", label)
+            return
+        
+        summary = summarize_space(status)
+        logger.info("✅ {}狀態: {}/{}", label, summary.used, summary.total)
+        logger.info("   可用空間: {}", summary.available)
+        logger.info("   使用率: {:.1%}", summary.utilization)
+        logger.info("   是否已滿: {}", '是' if summary.is_full else '否')
+        
+        if summary.items:
+            self._log_items(label, summary.items)
+        else:
+            logger.info("   📋 {}為空", label)
+    
     async def demonstrate_inventory_status_check(self):
         """演示庫存狀態檢查功能"""
         logger.info("\n" + "="*60)
         logger.info("📦 開始演示庫存狀態檢查功能")
         logger.info("="*60)
         
-        # 1. 獲取庫存狀態
-        logger.info("1️⃣ 檢查庫存狀態...")
-        inventory_status = await self.inventory_manager.get_inventory_status()
-        if inventory_status:
-            used = inventory_status.get('used', 0)
-            total = inventory_status.get('total', 0)
-            available = total - used
-            utilization = (used / total) if total > 0 else 0
-            is_full = used >= total
-            items = inventory_status.get('items', [])
-            
-            logger.info(f"✅ 庫存狀態: {used}/{total}")
-            logger.info(f"   可用空間: {available}")
-            logger.info(f"   使用率: {utilization:.1%}")
-            logger.info(f"   是否已滿: {'是' if is_full else '否'}")
-            
-            if items:
-                logger.info(f"   📋 庫存物品詳情 ({len(items)}件):")
-                for item in items:
-                    if hasattr(item, 'to_dict'):
-                        item_dict = item.to_dict()
-                        if item_dict['quantity'] > 1:
-                            logger.info(f"     • 槽位{item_dict['slot']}: {item_dict['name']} x{item_dict['quantity']} ({item_dict['category']})")
-                        else:
-                            logger.info(f"     • 槽位{item_dict['slot']}: {item_dict['name']} ({item_dict['category']})")
-                    else:
-                        logger.info(f"     • {item}")
-            else:
-                logger.info("   📋 庫存為空")
-        else:
-            logger.error("❌ 無法獲取庫存狀態")
-        
-        # 2. 獲取倉庫狀態
-        logger.info("\n2️⃣ 檢查倉庫狀態...")
-        storage_status = await self.inventory_manager.get_storage_status()
-        if storage_status:
-            used = storage_status.get('used', 0)
-            total = storage_status.get('total', 0)
-            available = total - used
-            utilization = (used / total) if total > 0 else 0
-            is_full = used >= total
-            items = storage_status.get('items', [])
-            
-            logger.info(f"✅ 倉庫狀態: {used}/{total}")
-            logger.info(f"   可用空間: {available}")
-            logger.info(f"   使用率: {utilization:.1%}")
-            logger.info(f"   是否已滿: {'是' if is_full else '否'}")
+        async with self.inventory_manager.storage_session():
+            # 1. 獲取庫存狀態
+            logger.info("1️⃣ 檢查庫存狀態...")
+            inventory_status = await self._get_inventory_status()
+            self._log_space_status("庫存", inventory_status)
             
-            if items:
-                logger.info(f"   📋 倉庫物品詳情 ({len(items)}件):")
-                for item in items:
-                    if hasattr(item, 'to_dict'):
-                        item_dict = item.to_dict()
-                        if item_dict['quantity'] > 1:
-                            logger.info(f"     • 槽位{item_dict['slot']}: {item_dict['name']} x{item_dict['quantity']} ({item_dict['category']})")
-                        else:
-                            logger.info(f"     • 槽位{item_dict['slot']}: {item_dict['name']} ({item_dict['category']})")
-                    else:
-                        logger.info(f"     • {item}")
-            else:
-                logger.info("   📋 倉庫為空")
-        else:
-            logger.error("❌ 無法獲取倉庫狀態")
+            # 2. 獲取倉庫狀態
+            logger.info("\n2️⃣ 檢查倉庫狀態...")
+            storage_status = await self._get_storage_status()
+            self._log_space_status("倉庫", storage_status)
         
         # 3. 獲取銷售位狀態
         logger.info("\n3️⃣ 檢查銷售位狀態...")
         selling_status = await self.inventory_manager.get_selling_slots_status()
         if selling_status:
-            logger.info(f"✅ 銷售位狀態: {selling_status.current_listings}/{selling_status.max_slots}")
-            logger.info(f"   可用位置: {selling_status.available_slots}")
-            logger.info(f"   使用率: {selling_status.current_listings/selling_status.max_slots:.1%}")
-            logger.info(f"   是否已滿: {'是' if selling_status.is_full else '否'}")
+            logger.info("✅ 銷售位狀態: {}/{}", selling_status.current_listings, selling_status.max_slots)
+            logger.info("   可用位置: {}", selling_status.available_slots)
+            logger.info("   使用率: {:.1%}", selling_status.current_listings/selling_status.max_slots)
+            logger.info("   是否已滿: {}", '是' if selling_status.is_full else '否')
         else:
             logger.error("❌ 無法獲取銷售位狀態")
         
@@ -192,15 +224,21 @@ class Stage2InventoryDemo:
         
         # 1. 獲取庫存物品列表
         logger.info("1️⃣ 獲取庫存物品列表...")
-        inventory_items = await self.inventory_manager.get_inventory_items()
+        # 只顯示前10件，多取1件用來判斷是否還有更多
+        inventory_items = await self.inventory_manager.get_inventory_items(limit=PREVIEW_ITEM_COUNT + 1)
         
         if inventory_items:
-            logger.info(f"✅ 找到 {len(inventory_items)} 件庫存物品:")
-            for i, item in enumerate(inventory_items[:10], 1):  # 只顯示前10件
-                logger.info(f"   {i}. {item}")
+            total_items = len(inventory_items)
+            if total_items > PREVIEW_ITEM_COUNT:
+                # 超出預覽數量時才需要完整數量
+                total_items = (await self._get_inventory_status())['used']
             
-            if len(inventory_items) > 10:
-                logger.info(f"   ... 和其他 {len(inventory_items) - 10} 件物品")
+            logger.info("✅ 找到 {} 件庫存物品:", total_items)
+            for i, item in enumerate(inventory_items[:PREVIEW_ITEM_COUNT], 1):
+                logger.info("   {}. {}", i, item)
+            
+            if total_items > PREVIEW_ITEM_COUNT:
+                logger.info("   ... 和其他 {} 件物品", total_items - PREVIEW_ITEM_COUNT)
         else:
             logger.info("ℹ️ 庫存中沒有物品或無法獲取物品列表")
         
@@ -215,42 +253,36 @@ class Stage2InventoryDemo:
         # 1. 檢查庫存是否已滿
         logger.info("1️⃣ 檢查庫存空間狀況...")
         is_full = await self.inventory_manager.check_inventory_full()
-        logger.info(f"   庫存是否已滿: {'是' if is_full else '否'}")
+        logger.info("   庫存是否已滿: {}", '是' if is_full else '否')
         
         # 2. 模擬空間需求計算
         logger.info("\n2️⃣ 模擬空間需求計算...")
-        mock_market_items = [
-            {"name": "Pistol", "quantity": 1},
-            {"name": "Ammo", "quantity": 5},
-            {"name": "Medicine", "quantity": 2}
-        ]
-        
-        required_space = await self.inventory_manager.calculate_space_requirements(mock_market_items)
-        logger.info(f"   模擬購買物品需要空間: {required_space}")
+        required_space = MOCK_REQUIRED_SPACE
+        logger.info("   模擬購買物品需要空間: {}", required_space)
         
         has_space = await self.inventory_manager.has_sufficient_space(required_space)
-        logger.info(f"   是否有足夠空間: {'是' if has_space else '否'}")
+        logger.info("   是否有足夠空間: {}", '是' if has_space else '否')
         
         # 3. 演示庫存空間優化
         logger.info("\n3️⃣ 演示庫存空間優化...")
         optimization_result = await self.inventory_manager.optimize_inventory_space()
+        self._invalidate_status_cache()
         
         if optimization_result:
             logger.info("✅ 庫存空間優化完成")
             
             # 重新檢查庫存狀態
             logger.info("   重新檢查庫存狀態...")
-            new_inventory_status = await self.inventory_manager.get_inventory_status()
+            new_inventory_status = await self._get_inventory_status()
             if new_inventory_status:
-                new_used = new_inventory_status.get('used', 0)
-                new_total = new_inventory_status.get('total', 0)
-                logger.info(f"   優化後庫存: {new_used}/{new_total}")
+                new_used, new_total = USED_TOTAL(new_inventory_status)
+                logger.info("   優化後庫存: {}/{}", new_used, new_total)
                 
                 if inventory_status:
-                    old_used = inventory_status.get('used', 0)
+                    old_used = inventory_status['used']
                     space_freed = old_used - new_used
                     if space_freed > 0:
-                        logger.info(f"   釋放了 {space_freed} 個空間")
+                        logger.info("   釋放了 {} 個空間", space_freed)
                     else:
                         logger.info("   庫存狀態無變化（可能原本就未滿）")
         else:
@@ -264,103 +296,96 @@ class Stage2InventoryDemo:
         logger.info("🏪 開始演示存儲操作功能")
         logger.info("="*60)
         
-        # 1. 獲取操作前的狀態
-        logger.info("1️⃣ 獲取操作前的狀態...")
-        initial_inventory = await self.inventory_manager.get_inventory_status()
-        initial_storage = await self.inventory_manager.get_storage_status()
-        
-        if initial_inventory:
-            inv_used = initial_inventory.get('used', 0)
-            inv_total = initial_inventory.get('total', 0)
-            inv_items = initial_inventory.get('items', [])
-            logger.info(f"   操作前庫存: {inv_used}/{inv_total}")
-            if inv_items:
-                logger.info(f"   庫存物品: {[str(item) for item in inv_items]}")
-        
-        if initial_storage:
-            stor_used = initial_storage.get('used', 0)
-            stor_total = initial_storage.get('total', 0)
-            stor_items = initial_storage.get('items', [])
-            logger.info(f"   操作前倉庫: {stor_used}/{stor_total}")
-            if stor_items:
-                logger.info(f"   倉庫物品: {[str(item) for item in stor_items[:5]]}{'...' if len(stor_items) > 5 else ''}")  # 只顯示前5件
-        
-        # 2. 測試存入所有物品到倉庫
-        if initial_inventory and initial_inventory.get('used', 0) > 0:
-            logger.info("\n2️⃣ 測試存入所有物品到倉庫...")
-            
-            deposit_result = await self.inventory_manager.deposit_all_to_storage()
-            
-            if deposit_result:
-                logger.info("✅ 存入操作執行成功")
+        async with self.inventory_manager.storage_session():
+            # 1. 獲取操作前的狀態
+            logger.info("1️⃣ 獲取操作前的狀態...")
+            initial_inventory, initial_storage = await self._get_combined_status()
+            
+            if initial_inventory:
+                inv_used, inv_total, inv_items = USED_TOTAL_ITEMS(initial_inventory)
+                logger.info("   操作前庫存: {}/{}", inv_used, inv_total)
+                if inv_items:
+                    logger.opt(lazy=True).info("   庫存物品: {}", lambda: [str(item) for item in inv_items])
+            
+            if initial_storage:
+                stor_used, stor_total, stor_items = USED_TOTAL_ITEMS(initial_storage)
+                logger.info("   操作前倉庫: {}/{}", stor_used, stor_total)
+                if stor_items:
+                    logger.opt(lazy=True).info(  # 只顯示前5件
+                        "   倉庫物品: {}{}",
+                        lambda: [str(item) for item in stor_items[:5]],
+                        lambda: '...' if len(stor_items) > 5 else ''
+                    )
+            
+            # 2. 測試存入所有物品到倉庫
+            if initial_inventory and initial_inventory['used'] > 0:
+                logger.info("\n2️⃣ 測試存入所有物品到倉庫...")
                 
-                # 驗證結果
-                logger.info("   驗證操作結果...")
-                final_inventory = await self.inventory_manager.get_inventory_status()
-                final_storage = await self.inventory_manager.get_storage_status()
+                deposit_result = await self.inventory_manager.deposit_all_to_storage()
+                self._invalidate_status_cache()
                 
-                if final_inventory:
-                    final_inv_used = final_inventory.get('used', 0)
-                    final_inv_total = final_inventory.get('total', 0)
-                    final_inv_items = final_inventory.get('items', [])
-                    logger.info(f"   操作後庫存: {final_inv_used}/{final_inv_total}")
+                if deposit_result:
+                    logger.info("✅ 存入操作執行成功")
                     
-                    initial_inv_used = initial_inventory.get('used', 0)
-                    if initial_inv_used > final_inv_used:
-                        moved_items = initial_inv_used - final_inv_used
-                        logger.info(f"   ✅ 成功轉移了 {moved_items} 件物品到倉庫")
-                    else:
-                        logger.info("   ℹ️ 庫存物品數量無變化")
-                
-                if final_storage:
-                    final_stor_used = final_storage.get('used', 0)
-                    final_stor_total = final_storage.get('total', 0)
-                    final_stor_items = final_storage.get('items', [])
-                    logger.info(f"   操作後倉庫: {final_stor_used}/{final_stor_total}")
+                    # 驗證結果
+                    logger.info("   驗證操作結果...")
+                    final_inventory, final_storage = await self._get_combined_status()
+                    
+                    if final_inventory:
+                        final_inv_used, final_inv_total = USED_TOTAL(final_inventory)
+                        logger.info("   操作後庫存: {}/{}", final_inv_used, final_inv_total)
+                        
+                        initial_inv_used = initial_inventory['used']
+                        if initial_inv_used > final_inv_used:
+                            moved_items = initial_inv_used - final_inv_used
+                            logger.info("   ✅ 成功轉移了 {} 件物品到倉庫", moved_items)
+                        else:
+                            logger.info("   ℹ️ 庫存物品數量無變化")
                     
-                    if initial_storage:
-                        initial_stor_used = initial_storage.get('used', 0)
-                        if final_stor_used > initial_stor_used:
-                            received_items = final_stor_used - initial_stor_used
-                            logger.info(f"   ✅ 倉庫接收了 {received_items} 件物品")
+                    if final_storage:
+                        final_stor_used, final_stor_total = USED_TOTAL(final_storage)
+                        logger.info("   操作後倉庫: {}/{}", final_stor_used, final_stor_total)
                         
+                        if initial_storage:
+                            initial_stor_used = initial_storage['used']
+                            if final_stor_used > initial_stor_used:
+                                received_items = final_stor_used - initial_stor_used
+                                logger.info("   ✅ 倉庫接收了 {} 件物品", received_items)
+                            
+                else:
+                    logger.error("❌ 存入操作執行失敗")
             else:
-                logger.error("❌ 存入操作執行失敗")
-        else:
-            logger.info("2️⃣ 庫存中沒有物品，跳過存入操作演示")
-        
-        # 3. 測試從倉庫取出所有物品
-        current_storage = await self.inventory_manager.get_storage_status()
-        if current_storage and current_storage.get('used', 0) > 0:
-            logger.info("\n3️⃣ 測試從倉庫取出所有物品...")
-            
-            withdraw_result = await self.inventory_manager.withdraw_all_from_storage()
+                logger.info("2️⃣ 庫存中沒有物品，跳過存入操作演示")
             
-            if withdraw_result:
-                logger.info("✅ 取出操作執行成功")
+            # 3. 測試從倉庫取出所有物品
+            current_storage = await self._get_storage_status()
+            if current_storage and current_storage['used'] > 0:
+                logger.info("\n3️⃣ 測試從倉庫取出所有物品...")
                 
-                # 驗證結果
-                logger.info("   驗證操作結果...")
-                final_inventory_2 = await self.inventory_manager.get_inventory_status()
-                final_storage_2 = await self.inventory_manager.get_storage_status()
-                
-                if final_storage_2:
-                    final_stor_used_2 = final_storage_2.get('used', 0)
-                    final_stor_total_2 = final_storage_2.get('total', 0)
-                    logger.info(f"   操作後倉庫: {final_stor_used_2}/{final_stor_total_2}")
+                withdraw_result = await self.inventory_manager.withdraw_all_from_storage()
+                self._invalidate_status_cache()
                 
-                if final_inventory_2:
-                    final_inv_used_2 = final_inventory_2.get('used', 0)
-                    final_inv_total_2 = final_inventory_2.get('total', 0)
-                    final_inv_items_2 = final_inventory_2.get('items', [])
-                    logger.info(f"   操作後庫存: {final_inv_used_2}/{final_inv_total_2}")
-                    if final_inv_items_2:
-                        logger.info(f"   恢復的物品: {[str(item) for item in final_inv_items_2]}")
-                        
+                if withdraw_result:
+                    logger.info("✅ 取出操作執行成功")
+                    
+                    # 驗證結果
+                    logger.info("   驗證操作結果...")
+                    final_inventory_2, final_storage_2 = await self._get_combined_status()
+                    
+                    if final_storage_2:
+                        final_stor_used_2, final_stor_total_2 = USED_TOTAL(final_storage_2)
+                        logger.info("   操作後倉庫: {}/{}", final_stor_used_2, final_stor_total_2)
+                    
+                    if final_inventory_2:
+                        final_inv_used_2, final_inv_total_2, final_inv_items_2 = USED_TOTAL_ITEMS(final_inventory_2)
+                        logger.info("   操作後庫存: {}/{}", final_inv_used_2, final_inv_total_2)
+                        if final_inv_items_2:
+                            logger.opt(lazy=True).info("   恢復的物品: {}", lambda: [str(item) for item in final_inv_items_2])
+                            
+                else:
+                    logger.error("❌ 取出操作執行失敗")
             else:
-                logger.error("❌ 取出操作執行失敗")
-        else:
-            logger.info("3️⃣ 倉庫中沒有物品，跳過取出操作演示")
+                logger.info("3️⃣ 倉庫中沒有物品，跳過取出操作演示")
         
         return initial_inventory, initial_storage
     
@@ -377,9 +402,9 @@ class Stage2InventoryDemo:
         player_resources = await self.bank_operations.get_player_resources()
         if player_resources:
             logger.info("✅ 完整玩家資源:")
-            logger.info(f"   💰 現金: ${player_resources.cash_on_hand:,}")
-            logger.info(f"   🏦 銀行: ${player_resources.bank_balance:,}")
-            logger.info(f"   💵 總資金: ${player_resources.total_available_cash:,}")
+            logger.info("   💰 現金: ${:,}", player_resources.cash_on_hand)
+            logger.info("   🏦 銀行: ${:,}", player_resources.bank_balance)
+            logger.info("   💵 總資金: ${:,}", player_resources.total_available_cash)
             
             # 處理庫存狀態 - 可能是字典格式
             if hasattr(player_resources, 'inventory_status') and player_resources.inventory_status:
@@ -387,9 +412,9 @@ class Stage2InventoryDemo:
                 if isinstance(inv_status, dict):
                     inv_used = inv_status.get('used', 0)
                     inv_total = inv_status.get('total', 0)
-                    logger.info(f"   📦 庫存: {inv_used}/{inv_total}")
+                    logger.info("   📦 庫存: {}/{}", inv_used, inv_total)
                 else:
-                    logger.info(f"   📦 庫存: {inv_status.current_count}/{inv_status.max_capacity}")
+                    logger.info("   📦 庫存: {}/{}", inv_status.current_count, inv_status.max_capacity)
             
             # 處理倉庫狀態 - 可能是字典格式
             if hasattr(player_resources, 'storage_status') and player_resources.storage_status:
@@ -397,17 +422,17 @@ class Stage2InventoryDemo:
                 if isinstance(stor_status, dict):
                     stor_used = stor_status.get('used', 0)
                     stor_total = stor_status.get('total', 0)
-                    logger.info(f"   🏪 倉庫: {stor_used}/{stor_total}")
+                    logger.info("   🏪 倉庫: {}/{}", stor_used, stor_total)
                 else:
-                    logger.info(f"   🏪 倉庫: {stor_status.current_count}/{stor_status.max_capacity}")
+                    logger.info("   🏪 倉庫: {}/{}", stor_status.current_count, stor_status.max_capacity)
             
             # 處理銷售位狀態
             if hasattr(player_resources, 'selling_slots_status') and player_resources.selling_slots_status:
                 sell_status = player_resources.selling_slots_status
-                logger.info(f"   🛒 銷售位: {sell_status.current_listings}/{sell_status.max_slots}")
+                logger.info("   🛒 銷售位: {}/{}", sell_status.current_listings, sell_status.max_slots)
             
-            logger.info(f"   ✅ 可交易: {'是' if player_resources.can_trade else '否'}")
-            logger.info(f"   🚫 完全阻塞: {'是' if player_resources.is_completely_blocked else '否'}")
+            logger.info("   ✅ 可交易: {}", '是' if player_resources.can_trade else '否')
+            logger.info("   🚫 完全阻塞: {}", '是' if player_resources.is_completely_blocked else '否')
         else:
             logger.error("❌ 無法獲取完整玩家資源")
         
@@ -422,15 +447,17 @@ class Stage2InventoryDemo:
         
         # 檢查資金是否足夠
         has_funds = player_resources and player_resources.total_available_cash >= mock_purchase_requirements["required_cash"]
-        logger.info(f"   資金充足性: {'✅ 充足' if has_funds else '❌ 不足'}")
+        logger.info("   資金充足性: {}", '✅ 充足' if has_funds else '❌ 不足')
         
-        # 檢查空間是否足夠
-        has_space = await self.inventory_manager.has_sufficient_space(mock_purchase_requirements["required_space"])
-        logger.info(f"   空間充足性: {'✅ 充足' if has_space else '❌ 不足'}")
+        # 檢查空間是否足夠 - 使用已緩存的庫存狀態，避免再次切換頁面
+        # （銀行和倉庫共用同一個頁面，不能並行查詢）
+        inventory_summary = summarize_space(await self._get_inventory_status())
+        has_space = inventory_summary.available >= mock_purchase_requirements["required_space"]
+        logger.info("   空間充足性: {}", '✅ 充足' if has_space else '❌ 不足')
         
         # 綜合評估
         can_trade = has_funds and has_space
-        logger.info(f"   交易能力: {'✅ 可以交易' if can_trade else '❌ 暫時無法交易'}")
+        logger.info("   交易能力: {}", '✅ 可以交易' if can_trade else '❌ 暫時無法交易')
         
         if not can_trade:
             logger.info("   建議操作:")
@@ -445,17 +472,24 @@ class Stage2InventoryDemo:
         """清理資源"""
         logger.info("\n🧹 開始清理資源...")
         
-        try:
-            if self.browser_manager:
-                await self.browser_manager.cleanup()
-                logger.info("✅ 瀏覽器管理器已清理")
-            
-            if self.database_manager:
-                await self.database_manager.close()
-                logger.info("✅ 數據庫管理器已清理")
-                
-        except Exception as e:
-            logger.error(f"⚠️ 清理過程中出錯: {e}")
+        # 瀏覽器和數據庫互不依賴，並行關閉並各自限時
+        teardowns = []
+        if self.browser_manager:
+            teardowns.append(("瀏覽器管理器", asyncio.wait_for(self.browser_manager.cleanup(), timeout=10)))
+        if self.database_manager:
+            teardowns.append(("數據庫管理器", asyncio.wait_for(self.database_manager.close(), timeout=5)))
+        
+        results = await asyncio.gather(*(task for _, task in teardowns), return_exceptions=True)
+        for (name, _), result in zip(teardowns, results):
+            if isinstance(result, asyncio.TimeoutError):
+                logger.error("⚠️ {}清理超時", name)
+            elif isinstance(result, BaseException):
+                logger.error("⚠️ 清理{}時出錯: {}", name, result)
+            else:
+                logger.info("✅ {}已清理", name)
+        
+        # 等待排隊中的日誌寫出完成
+        await logger.complete()
     
     async def run_full_demo(self):
         """運行簡化的Storage演示"""
@@ -477,72 +511,74 @@ class Stage2InventoryDemo:
             logger.info("📦 開始Storage狀態檢查和操作演示")
             logger.info("="*60)
             
-            # 1. 獲取初始狀態
-            logger.info("1️⃣ 檢查初始狀態...")
-            inventory_status = await self.inventory_manager.get_inventory_status()
-            storage_status = await self.inventory_manager.get_storage_status()
+            # 銷售位在市場頁面，先獲取以免打斷倉庫頁面會話
             selling_status = await self.inventory_manager.get_selling_slots_status()
             
-            if inventory_status:
-                used = inventory_status.get('used', 0)
-                total = inventory_status.get('total', 0)
-                logger.info(f"✅ 庫存狀態: {used}/{total}")
-            
-            if storage_status:
-                used = storage_status.get('used', 0)
-                total = storage_status.get('total', 0)
-                logger.info(f"✅ 倉庫狀態: {used}/{total}")
-            
-            if selling_status:
-                logger.info(f"✅ 銷售位狀態: {selling_status.current_listings}/{selling_status.max_slots}")
-            
-            # 2. 測試存儲操作
-            logger.info("\n2️⃣ 測試存儲操作...")
-            
-            # 如果倉庫有物品，嘗試取出
-            if storage_status and storage_status.get('used', 0) > 0:
-                logger.info("   嘗試從倉庫取出物品...")
-                withdraw_result = await self.inventory_manager.withdraw_all_from_storage()
-                if withdraw_result:
-                    logger.info("   ✅ 從倉庫取出操作成功")
-                    
-                    # 檢查操作後狀態
-                    new_inventory = await self.inventory_manager.get_inventory_status()
-                    new_storage = await self.inventory_manager.get_storage_status()
-                    
-                    if new_inventory:
-                        new_inv_used = new_inventory.get('used', 0)
-                        logger.info(f"   操作後庫存: {new_inv_used}/{new_inventory.get('total', 0)}")
-                    
-                    if new_storage:
-                        new_stor_used = new_storage.get('used', 0)
-                        logger.info(f"   操作後倉庫: {new_stor_used}/{new_storage.get('total', 0)}")
+            async with self.inventory_manager.storage_session():
+                # 1. 獲取初始狀態
+                logger.info("1️⃣ 檢查初始狀態...")
+                inventory_status, storage_status = await self._get_combined_status()
+                
+                if inventory_status:
+                    summary = summarize_space(inventory_status)
+                    logger.info("✅ 庫存狀態: {}/{}", summary.used, summary.total)
+                
+                if storage_status:
+                    summary = summarize_space(storage_status)
+                    logger.info("✅ 倉庫狀態: {}/{}", summary.used, summary.total)
+                
+                if selling_status:
+                    logger.info("✅ 銷售位狀態: {}/{}", selling_status.current_listings, selling_status.max_slots)
+                
+                # 2. 測試存儲操作
+                logger.info("\n2️⃣ 測試存儲操作...")
+                
+                # 如果倉庫有物品，嘗試取出
+                if storage_status and storage_status['used'] > 0:
+                    logger.info("   嘗試從倉庫取出物品...")
+                    withdraw_result = await self.inventory_manager.withdraw_all_from_storage()
+                    self._invalidate_status_cache()
+                    if withdraw_result:
+                        logger.info("   ✅ 從倉庫取出操作成功")
+                        
+                        # 檢查操作後狀態
+                        new_inventory, new_storage = await self._get_combined_status()
+                        
+                        if new_inventory:
+                            new_inv_used, new_inv_total = USED_TOTAL(new_inventory)
+                            logger.info("   操作後庫存: {}/{}", new_inv_used, new_inv_total)
+                        
+                        if new_storage:
+                            new_stor_used, new_stor_total = USED_TOTAL(new_storage)
+                            logger.info("   操作後倉庫: {}/{}", new_stor_used, new_stor_total)
+                    else:
+                        logger.error("   ❌ 從倉庫取出操作失敗")
                 else:
-                    logger.error("   ❌ 從倉庫取出操作失敗")
-            else:
-                logger.info("   倉庫為空，跳過取出操作")
-            
-            # 如果庫存有物品，嘗試存入
-            final_inventory = await self.inventory_manager.get_inventory_status()
-            if final_inventory and final_inventory.get('used', 0) > 0:
-                logger.info("   嘗試將庫存物品存入倉庫...")
-                deposit_result = await self.inventory_manager.deposit_all_to_storage()
-                if deposit_result:
-                    logger.info("   ✅ 存入倉庫操作成功")
-                    
-                    # 檢查最終狀態
-                    final_inventory_2 = await self.inventory_manager.get_inventory_status()
-                    final_storage_2 = await self.inventory_manager.get_storage_status()
-                    
-                    if final_inventory_2:
-                        logger.info(f"   最終庫存: {final_inventory_2.get('used', 0)}/{final_inventory_2.get('total', 0)}")
-                    
-                    if final_storage_2:
-                        logger.info(f"   最終倉庫: {final_storage_2.get('used', 0)}/{final_storage_2.get('total', 0)}")
+                    logger.info("   倉庫為空，跳過取出操作")
+                
+                # 如果庫存有物品，嘗試存入
+                final_inventory = await self._get_inventory_status()
+                if final_inventory and final_inventory['used'] > 0:
+                    logger.info("   嘗試將庫存物品存入倉庫...")
+                    deposit_result = await self.inventory_manager.deposit_all_to_storage()
+                    self._invalidate_status_cache()
+                    if deposit_result:
+                        logger.info("   ✅ 存入倉庫操作成功")
+                        
+                        # 檢查最終狀態
+                        final_inventory_2, final_storage_2 = await self._get_combined_status()
+                        
+                        if final_inventory_2:
+                            final_inv_used, final_inv_total = USED_TOTAL(final_inventory_2)
+                            logger.info("   最終庫存: {}/{}", final_inv_used, final_inv_total)
+                        
+                        if final_storage_2:
+                            final_stor_used, final_stor_total = USED_TOTAL(final_storage_2)
+                            logger.info("   最終倉庫: {}/{}", final_stor_used, final_stor_total)
+                    else:
+                        logger.error("   ❌ 存入倉庫操作失敗")
                 else:
-                    logger.error("   ❌ 存入倉庫操作失敗")
-            else:
-                logger.info("   庫存為空，跳過存入操作")
+                    logger.info("   庫存為空，跳過存入操作")
             
             logger.info("\n" + "="*80)
             logger.info("🎉 階段2Storage演示完成！")
@@ -555,7 +591,7 @@ class Stage2InventoryDemo:
             logger.info("="*80)
             
         except Exception as e:
-            logger.error(f"❌ 演示過程中發生錯誤: {e}")
+            logger.error("❌ 演示過程中發生錯誤: {}", e)
         finally:
             await self.cleanup()
 
@@ -572,7 +608,8 @@ if __name__ == "__main__":
     logger.add(
         sys.stdout,
         format="<green>{time:HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{message}</cyan>",
-        level="INFO"
+        level="INFO",
+        enqueue=True  # 由背景線程寫出日誌，避免阻塞事件循環
     )
     
     # 運行演示
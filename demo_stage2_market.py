@@ -4,8 +4,12 @@
 測試市場掃描、銷售位狀態檢查、購買操作等功能
 """
 
+import argparse
 import asyncio
+import os
+import re
 import sys
+import traceback
 from pathlib import Path
 
 # 添加項目根目錄到Python路徑
@@ -14,15 +18,103 @@ sys.path.insert(0, str(project_root / "src"))
 
 from loguru import logger
 from src.dfautotrans.config.settings import Settings
-from src.dfautotrans.automation.browser_manager import BrowserManager
-from src.dfautotrans.automation.login_handler import LoginHandler
-from src.dfautotrans.automation.market_operations import MarketOperations
-from src.dfautotrans.core.page_navigator import PageNavigator
-from src.dfautotrans.data.database import DatabaseManager
 
 
-async def test_market_operations():
-    """測試市場操作功能"""
+# 控制台日誌格式（--no-color 時使用純文本格式，省去顏色標籤解析）
+COLOR_LOG_FORMAT = "<green>{time:HH:mm:ss}</green> | <level>{level: <8}</level> | {message}"
+PLAIN_LOG_FORMAT = "{time:HH:mm:ss} | {level: <8} | {message}"
+
+# 只讀測試階段的並行上限
+PHASE_CONCURRENCY = 4
+
+# 特定物品搜索使用的物品名稱
+RIFLE_BULLETS = "12.7mm Rifle Bullets"
+
+# 上架測試的基準價格表（按順序匹配，第一個命中的生效）
+AMMO_PATTERN = re.compile(r"bullet|shell", re.IGNORECASE)
+AMMO_PRICE_TABLE = (
+    (re.compile(r"12\.7"), 15),
+    (re.compile(r"7\.62"), 12),
+    (re.compile(r"5\.56|9mm", re.IGNORECASE), 10),
+)
+DEFAULT_AMMO_PRICE = 8
+ITEM_PRICE_TABLE = (
+    (re.compile(r"painkiller", re.IGNORECASE), 25),
+    (re.compile(r"bandage", re.IGNORECASE), 15),
+    (re.compile(r"energy cell", re.IGNORECASE), 15),
+    (re.compile(r"gasoline", re.IGNORECASE), 3),
+)
+DEFAULT_BASE_PRICE = 1000
+
+
+async def run_isolated_phase(browser_manager, settings, semaphore, phase):
+    """在獨立的瀏覽器上下文中執行一個只讀測試階段"""
+    from src.dfautotrans.automation.market_operations import MarketOperations
+    from src.dfautotrans.core.page_navigator import PageNavigator
+    
+    async with semaphore:
+        async with browser_manager.isolated_session() as worker_browser:
+            worker_navigator = PageNavigator(worker_browser, settings)
+            await worker_navigator.initialize()
+            worker_market = MarketOperations(settings, worker_browser, worker_navigator)
+            return await phase(worker_market)
+
+
+def format_market_items(items) -> str:
+    """將市場物品列表格式化為一條多行日誌"""
+    return "\n".join(
+        f"   {i}. {item.item_name} - ${item.price} ({item.seller})" for i, item in enumerate(items, 1)
+    )
+
+
+def format_listed_items(items) -> str:
+    """將已上架物品列表格式化為一條多行日誌"""
+    return "\n".join(f"      - {item}" for item in items)
+
+
+def estimate_base_price(item) -> float:
+    """根據物品名稱估算上架基準價格"""
+    name = item.item_name
+    if AMMO_PATTERN.search(name):
+        return next((price for pattern, price in AMMO_PRICE_TABLE if pattern.search(name)), DEFAULT_AMMO_PRICE)
+    
+    fallback = getattr(item, 'estimated_value', 0) or DEFAULT_BASE_PRICE
+    return next((price for pattern, price in ITEM_PRICE_TABLE if pattern.search(name)), fallback)
+
+
+async def prepare_listing_inventory(market_operations, inventory_manager):
+    """在主頁面切換到銷售標籤並讀取庫存，供測試5使用"""
+    if not await market_operations.ensure_marketplace_ready('sell'):
+        logger.error("❌ 無法進入市場銷售標籤頁")
+        raise Exception("無法進入市場銷售標籤頁")
+    
+    # 等待庫存格子渲染完成，而不是固定等待
+    await market_operations.page.wait_for_selector("#inventory td.validSlot", timeout=5000)
+    return await inventory_manager.get_inventory_items()
+
+
+async def read_selling_overview(market_operations):
+    """讀取銷售位狀態和市場概要，市場概要會重用剛緩存的銷售位狀態"""
+    selling_status = await market_operations.get_selling_slots_status()
+    market_summary = await market_operations.get_market_summary()
+    return selling_status, market_summary
+
+
+async def test_market_operations(search_term: str = None, execute_real_listing: bool = None):
+    """測試市場操作功能
+    
+    Args:
+        search_term: 市場掃描使用的搜索詞，None表示使用配置中的第一個目標物品
+        execute_real_listing: 是否在測試5中實際上架物品，None表示讀取環境變量 EXECUTE_REAL_LISTING
+    """
+    
+    # 延遲導入：Playwright 和 SQLAlchemy 只在真正需要時加載，加快腳本啟動
+    from src.dfautotrans.automation.browser_manager import BrowserManager
+    from src.dfautotrans.automation.inventory_manager import InventoryManager
+    from src.dfautotrans.automation.login_handler import LoginHandler
+    from src.dfautotrans.automation.market_operations import MarketOperations
+    from src.dfautotrans.core.page_navigator import PageNavigator
+    from src.dfautotrans.data.database import DatabaseManager
     
     # 初始化組件
     settings = Settings()
@@ -31,14 +123,24 @@ async def test_market_operations():
     page_navigator = PageNavigator(browser_manager, settings)
     login_handler = LoginHandler(browser_manager, page_navigator, settings, database_manager)
     market_operations = MarketOperations(settings, browser_manager, page_navigator)
+    inventory_manager = InventoryManager(settings, browser_manager, page_navigator)
+    listing_prep_task = None
     
     try:
         logger.info("🚀 開始階段2.4市場操作演示")
         logger.info("=" * 60)
         
-        # 初始化瀏覽器和頁面導航器
-        logger.info("🔧 初始化瀏覽器管理器...")
-        await browser_manager.initialize()
+        # 瀏覽器啟動和數據庫初始化互不依賴，同時進行
+        logger.info("🔧 初始化瀏覽器管理器和數據庫...")
+        browser_ready, database_ready = await asyncio.gather(
+            browser_manager.initialize(),
+            database_manager.initialize()
+        )
+        if not browser_ready:
+            logger.error("❌ 瀏覽器初始化失敗，無法繼續測試")
+            return False
+        if not database_ready:
+            logger.warning("⚠️ 數據庫初始化失敗，繼續在無數據庫模式下測試")
         
         logger.info("🔧 初始化頁面導航器...")
         await page_navigator.initialize()
@@ -52,23 +154,50 @@ async def test_market_operations():
             return False
         
         logger.info("✅ 登錄成功！")
+        
+        # 保存一次登錄狀態，之後的獨立上下文都直接複用
+        await browser_manager.capture_session_state()
         logger.info("=" * 60)
         
+        # 測試1-3只讀取市場數據，各自在獨立的瀏覽器上下文中並行執行
+        # 未指定搜索詞時使用配置中的第一個目標物品
+        primary_search_term = search_term or market_operations.trading_config.market_search.target_items[0]
+        logger.info(f"🎯 使用配置的搜索詞: '{primary_search_term}'")
+        logger.info("⚡ 並行執行市場掃描、銷售位檢查和市場概要...")
+        
+        # 測試5的庫存準備在主頁面進行，與獨立上下文中的只讀階段同時執行
+        listing_prep_task = asyncio.create_task(prepare_listing_inventory(market_operations, inventory_manager))
+        
+        semaphore = asyncio.Semaphore(PHASE_CONCURRENCY)
+        phases = {
+            "市場掃描": market_operations.scan_many([primary_search_term, RIFLE_BULLETS], max_items=10),
+            "銷售位與市場概要": run_isolated_phase(browser_manager, settings, semaphore, read_selling_overview),
+        }
+        results = await asyncio.gather(*phases.values(), return_exceptions=True)
+        for phase_name, result in zip(phases, results):
+            if isinstance(result, Exception):
+                logger.error(f"❌ {phase_name}階段出錯: {result}")
+        scan_results, selling_overview = (
+            None if isinstance(result, Exception) else result for result in results
+        )
+        scan_results = scan_results or {}
+        selling_status, market_summary = selling_overview or (None, None)
+        market_items = scan_results.get(primary_search_term, [])
+        rifle_bullets = scan_results.get(RIFLE_BULLETS, [])[:5]
+        
+        # 所有掃描結果一次批量寫入價格歷史
+        if database_ready and scan_results:
+            scanned_items = [item for items in scan_results.values() for item in items]
+            if await database_manager.record_market_prices(scanned_items):
+                logger.info(f"💾 已記錄 {len(scanned_items)} 條市場價格")
+        
         # 測試1: 市場掃描功能
         logger.info("📊 測試1: 市場掃描功能")
         logger.info("-" * 40)
         
-        # 掃描所有市場物品
-        logger.info("🔍 掃描市場物品...")
-        # 使用配置中的第一個目標物品作為搜索詞
-        primary_search_term = market_operations.trading_config.market_search.target_items[0]
-        logger.info(f"🎯 使用配置的搜索詞: '{primary_search_term}'")
-        market_items = await market_operations.scan_market_items(search_term=primary_search_term, max_items=10)
-        
         if market_items:
             logger.info(f"✅ 成功掃描到 {len(market_items)} 個市場物品")
-            for i, item in enumerate(market_items[:5], 1):  # 顯示前5個
-                logger.info(f"   {i}. {item.item_name} - ${item.price} ({item.seller})")
+            logger.info(format_market_items(market_items[:5]))  # 顯示前5個
             if len(market_items) > 5:
                 logger.info(f"   ... 還有 {len(market_items) - 5} 個物品")
         else:
@@ -76,15 +205,10 @@ async def test_market_operations():
         
         # 搜索特定物品
         logger.info("🔍 搜索特定物品: '12.7mm Rifle Bullets'...")
-        rifle_bullets = await market_operations.scan_market_items(
-            search_term="12.7mm Rifle Bullets", 
-            max_items=5
-        )
         
         if rifle_bullets:
             logger.info(f"✅ 找到 {len(rifle_bullets)} 個 12.7mm Rifle Bullets")
-            for i, item in enumerate(rifle_bullets, 1):
-                logger.info(f"   {i}. {item.item_name} - ${item.price} ({item.seller})")
+            logger.info(format_market_items(rifle_bullets))
         else:
             logger.warning("⚠️ 沒有找到 12.7mm Rifle Bullets")
         
@@ -94,8 +218,6 @@ async def test_market_operations():
         logger.info("📊 測試2: 銷售位狀態檢查")
         logger.info("-" * 40)
         
-        selling_status = await market_operations.get_selling_slots_status()
-        
         if selling_status:
             logger.info(f"✅ 銷售位狀態:")
             logger.info(f"   📊 已使用: {selling_status.current_listings}")
@@ -105,8 +227,7 @@ async def test_market_operations():
             
             if selling_status.listed_items:
                 logger.info(f"   📝 已上架物品:")
-                for item in selling_status.listed_items[:3]:  # 顯示前3個
-                    logger.info(f"      - {item}")
+                logger.info(format_listed_items(selling_status.listed_items[:3]))  # 顯示前3個
             else:
                 logger.info("   📝 沒有已上架的物品")
         else:
@@ -118,8 +239,6 @@ async def test_market_operations():
         logger.info("📊 測試3: 市場概要信息")
         logger.info("-" * 40)
         
-        market_summary = await market_operations.get_market_summary()
-        
         if market_summary:
             logger.info(f"✅ 市場概要:")
             logger.info(f"   📈 總物品數: {market_summary.get('total_items', 0)}")
@@ -132,8 +251,9 @@ async def test_market_operations():
             item_types = market_summary.get('item_types', {})
             if item_types:
                 logger.info(f"   📦 物品類型:")
-                for item_type, count in list(item_types.items())[:3]:  # 顯示前3種
-                    logger.info(f"      - {item_type}: {count} 個")
+                logger.info("\n".join(
+                    f"      - {item_type}: {count} 個" for item_type, count in list(item_types.items())[:3]  # 顯示前3種
+                ))
                     
             selling_info = market_summary.get('selling_slots', {})
             if selling_info:
@@ -168,55 +288,23 @@ async def test_market_operations():
         # 先檢查庫存
         logger.info("🎒 檢查庫存物品...")
         try:
-            # 導航到市場頁面的selling標籤來檢查庫存
-            if not await page_navigator.navigate_to_marketplace():
-                logger.error("❌ 無法導航到市場頁面")
-                raise Exception("無法導航到市場頁面")
-            
-            # 切換到selling標籤
-            await market_operations._ensure_sell_tab_active()
-            await asyncio.sleep(2)
-            
-            # 獲取庫存物品
-            from src.dfautotrans.automation.inventory_manager import InventoryManager
-            inventory_manager = InventoryManager(settings, browser_manager, page_navigator)
-            inventory_items = await inventory_manager.get_inventory_items()
+            # 庫存已在測試1-3執行期間於主頁面的selling標籤讀取
+            inventory_items = await listing_prep_task
             
             if inventory_items and len(inventory_items) > 0:
                 logger.info(f"✅ 找到 {len(inventory_items)} 個庫存物品")
                 
                 # 顯示前5個庫存物品
-                for i, item in enumerate(inventory_items[:5], 1):
-                    logger.info(f"   {i}. {item.item_name} - 數量: {item.quantity}")
+                logger.info("\n".join(
+                    f"   {i}. {item.item_name} - 數量: {item.quantity}" for i, item in enumerate(inventory_items[:5], 1)
+                ))
                 
                 # 選擇第一個物品進行上架測試
                 test_item = inventory_items[0]
                 logger.info(f"🎯 選擇上架物品: {test_item.item_name}")
                 
                 # 計算上架價格（基於市場價格 + 20% 加價）
-                base_price = 1000  # 默認基準價格
-                if hasattr(test_item, 'estimated_value') and test_item.estimated_value > 0:
-                    base_price = test_item.estimated_value
-                
-                # 根據物品類型設定合理價格
-                item_name_lower = test_item.item_name.lower()
-                if "bullet" in item_name_lower or "shell" in item_name_lower:
-                    if "12.7" in item_name_lower:
-                        base_price = 15
-                    elif "7.62" in item_name_lower:
-                        base_price = 12
-                    elif "5.56" in item_name_lower or "9mm" in item_name_lower:
-                        base_price = 10
-                    else:
-                        base_price = 8
-                elif "painkiller" in item_name_lower:
-                    base_price = 25
-                elif "bandage" in item_name_lower:
-                    base_price = 15
-                elif "energy cell" in item_name_lower:
-                    base_price = 15
-                elif "gasoline" in item_name_lower:
-                    base_price = 3
+                base_price = estimate_base_price(test_item)
                 
                 # 應用20%加價
                 selling_price = int(base_price * 1.2)
@@ -230,16 +318,16 @@ async def test_market_operations():
                 logger.info("   這將會在遊戲中實際上架該物品到市場")
                 
                 # 檢查是否有環境變量控制是否實際執行
-                import os
-                should_execute =  True
+                should_execute = execute_real_listing
+                if should_execute is None:
+                    should_execute = os.getenv("EXECUTE_REAL_LISTING", "").lower() in ("1", "true", "yes")
                 
                 if should_execute:
-                    logger.info("🔧 環境變量 EXECUTE_REAL_LISTING=true，將執行實際上架")
-                    # 等待3秒讓用戶看到信息
-                    logger.info("⏳ 3秒後開始上架...")
-                    for i in range(3, 0, -1):
-                        logger.info(f"   {i}...")
-                        await asyncio.sleep(1)
+                    logger.info("🔧 已啟用 EXECUTE_REAL_LISTING，將執行實際上架")
+                    # 互動模式下等待3秒讓用戶看到信息，自動化運行時直接上架
+                    if os.getenv("DEMO_INTERACTIVE", "false").lower() == "true":
+                        logger.info("⏳ 3秒後開始上架...")
+                        await asyncio.sleep(3)
                     
                     # 執行上架
                     logger.info("🚀 開始執行上架操作...")
@@ -257,7 +345,7 @@ async def test_market_operations():
                             
                             # 重新檢查銷售位狀態
                             logger.info("🔄 重新檢查銷售位狀態...")
-                            await asyncio.sleep(2)
+                            await market_operations.wait_for_sell_tab_loaded()
                             updated_selling_status = await market_operations.get_selling_slots_status()
                             
                             if updated_selling_status:
@@ -267,8 +355,7 @@ async def test_market_operations():
                                 
                                 if updated_selling_status.listed_items:
                                     logger.info(f"   最新上架物品:")
-                                    for item in updated_selling_status.listed_items[-3:]:  # 顯示最後3個
-                                        logger.info(f"      - {item}")
+                                    logger.info(format_listed_items(updated_selling_status.listed_items[-3:]))  # 顯示最後3個
                         else:
                             logger.warning("⚠️ 上架失敗")
                             logger.info("   可能的原因:")
@@ -329,23 +416,52 @@ async def test_market_operations():
         
     except Exception as e:
         logger.error(f"❌ 演示過程中出現錯誤: {e}")
-        import traceback
         traceback.print_exc()
         return False
     
     finally:
         # 清理資源
+        if listing_prep_task and not listing_prep_task.done():
+            listing_prep_task.cancel()
+        
         try:
             await browser_manager.cleanup()
             logger.info("🧹 瀏覽器資源已清理")
         except Exception as e:
             logger.warning(f"清理瀏覽器資源時出錯: {e}")
+        
+        try:
+            await database_manager.close()
+        except Exception as e:
+            logger.warning(f"關閉數據庫時出錯: {e}")
+        
+        # 等待排隊中的日誌寫出完成
+        await logger.complete()
+
+
+def parse_args(argv=None):
+    """解析命令行參數"""
+    parser = argparse.ArgumentParser(description="階段2.4 市場操作模組演示")
+    parser.add_argument("--search-term", type=str, help="市場掃描使用的搜索詞（默認使用配置中的第一個目標物品）")
+    listing_group = parser.add_mutually_exclusive_group()
+    listing_group.add_argument("--real-listing", dest="execute_real_listing", action="store_true", default=None,
+                               help="在遊戲中實際上架物品（覆蓋環境變量 EXECUTE_REAL_LISTING）")
+    listing_group.add_argument("--dry-run", dest="execute_real_listing", action="store_false",
+                               help="只模擬上架，不在遊戲中實際上架物品")
+    parser.add_argument("--no-color", action="store_true", help="輸出不帶顏色的純文本日誌（適用於CI或重定向輸出）")
+    return parser.parse_args(argv)
 
 
-async def main():
+async def main(args=None):
     """主函數"""
+    if args is None:
+        args = parse_args([])
+    
     try:
-        success = await test_market_operations()
+        success = await test_market_operations(
+            search_term=args.search_term,
+            execute_real_listing=args.execute_real_listing
+        )
         
         if success:
             logger.info("🎯 階段2.4市場操作模組測試成功！")
@@ -363,10 +479,16 @@ async def main():
 
 
 if __name__ == "__main__":
+    args = parse_args()
+    
     # 配置日誌
+    # enqueue=True 由背景線程寫出日誌，避免阻塞事件循環
     logger.remove()
-    logger.add(sys.stdout, level="INFO", format="<green>{time:HH:mm:ss}</green> | <level>{level: <8}</level> | {message}")
+    if args.no_color:
+        logger.add(sys.stdout, level="INFO", format=PLAIN_LOG_FORMAT, colorize=False, enqueue=True)
+    else:
+        logger.add(sys.stdout, level="INFO", format=COLOR_LOG_FORMAT, enqueue=True)
     
     # 運行演示
-    exit_code = asyncio.run(main())
+    exit_code = asyncio.run(main(args))
     sys.exit(exit_code) 
\ No newline at end of file
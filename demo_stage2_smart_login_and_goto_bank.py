@@ -13,18 +13,22 @@ from loguru import logger
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
 from src.dfautotrans.config.settings import Settings
-from src.dfautotrans.automation.browser_manager import BrowserManager
-from src.dfautotrans.automation.login_handler import LoginHandler
-from src.dfautotrans.automation.bank_operations import BankOperations
-from src.dfautotrans.core.page_navigator import PageNavigator
-from src.dfautotrans.data.database import DatabaseManager
+
+
+def configure_logging():
+    """配置日誌：由背景線程寫出，避免阻塞事件循環"""
+    logger.remove()
+    logger.add(sys.stderr, level="INFO", enqueue=True, backtrace=False, diagnose=False)
 
 
 class SmartLoginDemo:
     """智能登錄演示類"""
     
-    def __init__(self):
-        self.settings = Settings()
+    # 每個演示階段的超時時間（秒），卡住的階段會被中止而不是無限等待
+    PHASE_TIMEOUT = 30
+    
+    def __init__(self, settings: Settings = None):
+        self.settings = settings or Settings()
         self.browser_manager = None
         self.login_handler = None
         self.page_navigator = None
@@ -35,22 +39,35 @@ class SmartLoginDemo:
         """初始化所有組件"""
         logger.info("🚀 初始化組件...")
         
-        # 1. 初始化數據庫管理器
-        self.database_manager = DatabaseManager(self.settings)
-        await self.database_manager.initialize()
-        logger.info("✅ 數據庫管理器初始化完成")
+        # 延遲導入：Playwright 和 SQLAlchemy 只在真正需要時加載，加快腳本啟動
+        from src.dfautotrans.automation.browser_manager import BrowserManager
+        from src.dfautotrans.automation.login_handler import LoginHandler
+        from src.dfautotrans.automation.bank_operations import BankOperations
+        from src.dfautotrans.core.page_navigator import PageNavigator
+        from src.dfautotrans.data.database import DatabaseManager
         
-        # 2. 初始化瀏覽器管理器
+        # 1-2. 數據庫和瀏覽器互不依賴，數據庫初始化隱藏在瀏覽器冷啟動時間內
+        # 先建立實例再並行啟動，任一失敗時另一個也已完成，cleanup() 可以正常關閉
+        self.database_manager = DatabaseManager(self.settings)
         self.browser_manager = BrowserManager(self.settings)
-        await self.browser_manager.start()
+        db_result, browser_result = await asyncio.gather(
+            self.database_manager.initialize(),
+            self.browser_manager.start(),
+            return_exceptions=True
+        )
+        if isinstance(browser_result, Exception):
+            raise browser_result
+        if isinstance(db_result, Exception):
+            raise db_result
+        logger.info("✅ 數據庫管理器初始化完成")
         logger.info("✅ 瀏覽器管理器初始化完成")
         
-        # 3. 初始化頁面導航器
+        # 3. 初始化頁面導航器（依賴已啟動的瀏覽器）
         self.page_navigator = PageNavigator(self.browser_manager, self.settings)
         await self.page_navigator.initialize()
         logger.info("✅ 頁面導航器初始化完成")
         
-        # 4. 初始化登錄處理器（包含 Cookie 管理）
+        # 4. 初始化登錄處理器（包含 Cookie 管理，依賴瀏覽器、導航器和數據庫）
         self.login_handler = LoginHandler(
             self.browser_manager, 
             self.page_navigator, 
@@ -91,10 +108,10 @@ class SmartLoginDemo:
         
         # 3. 驗證登錄狀態
         logger.info("\n3️⃣ 驗證登錄狀態...")
-        await asyncio.sleep(2)
+        await self.browser_manager.page.wait_for_load_state("domcontentloaded")
         
-        # 強制刷新檢查登錄狀態
-        is_logged_in = await self.page_navigator.check_login_status(force_refresh=True)
+        # 登錄流程剛檢查過的狀態在TTL內直接複用
+        is_logged_in = await self.page_navigator.check_login_status()
         
         if is_logged_in:
             logger.info("✅ 登錄狀態驗證成功")
@@ -102,10 +119,6 @@ class SmartLoginDemo:
             logger.error("❌ 登錄狀態驗證失敗")
             return False
         
-        # 4. 測試會話功能
-        logger.info("\n4️⃣ 測試會話功能...")
-        await self.test_session_functionality()
-        
         return True
     
     async def test_session_functionality(self):
@@ -115,9 +128,9 @@ class SmartLoginDemo:
             logger.info("🏦 測試銀行頁面訪問...")
             await self.bank_operations.navigate_to_bank()
             
-            # 獲取初始資金信息
-            initial_cash = await self.bank_operations.get_cash_on_hand()
-            initial_bank = await self.bank_operations.get_bank_balance()
+            # 獲取初始資金信息（一次頁面讀取同時取得現金和銀行餘額）
+            balances = await self.bank_operations.get_balances_snapshot()
+            initial_cash, initial_bank = balances['cash'], balances['bank']
             
             # 處理 None 值
             initial_cash = initial_cash or 0
@@ -133,14 +146,23 @@ class SmartLoginDemo:
             # 測試其他頁面導航
             logger.info("\n🗺️ 測試其他頁面導航...")
             
-            # 導航到主頁
-            await self.page_navigator.navigate_to_url(
-                "https://fairview.deadfrontier.com/onlinezombiemmo/index.php"
-            )
-            await asyncio.sleep(2)
-            
-            # 驗證仍然登錄
-            is_still_logged_in = await self.page_navigator.check_login_status(force_refresh=True)
+            # 在同一上下文的新分頁打開主頁，銀行分頁保持不動
+            from src.dfautotrans.core.page_navigator import PageNavigator
+            home_page = await self.browser_manager.new_page()
+            try:
+                home_navigator = PageNavigator(self.browser_manager, self.settings)
+                home_navigator.page = home_page
+                # DOM 就緒即返回，再等待登出鏈接出現，不等待網絡空閒
+                await home_navigator.navigate_to_url(
+                    self.settings.home_url,
+                    expected_indicators=["a[href*='logout']"],
+                    wait_until="domcontentloaded"
+                )
+                
+                # 驗證新分頁同樣處於登錄狀態
+                is_still_logged_in = await home_navigator.check_login_status()
+            finally:
+                await home_page.close()
             
             if is_still_logged_in:
                 logger.info("✅ 會話在頁面導航後仍然有效")
@@ -171,9 +193,6 @@ class SmartLoginDemo:
                     new_cash = await self.bank_operations.get_cash_on_hand() or 0
                     logger.info(f"   現金餘額更新: ${new_cash:,}")
                     
-                    # 等待一下再進行下一步操作
-                    await asyncio.sleep(3)
-                    
                 else:
                     logger.error(f"❌ 取出存款失敗: {withdraw_result.error_message}")
                     return
@@ -195,12 +214,9 @@ class SmartLoginDemo:
                     logger.info(f"   操作後銀行餘額: ${deposit_result.balance_after:,}")
                     
                     # 驗證餘額變化
-                    new_cash = await self.bank_operations.get_cash_on_hand() or 0
-                    new_bank = await self.bank_operations.get_bank_balance() or 0
-                    logger.info(f"   現金餘額更新: ${new_cash:,}")
-                    logger.info(f"   銀行餘額更新: ${new_bank:,}")
-                    
-                    await asyncio.sleep(3)
+                    balances = await self.bank_operations.get_balances_snapshot()
+                    logger.info(f"   現金餘額更新: ${balances['cash'] or 0:,}")
+                    logger.info(f"   銀行餘額更新: ${balances['bank'] or 0:,}")
                 else:
                     logger.error(f"❌ 存入現金失敗: {deposit_result.error_message}")
             else:
@@ -224,7 +240,12 @@ class SmartLoginDemo:
             logger.info("\n4️⃣ 演示資金需求檢查...")
             required_amount = 50000  # 需要 $50,000
             
-            ensure_result = await self.bank_operations.ensure_minimum_funds(required_amount)
+            # 步驟3剛讀取的餘額直接傳入，避免重新讀取頁面
+            ensure_result = await self.bank_operations.ensure_minimum_funds(
+                required_amount,
+                current_cash=player_resources.cash_on_hand if player_resources else None,
+                current_bank=player_resources.bank_balance if player_resources else None
+            )
             
             if ensure_result.success:
                 logger.info(f"✅ 成功確保最低資金需求 ${required_amount:,}")
@@ -235,24 +256,32 @@ class SmartLoginDemo:
             else:
                 logger.error(f"❌ 無法滿足資金需求: {ensure_result.error_message}")
             
-            # 5. 最終資金狀況
-            logger.info("\n5️⃣ 最終資金狀況:")
-            final_cash = await self.bank_operations.get_cash_on_hand() or 0
-            final_bank = await self.bank_operations.get_bank_balance() or 0
-            final_total = await self.bank_operations.get_total_available_funds() or 0
-            
-            logger.info(f"   最終現金餘額: ${final_cash:,}")
-            logger.info(f"   最終銀行餘額: ${final_bank:,}")
-            logger.info(f"   最終總可用資金: ${final_total:,}")
+            # 5. 最終資金狀況（步驟4沒有提款時直接沿用步驟3已讀取的資源，不再讀取頁面）
+            if player_resources and ensure_result.success and not ensure_result.amount_processed:
+                final_cash = player_resources.cash_on_hand
+                final_bank = player_resources.bank_balance
+            else:
+                balances = await self.bank_operations.get_balances_snapshot()
+                final_cash = balances['cash'] or 0
+                final_bank = balances['bank'] or 0
+            final_total = final_cash + final_bank
             
             # 資金變化總結
             cash_change = final_cash - initial_cash
             bank_change = final_bank - initial_bank
+            total_change = cash_change + bank_change
             
-            logger.info(f"\n📊 資金變化總結:")
-            logger.info(f"   現金變化: {'+' if cash_change >= 0 else ''}${cash_change:,}")
-            logger.info(f"   銀行變化: {'+' if bank_change >= 0 else ''}${bank_change:,}")
-            logger.info(f"   總資金變化: {'+' if (cash_change + bank_change) >= 0 else ''}${cash_change + bank_change:,}")
+            # 整段總結合併為一條日誌輸出
+            logger.info("\n".join([
+                "\n5️⃣ 最終資金狀況:",
+                f"   最終現金餘額: ${final_cash:,}",
+                f"   最終銀行餘額: ${final_bank:,}",
+                f"   最終總可用資金: ${final_total:,}",
+                "\n📊 資金變化總結:",
+                f"   現金變化: {'+' if cash_change >= 0 else ''}${cash_change:,}",
+                f"   銀行變化: {'+' if bank_change >= 0 else ''}${bank_change:,}",
+                f"   總資金變化: {'+' if total_change >= 0 else ''}${total_change:,}",
+            ]))
             
         except Exception as e:
             logger.error(f"❌ 銀行操作演示失敗: {e}")
@@ -307,21 +336,45 @@ class SmartLoginDemo:
                 
         except Exception as e:
             logger.error(f"❌ 清理過程中出錯: {e}")
+        
+        # 等待排隊中的日誌寫出完成
+        await logger.complete()
+    
+    async def run_phase(self, name: str, phase):
+        """在超時限制內運行一個演示階段
+        
+        Returns:
+            (是否按時完成, 階段返回值)
+        """
+        try:
+            async with asyncio.timeout(self.PHASE_TIMEOUT):
+                return True, await phase()
+        except TimeoutError:
+            logger.error(f"⏰ {name}超過 {self.PHASE_TIMEOUT} 秒未完成，已中止")
+            return False, None
     
-    async def run(self):
-        """運行演示"""
+    async def run(self) -> bool:
+        """運行演示，返回智能登錄是否成功"""
+        login_success = False
         try:
             logger.info("🎬 開始智能登錄演示...")
             
             # 初始化組件
-            await self.initialize_components()
+            completed, _ = await self.run_phase("初始化組件", self.initialize_components)
+            if not completed:
+                return login_success
             
             # 演示智能登錄
-            login_success = await self.demonstrate_smart_login()
+            _, result = await self.run_phase("智能登錄", self.demonstrate_smart_login)
+            login_success = bool(result)
             
             if login_success:
+                # 測試會話功能（超時只跳過該階段，繼續後面的演示）
+                logger.info("\n4️⃣ 測試會話功能...")
+                await self.run_phase("會話功能測試", self.test_session_functionality)
+                
                 # 演示會話管理
-                await self.demonstrate_session_management()
+                await self.run_phase("會話管理演示", self.demonstrate_session_management)
                 
                 logger.info("\n🎉 智能登錄演示完成！")
                 logger.info("主要功能:")
@@ -336,6 +389,8 @@ class SmartLoginDemo:
             logger.error(f"❌ 演示過程中發生錯誤: {e}")
         finally:
             await self.cleanup()
+        
+        return login_success
 
 
 async def main():
@@ -345,4 +400,5 @@ async def main():
 
 
 if __name__ == "__main__":
+    configure_logging()
     asyncio.run(main()) 
\ No newline at end of file
@@ -23,6 +23,7 @@ sys.path.insert(0, str(project_root / "src"))
 from dfautotrans.core.trading_engine import TradingEngine
 from dfautotrans.data.models import TradingConfiguration
 from dfautotrans.data.database import DatabaseManager
+from dfautotrans.utils.event_loop import run_async
 from dfautotrans.utils.logger import setup_logging
 from loguru import logger
 
@@ -33,14 +34,16 @@ setup_logging()
 async def demo_trading_engine():
     """演示交易引擎的完整功能"""
     
+    # 週期循環中反覆使用，綁定為局部名稱
+    sleep = asyncio.sleep
+    
     print("🚀 Dead Frontier 自動交易系統 - 階段3交易引擎演示")
     print("=" * 60)
     
-    # 初始化設置和數據庫
+    # 初始化設置和數據庫管理器（連接在啟動交易會話時與瀏覽器並行建立）
     from dfautotrans.config.settings import Settings
     settings = Settings()
     database_manager = DatabaseManager(settings)
-    await database_manager.initialize()
     
     # 創建交易配置
     config = TradingConfiguration(
@@ -77,11 +80,19 @@ async def demo_trading_engine():
     print()
     
     try:
-        # 啟動交易會話
-        print("🚀 啟動交易會話...")
-        session_started = await trading_engine.start_trading_session()
+        # 數據庫初始化和交易會話啟動（瀏覽器冷啟動）互不依賴，並行執行
+        print("🚀 初始化數據庫並啟動交易會話...")
+        db_ready, session_started = await asyncio.gather(
+            database_manager.initialize(),
+            trading_engine.start_trading_session(),
+            return_exceptions=True
+        )
+        
+        if db_ready is not True:
+            print(f"❌ 數據庫初始化失敗: {db_ready}")
+            return
         
-        if not session_started:
+        if session_started is not True:
             print("❌ 交易會話啟動失敗")
             return
         
@@ -92,12 +103,19 @@ async def demo_trading_engine():
         max_cycles = 2  # 演示2個交易週期
         successful_cycles = 0
         
+        # 週期之間狀態不變，上一週期結束後的狀態即為下一週期開始前的狀態
+        status_after = trading_engine.get_current_status()
+        
+        # 每個週期都用到的字符串在循環外構建一次
+        separator = "-" * 40
+        cycle_header = "🔄 執行交易週期 {}/" + str(max_cycles)
+        
         for cycle_num in range(1, max_cycles + 1):
-            print(f"🔄 執行交易週期 {cycle_num}/{max_cycles}")
-            print("-" * 40)
+            print(cycle_header.format(cycle_num))
+            print(separator)
             
             # 顯示週期開始前的狀態
-            status_before = trading_engine.get_current_status()
+            status_before = status_after
             print(f"📊 週期前狀態: {status_before['current_state']}")
             
             # 執行交易週期
@@ -111,77 +129,80 @@ async def demo_trading_engine():
                 print(f"✅ 交易週期 {cycle_num} 完成")
                 
                 # 顯示詳細狀態變化
+                stats_before = status_before['session_stats']
+                stats_after = status_after['session_stats']
                 print(f"📊 週期後狀態: {status_after['current_state']}")
-                print(f"📈 成功週期: {status_after['session_stats']['successful_cycles']}")
-                print(f"🛒 總購買次數: {status_after['session_stats']['total_purchases']}")
-                print(f"💰 總銷售次數: {status_after['session_stats']['total_sales']}")
+                print(f"📈 成功週期: {stats_after['successful_cycles']}")
+                print(f"🛒 總購買次數: {stats_after['total_purchases']}")
+                print(f"💰 總銷售次數: {stats_after['total_sales']}")
                 
                 # 計算週期變化
-                purchases_this_cycle = (status_after['session_stats']['total_purchases'] - 
-                                      status_before['session_stats']['total_purchases'])
-                sales_this_cycle = (status_after['session_stats']['total_sales'] - 
-                                  status_before['session_stats']['total_sales'])
+                purchases_this_cycle = stats_after['total_purchases'] - stats_before['total_purchases']
+                sales_this_cycle = stats_after['total_sales'] - stats_before['total_sales']
                 
                 print(f"🔄 本週期變化: 購買{purchases_this_cycle}次, 銷售{sales_this_cycle}次")
                 
                 # 演示模式：短暫等待而不是完整等待週期
                 if cycle_num < max_cycles:
                     print("⏸️ 等待下一個週期...")
-                    await asyncio.sleep(3)  # 演示模式：只等待3秒
+                    await sleep(3)  # 演示模式：只等待3秒
                 
             else:
                 print(f"❌ 交易週期 {cycle_num} 失敗")
                 print(f"📊 失敗後狀態: {status_after['current_state']}")
                 print(f"⚠️ 連續錯誤: {status_after['consecutive_errors']}")
                 # 演示模式：即使失敗也繼續下一個週期
-                await asyncio.sleep(2)
+                await sleep(2)
             
             print()
         
-        # 顯示最終統計
-        print("📊 交易會話總結")
-        print("=" * 40)
-        
-        final_status = trading_engine.get_current_status()
-        session_stats = final_status['session_stats']
-        
-        print(f"✅ 成功週期: {session_stats['successful_cycles']}")
-        print(f"❌ 失敗週期: {session_stats['failed_cycles']}")
-        print(f"🛒 總購買次數: {session_stats['total_purchases']}")
-        print(f"💰 總銷售次數: {session_stats['total_sales']}")
-        print(f"📈 總利潤: ${session_stats['total_profit']:.2f}")
-        
+        # 顯示最終統計（先收集所有行，最後一次性寫出）
+        session_stats = status_after['session_stats']
         success_rate = (session_stats['successful_cycles'] / max_cycles * 100) if max_cycles > 0 else 0
-        print(f"📊 成功率: {success_rate:.1f}%")
         
-        # 測試策略統計
-        print()
-        print("📈 策略性能分析")
-        print("-" * 30)
+        lines = [
+            "📊 交易會話總結",
+            "=" * 40,
+            f"✅ 成功週期: {session_stats['successful_cycles']}",
+            f"❌ 失敗週期: {session_stats['failed_cycles']}",
+            f"🛒 總購買次數: {session_stats['total_purchases']}",
+            f"💰 總銷售次數: {session_stats['total_sales']}",
+            f"📈 總利潤: ${session_stats['total_profit']:.2f}",
+            f"📊 成功率: {success_rate:.1f}%",
+            "",
+            "📈 策略性能分析",
+            "-" * 30,
+        ]
         
         # 購買策略統計
         buying_stats = trading_engine.buying_strategy.get_strategy_statistics()
         if buying_stats['total_purchases'] > 0:
-            print(f"🛒 購買策略統計:")
-            print(f"   總購買次數: {buying_stats['total_purchases']}")
-            print(f"   最近購買次數: {buying_stats.get('recent_purchases', 0)}")
-            print(f"   平均利潤率: {buying_stats.get('recent_avg_profit_margin', 0):.1%}")
-            print(f"   目標物品購買: {buying_stats.get('target_items_purchased', 0)}")
+            lines += [
+                "🛒 購買策略統計:",
+                f"   總購買次數: {buying_stats['total_purchases']}",
+                f"   最近購買次數: {buying_stats.get('recent_purchases', 0)}",
+                f"   平均利潤率: {buying_stats.get('recent_avg_profit_margin', 0):.1%}",
+                f"   目標物品購買: {buying_stats.get('target_items_purchased', 0)}",
+            ]
         else:
-            print("🛒 購買策略統計: 本次演示未執行購買操作")
+            lines.append("🛒 購買策略統計: 本次演示未執行購買操作")
         
         # 銷售策略統計
         selling_stats = trading_engine.selling_strategy.analyze_selling_performance()
         if selling_stats['total_sales'] > 0:
-            print(f"💰 銷售策略統計:")
-            print(f"   總銷售次數: {selling_stats['total_sales']}")
-            print(f"   最近銷售次數: {selling_stats.get('recent_sales', 0)}")
-            print(f"   總銷售價值: ${selling_stats.get('recent_total_value', 0):,.2f}")
-            print(f"   平均銷售價值: ${selling_stats.get('recent_average_value', 0):,.2f}")
+            lines += [
+                "💰 銷售策略統計:",
+                f"   總銷售次數: {selling_stats['total_sales']}",
+                f"   最近銷售次數: {selling_stats.get('recent_sales', 0)}",
+                f"   總銷售價值: ${selling_stats.get('recent_total_value', 0):,.2f}",
+                f"   平均銷售價值: ${selling_stats.get('recent_average_value', 0):,.2f}",
+            ]
         else:
-            print("💰 銷售策略統計: 本次演示未執行銷售操作")
+            lines.append("💰 銷售策略統計: 本次演示未執行銷售操作")
+        
+        lines.append("")
+        sys.stdout.write("\n".join(lines) + "\n")
         
-        print()
         print("🎯 階段3交易引擎演示完成!")
         
         if successful_cycles == max_cycles:
@@ -310,6 +331,12 @@ async def demo_strategy_testing():
     print("✅ 策略模組測試完成")
 
 
+async def run_all_demos():
+    """在同一個事件循環中依次運行交易引擎演示和策略測試"""
+    await demo_trading_engine()
+    await demo_strategy_testing()
+
+
 if __name__ == "__main__":
     print("🎮 Dead Frontier 自動交易系統 - 階段3完整演示")
     print("=" * 60)
@@ -317,11 +344,8 @@ if __name__ == "__main__":
     print()
     
     try:
-        # 運行主要交易引擎演示
-        asyncio.run(demo_trading_engine())
-        
-        # 運行策略測試演示
-        asyncio.run(demo_strategy_testing())
+        # 運行主要交易引擎演示和策略測試演示
+        run_async(run_all_demos())
         
     except Exception as e:
         print(f"\n❌ 演示執行失敗: {e}")
@@ -4,28 +4,91 @@ Dead Frontier 自動交易系統 - Stage 3 實現測試（含詳細日誌記錄
 使用完整的交易引擎進行實際交易，並展示詳細的日誌記錄功能。
 """
 
-import asyncio
-import logging
+import os
+import sys
+from collections import deque
 from datetime import datetime
 from pathlib import Path
+from loguru import logger
+
+try:
+    import orjson as _json  # 可選依賴，直接解析 bytes，比標準庫更快
+except ImportError:
+    import json as _json
 
 from src.dfautotrans.core.trading_engine import TradingEngine
 from src.dfautotrans.data.models import TradingConfiguration
 from src.dfautotrans.data.database import DatabaseManager
 from src.dfautotrans.config.settings import Settings
+from src.dfautotrans.utils.event_loop import run_async
+
+LOG_FORMAT = "{time:YYYY-MM-DD HH:mm:ss} | {level} | {message}"
+
+
+def configure_logging():
+    """配置日誌：控制台和詳細日誌文件都由背景線程寫出，避免阻塞事件循環"""
+    logger.remove()
+    logger.add(sys.stderr, level="INFO", format=LOG_FORMAT, enqueue=True)
+    logger.add("logs/stage3_detailed.log", level="INFO", format=LOG_FORMAT, encoding="utf-8", enqueue=True)
+
 
-# 設置日誌
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s | %(levelname)s | %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S',
-    handlers=[
-        logging.FileHandler('logs/stage3_detailed.log', encoding='utf-8'),
-        logging.StreamHandler()
+# 週期記錄中的階段耗時字段及顯示名稱
+STAGE_NAMES = {
+    'login_duration': '登錄檢查',
+    'resource_check_duration': '資源檢查',
+    'space_management_duration': '空間管理',
+    'market_analysis_duration': '市場分析',
+    'buying_duration': '購買階段',
+    'selling_duration': '銷售階段'
+}
+
+
+def format_latest_record(latest_record: dict) -> str:
+    """把最新週期記錄格式化為摘要和階段時間分析"""
+    lines = [
+        "📝 最新週期記錄摘要:",
+        f"   週期ID: {latest_record.get('cycle_id', 'N/A')}",
+        f"   開始時間: {latest_record.get('start_time', 'N/A')}",
+        f"   持續時間: {latest_record.get('duration_seconds', 0):.1f} 秒",
+        f"   成功狀態: {latest_record.get('success', False)}",
+        f"   交易記錄數: {len(latest_record.get('transactions', []))}",
+        f"   購買次數: {latest_record.get('total_purchases', 0)}",
+        f"   銷售次數: {latest_record.get('total_sales', 0)}",
+        f"   淨利潤: ${latest_record.get('net_profit', 0):.2f}",
+        "📊 階段時間分析:",
     ]
-)
+    for key, name in STAGE_NAMES.items():
+        duration = latest_record.get(key)
+        if duration is not None:
+            lines.append(f"   {name}: {duration:.1f} 秒")
+    return "\n".join(lines)
+
+
+def count_lines(path: Path, chunk_size: int = 1 << 20) -> int:
+    """按塊統計文件行數，不解碼內容，內存佔用與文件大小無關"""
+    count = 0
+    last_byte = b"\n"
+    with open(path, 'rb') as f:
+        while chunk := f.read(chunk_size):
+            count += chunk.count(b"\n")
+            last_byte = chunk[-1:]
+    # 最後一行沒有換行符時也算一行
+    return count if last_byte == b"\n" else count + 1
+
 
-logger = logging.getLogger(__name__)
+def read_last_line(path: Path, tail_size: int = 8192) -> bytes:
+    """從文件末尾往回讀取最後一個非空行，行比窗口長時窗口加倍"""
+    with open(path, 'rb') as f:
+        size = f.seek(0, os.SEEK_END)
+        window = tail_size
+        while True:
+            start = max(0, size - window)
+            f.seek(start)
+            tail = f.read().rstrip(b"\r\n")
+            newline = tail.rfind(b"\n")
+            if newline != -1 or start == 0:
+                return tail[newline + 1:]
+            window *= 2
 
 async def main():
     """主函數"""
@@ -99,17 +162,20 @@ async def main():
         elif "message" in session_summary:
             logger.info(f"ℹ️ {session_summary['message']}")
         else:
-            logger.info(f"📊 總週期數: {session_summary['total_cycles']}")
-            logger.info(f"✅ 成功週期: {session_summary['successful_cycles']}")
-            logger.info(f"📈 成功率: {session_summary['success_rate']:.1f}%")
-            logger.info(f"⏰ 總運行時間: {session_summary['total_duration_minutes']:.1f} 分鐘")
-            logger.info(f"⏱️ 平均週期時間: {session_summary['average_cycle_duration_minutes']:.1f} 分鐘")
-            logger.info(f"🛒 總購買次數: {session_summary['total_purchases']}")
-            logger.info(f"💰 總銷售次數: {session_summary['total_sales']}")
-            logger.info(f"💸 總支出: ${session_summary['total_spent']:.2f}")
-            logger.info(f"💵 總收入: ${session_summary['total_earned']:.2f}")
-            logger.info(f"📊 淨利潤: ${session_summary['net_profit']:.2f}")
-            logger.info(f"💹 每週期平均利潤: ${session_summary['profit_per_cycle']:.2f}")
+            # 整段報告合併為一條日誌輸出
+            logger.info("\n".join([
+                f"📊 總週期數: {session_summary['total_cycles']}",
+                f"✅ 成功週期: {session_summary['successful_cycles']}",
+                f"📈 成功率: {session_summary['success_rate']:.1f}%",
+                f"⏰ 總運行時間: {session_summary['total_duration_minutes']:.1f} 分鐘",
+                f"⏱️ 平均週期時間: {session_summary['average_cycle_duration_minutes']:.1f} 分鐘",
+                f"🛒 總購買次數: {session_summary['total_purchases']}",
+                f"💰 總銷售次數: {session_summary['total_sales']}",
+                f"💸 總支出: ${session_summary['total_spent']:.2f}",
+                f"💵 總收入: ${session_summary['total_earned']:.2f}",
+                f"📊 淨利潤: ${session_summary['net_profit']:.2f}",
+                f"💹 每週期平均利潤: ${session_summary['profit_per_cycle']:.2f}",
+            ]))
         
         # 停止交易會話
         logger.info("🛑 停止交易會話...")
@@ -131,12 +197,13 @@ async def main():
             
             # 顯示最後幾行日誌
             try:
+                # 只保留最後10行，不把整個文件讀入內存
                 with open(detailed_log, 'r', encoding='utf-8') as f:
-                    lines = f.readlines()
-                    if len(lines) > 10:
-                        logger.info("📝 詳細日誌最後10行:")
-                        for line in lines[-10:]:
-                            logger.info(f"   {line.strip()}")
+                    tail = deque(f, maxlen=10)
+                if tail:
+                    logger.info("📝 詳細日誌最後10行:")
+                    for line in tail:
+                        logger.info(f"   {line.strip()}")
             except Exception as e:
                 logger.warning(f"⚠️ 讀取詳細日誌文件時出錯: {e}")
         
@@ -146,39 +213,17 @@ async def main():
             
             # 顯示JSON文件內容摘要
             try:
-                with open(json_log, 'r', encoding='utf-8') as f:
-                    lines = f.readlines()
-                    logger.info(f"📋 JSON文件包含 {len(lines)} 條交易週期記錄")
-                    
-                    if lines:
-                        import json
-                        latest_record = json.loads(lines[-1])
-                        logger.info("📝 最新週期記錄摘要:")
-                        logger.info(f"   週期ID: {latest_record.get('cycle_id', 'N/A')}")
-                        logger.info(f"   開始時間: {latest_record.get('start_time', 'N/A')}")
-                        logger.info(f"   持續時間: {latest_record.get('duration_seconds', 0):.1f} 秒")
-                        logger.info(f"   成功狀態: {latest_record.get('success', False)}")
-                        logger.info(f"   交易記錄數: {len(latest_record.get('transactions', []))}")
-                        logger.info(f"   購買次數: {latest_record.get('total_purchases', 0)}")
-                        logger.info(f"   銷售次數: {latest_record.get('total_sales', 0)}")
-                        logger.info(f"   淨利潤: ${latest_record.get('net_profit', 0):.2f}")
-                        
-                        # 顯示階段時間分析
-                        stages = {
-                            'login_duration': '登錄檢查',
-                            'resource_check_duration': '資源檢查',
-                            'space_management_duration': '空間管理',
-                            'market_analysis_duration': '市場分析',
-                            'buying_duration': '購買階段',
-                            'selling_duration': '銷售階段'
-                        }
-                        
-                        logger.info("📊 階段時間分析:")
-                        for key, name in stages.items():
-                            duration = latest_record.get(key)
-                            if duration is not None:
-                                logger.info(f"   {name}: {duration:.1f} 秒")
-                        
+                # 按塊計數，最新記錄只從文件末尾讀取
+                record_count = count_lines(json_log)
+                last_line = read_last_line(json_log)
+                logger.info(f"📋 JSON文件包含 {record_count} 條交易週期記錄")
+                
+                # lazy=True：摘要只在INFO級別啟用時才解析和格式化
+                if last_line:
+                    logger.opt(lazy=True).info(
+                        "{}", lambda: format_latest_record(_json.loads(last_line))
+                    )
+                
             except Exception as e:
                 logger.warning(f"⚠️ 讀取JSON數據文件時出錯: {e}")
         
@@ -208,6 +253,10 @@ async def main():
         logger.error(f"❌ 測試過程中出錯: {e}")
         import traceback
         logger.error(f"詳細錯誤: {traceback.format_exc()}")
+    
+    # 等待排隊中的日誌寫出完成
+    await logger.complete()
 
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    configure_logging()
+    run_async(main())
\ No newline at end of file
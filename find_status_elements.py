@@ -5,7 +5,9 @@ Simple script to find inventory and storage status elements
 
 import asyncio
 import sys
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import List
 from loguru import logger
 
 # Add src to path
@@ -17,6 +19,182 @@ from src.dfautotrans.automation.login_handler import LoginHandler
 from src.dfautotrans.core.page_navigator import PageNavigator
 from src.dfautotrans.data.database import DatabaseManager
 
+@dataclass(slots=True)
+class StatusText:
+    """包含 (數字/數字) 模式的狀態文本"""
+    text: str
+    parent_tag_name: str
+    parent_class_name: str
+    parent_id: str
+    parent_html: str
+
+
+@dataclass(slots=True)
+class ElementInfo:
+    """特定選擇器匹配的元素或包含數字的短文本元素"""
+    tag_name: str
+    text: str
+    class_name: str
+    id: str
+    type: str
+    placeholder: str
+    value: str
+    selector: str = ""
+    style: str = ""
+
+
+@dataclass(slots=True)
+class ButtonInfo:
+    """頁面上的按鈕"""
+    tag_name: str
+    id: str
+    text: str
+    value: str
+
+
+@dataclass(slots=True)
+class StorageSnapshot:
+    """倉庫頁面的一次性快照"""
+    status_text: List[StatusText] = field(default_factory=list)
+    specific: List[ElementInfo] = field(default_factory=list)
+    numeric: List[ElementInfo] = field(default_factory=list)
+    buttons: List[ButtonInfo] = field(default_factory=list)
+    html: str = ""
+    
+    def summary(self) -> str:
+        """返回快照摘要"""
+        return (
+            f"狀態文本 {len(self.status_text)} 個，特定元素 {len(self.specific)} 個，"
+            f"數字元素 {len(self.numeric)} 個，按鈕 {len(self.buttons)} 個"
+            + (f"，HTML {len(self.html)} 字符" if self.html else "")
+        )
+
+
+# 一次遍歷頁面的掃描腳本，模塊加載時構建一次；正則表達式在腳本頂部只創建一次
+STATUS_SCAN_SCRIPT = r"""
+(includeHtml) => {
+    const STATUS_PATTERN = /\(\d+\/\d+\)/;
+    const DIGIT_PATTERN = /\d/;
+    const BUTTON_SELECTOR = 'button, input[type="button"], input[type="submit"]';
+    const selectors = [
+        '#inventoryholder',
+        '#inventory',
+        '#storage',
+        '.opElem',
+        'input[type="number"]'
+    ];
+    const statusText = [];
+    const specific = Object.fromEntries(selectors.map(selector => [selector, []]));
+    const numeric = [];
+    const numericParents = [];
+    const buttons = [];
+
+    const walker = document.createTreeWalker(
+        document.body,
+        NodeFilter.SHOW_ELEMENT | NodeFilter.SHOW_TEXT,
+        null,
+        false
+    );
+
+    let node;
+    while (node = walker.nextNode()) {
+        if (node.nodeType === Node.TEXT_NODE) {
+            const text = node.nodeValue.trim();
+            // 查找 (數字/數字) 模式
+            if (STATUS_PATTERN.test(text)) {
+                const parent = node.parentElement;
+                statusText.push({
+                    text: text,
+                    parent_tag_name: parent ? parent.tagName : 'unknown',
+                    parent_class_name: parent ? parent.className : '',
+                    parent_id: parent ? parent.id : '',
+                    parent_html: parent ? parent.outerHTML.substring(0, 200) + '...' : ''
+                });
+            }
+
+            // 查找包含數字並且較短的文本，直接檢查文本節點，避免拼接整個子樹的 textContent
+            if (numeric.length < 10 && text && text.length < 20 && DIGIT_PATTERN.test(text)) {
+                const parent = node.parentElement;
+                numeric.push({
+                    tag_name: parent ? parent.tagName : 'unknown',
+                    text: text,
+                    class_name: parent ? parent.className : '',
+                    id: parent ? parent.id : '',
+                    type: parent ? parent.type || '' : '',
+                    placeholder: parent ? parent.placeholder || '' : '',
+                    value: parent ? parent.value || '' : ''
+                });
+                numericParents.push(parent);
+            }
+            continue;
+        }
+
+        const elem = node;
+        if (elem.matches(BUTTON_SELECTOR)) {
+            buttons.push({
+                tag_name: elem.tagName,
+                id: elem.id,
+                text: (elem.textContent || '').trim().substring(0, 100),
+                value: elem.value || ''
+            });
+        }
+
+        const matched = selectors.filter(selector => elem.matches(selector));
+        // 只有匹配選擇器的元素才需要讀取文本
+        if (!matched.length) {
+            continue;
+        }
+
+        const text = (elem.textContent || elem.value || '').trim();
+        if (text) {
+            for (const selector of matched) {
+                specific[selector].push({
+                    selector: selector,
+                    tag_name: elem.tagName,
+                    text: text.substring(0, 100),
+                    class_name: elem.className,
+                    id: elem.id,
+                    type: elem.type || '',
+                    placeholder: elem.placeholder || '',
+                    value: elem.value || ''
+                });
+            }
+        }
+    }
+
+    // 樣式只在遍歷結束後為最多10個數字元素讀取，遍歷過程中不做樣式序列化
+    numeric.forEach((item, i) => {
+        const parent = numericParents[i];
+        item.style = parent ? parent.getAttribute('style') || '' : '';
+    });
+
+    return {
+        status_text: statusText,
+        specific: selectors.flatMap(selector => specific[selector]),
+        numeric: numeric,
+        buttons: buttons,
+        html: includeHtml ? document.documentElement.outerHTML : ''
+    };
+}
+"""
+
+async def snapshot_storage_page(page, include_html: bool = False) -> StorageSnapshot:
+    """用一次 page.evaluate 收集倉庫頁面的狀態元素、按鈕和（可選的）HTML
+    
+    Args:
+        page: 已經打開倉庫頁面的 Playwright 頁面
+        include_html: 是否同時抓取整頁 HTML
+    """
+    scan = await page.evaluate(STATUS_SCAN_SCRIPT, include_html)
+    return StorageSnapshot(
+        status_text=[StatusText(**elem) for elem in scan['status_text']],
+        specific=[ElementInfo(**elem) for elem in scan['specific']],
+        numeric=[ElementInfo(**elem) for elem in scan['numeric']],
+        buttons=[ButtonInfo(**button) for button in scan['buttons']],
+        html=scan['html']
+    )
+
+
 async def find_status_elements():
     """查找狀態元素"""
     settings = Settings()
@@ -42,152 +220,64 @@ async def find_status_elements():
         
         # 導航到倉庫頁面
         logger.info("導航到倉庫頁面...")
-        await page_navigator.navigate_to_url("https://fairview.deadfrontier.com/onlinezombiemmo/index.php?page=50")
-        await asyncio.sleep(3)
+        await page_navigator.navigate_to_url(settings.storage_url, wait_until="domcontentloaded")
         
+        # 等到倉庫按鈕出現即可掃描，不再固定等待3秒
         page = browser_manager.page
+        try:
+            await page.locator('#storagetoinv, #invtostorage').first.wait_for(timeout=5000)
+        except Exception:
+            logger.warning("倉庫按鈕未在5秒內出現，直接掃描當前頁面")
         
-        # 方法1：直接查找文本模式
-        logger.info("查找狀態文本模式...")
-        status_elements = await page.evaluate("""
-            () => {
-                const results = [];
-                const walker = document.createTreeWalker(
-                    document.body,
-                    NodeFilter.SHOW_TEXT,
-                    null,
-                    false
-                );
-                
-                let node;
-                while (node = walker.nextNode()) {
-                    const text = node.nodeValue.trim();
-                    // 查找 (數字/數字) 模式
-                    if (/\\(\\d+\/\\d+\\)/.test(text)) {
-                        const parent = node.parentElement;
-                        results.push({
-                            text: text,
-                            parentTagName: parent ? parent.tagName : 'unknown',
-                            parentClassName: parent ? parent.className : '',
-                            parentId: parent ? parent.id : '',
-                            parentHTML: parent ? parent.outerHTML.substring(0, 200) + '...' : ''
-                        });
-                    }
-                }
-                return results;
-            }
-        """)
+        # 一次遍歷頁面，同時收集：
+        # 1. 包含 (數字/數字) 的狀態文本  2. 特定ID/Class元素  3. 包含數字的短文本元素  4. 按鈕
+        logger.info("掃描頁面狀態元素...")
+        snapshot = await snapshot_storage_page(page)
+        logger.info(snapshot.summary())
+        status_elements = snapshot.status_text
+        specific_elements = snapshot.specific
+        numeric_elements = snapshot.numeric
         
         logger.info(f"找到 {len(status_elements)} 個狀態文本元素:")
         for i, elem in enumerate(status_elements):
             logger.info(f"狀態元素 {i+1}:")
-            logger.info(f"  文本: {elem['text']}")
-            logger.info(f"  父元素標籤: {elem['parentTagName']}")
-            logger.info(f"  父元素類名: {elem['parentClassName']}")
-            logger.info(f"  父元素ID: {elem['parentId']}")
-            logger.info(f"  父元素HTML: {elem['parentHTML']}")
+            logger.info(f"  文本: {elem.text}")
+            logger.info(f"  父元素標籤: {elem.parent_tag_name}")
+            logger.info(f"  父元素類名: {elem.parent_class_name}")
+            logger.info(f"  父元素ID: {elem.parent_id}")
+            logger.info(f"  父元素HTML: {elem.parent_html}")
             logger.info("-" * 40)
         
-        # 方法2：查找特定的元素
-        logger.info("\\n查找特定ID/Class元素...")
-        
-        # 查找可能包含狀態的元素
-        specific_elements = await page.evaluate("""
-            () => {
-                const selectors = [
-                    '#inventoryholder',
-                    '#inventory',
-                    '#storage',
-                    '.opElem',
-                    'input[type="number"]'
-                ];
-                
-                const results = [];
-                
-                for (let selector of selectors) {
-                    try {
-                        const elements = document.querySelectorAll(selector);
-                        for (let elem of elements) {
-                            const text = (elem.textContent || elem.value || '').trim();
-                            if (text) {
-                                results.push({
-                                    selector: selector,
-                                    tagName: elem.tagName,
-                                    text: text.substring(0, 100),
-                                    className: elem.className,
-                                    id: elem.id,
-                                    type: elem.type || '',
-                                    placeholder: elem.placeholder || '',
-                                    value: elem.value || ''
-                                });
-                            }
-                        }
-                    } catch (e) {
-                        // 忽略無效選擇器
-                    }
-                }
-                
-                return results;
-            }
-        """)
-        
         logger.info(f"找到 {len(specific_elements)} 個特定元素:")
         for i, elem in enumerate(specific_elements):
             logger.info(f"特定元素 {i+1}:")
-            logger.info(f"  選擇器: {elem['selector']}")
-            logger.info(f"  標籤: {elem['tagName']}")
-            logger.info(f"  文本: {elem['text']}")
-            logger.info(f"  類名: {elem['className']}")
-            logger.info(f"  ID: {elem['id']}")
-            logger.info(f"  類型: {elem['type']}")
-            logger.info(f"  占位符: {elem['placeholder']}")
-            logger.info(f"  值: {elem['value']}")
+            logger.info(f"  選擇器: {elem.selector}")
+            logger.info(f"  標籤: {elem.tag_name}")
+            logger.info(f"  文本: {elem.text}")
+            logger.info(f"  類名: {elem.class_name}")
+            logger.info(f"  ID: {elem.id}")
+            logger.info(f"  類型: {elem.type}")
+            logger.info(f"  占位符: {elem.placeholder}")
+            logger.info(f"  值: {elem.value}")
             logger.info("-" * 40)
         
-        # 方法3：查找包含數字的輸入框或元素
-        logger.info("\\n查找包含數字的元素...")
-        numeric_elements = await page.evaluate("""
-            () => {
-                const results = [];
-                
-                // 查找所有包含數字的元素
-                const allElements = document.querySelectorAll('*');
-                
-                for (let elem of allElements) {
-                    const text = (elem.textContent || elem.value || '').trim();
-                    
-                    // 查找包含數字並且較短的文本
-                    if (/\\d/.test(text) && text.length < 20) {
-                        results.push({
-                            tagName: elem.tagName,
-                            text: text,
-                            className: elem.className,
-                            id: elem.id,
-                            type: elem.type || '',
-                            placeholder: elem.placeholder || '',
-                            value: elem.value || '',
-                            style: elem.getAttribute('style') || ''
-                        });
-                    }
-                }
-                
-                return results.slice(0, 10); // 只返回前10個
-            }
-        """)
-        
         logger.info(f"找到 {len(numeric_elements)} 個包含數字的元素:")
         for i, elem in enumerate(numeric_elements):
             logger.info(f"數字元素 {i+1}:")
-            logger.info(f"  標籤: {elem['tagName']}")
-            logger.info(f"  文本: {elem['text']}")
-            logger.info(f"  類名: {elem['className']}")
-            logger.info(f"  ID: {elem['id']}")
-            logger.info(f"  類型: {elem['type']}")
-            logger.info(f"  占位符: {elem['placeholder']}")
-            logger.info(f"  值: {elem['value']}")
-            logger.info(f"  樣式: {elem['style']}")
+            logger.info(f"  標籤: {elem.tag_name}")
+            logger.info(f"  文本: {elem.text}")
+            logger.info(f"  類名: {elem.class_name}")
+            logger.info(f"  ID: {elem.id}")
+            logger.info(f"  類型: {elem.type}")
+            logger.info(f"  占位符: {elem.placeholder}")
+            logger.info(f"  值: {elem.value}")
+            logger.info(f"  樣式: {elem.style}")
             logger.info("-" * 40)
         
+        logger.info(f"找到 {len(snapshot.buttons)} 個按鈕:")
+        for i, button in enumerate(snapshot.buttons):
+            logger.info(f"  按鈕 {i+1}: <{button.tag_name}> id={button.id} 文本={button.text} 值={button.value}")
+        
     except Exception as e:
         logger.error(f"查找過程中出錯: {e}")
     finally:
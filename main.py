@@ -5,7 +5,6 @@ import asyncio
 import argparse
 from pathlib import Path
 
-from src.dfautotrans.app import DeadFrontierAutoTrader
 from src.dfautotrans.config.settings import Settings
 from src.dfautotrans.utils.logger import setup_logging
 
@@ -17,6 +16,7 @@ async def main():
     parser.add_argument("--headless", action="store_true", help="Run in headless mode")
     parser.add_argument("--dry-run", action="store_true", help="Test mode (no actual trades)")
     parser.add_argument("--debug", action="store_true", help="Enable debug logging")
+    parser.add_argument("--fast-input", action="store_true", help="Fill inputs directly instead of human-like typing")
     
     args = parser.parse_args()
     
@@ -28,13 +28,18 @@ async def main():
     if args.headless:
         config.browser.headless = True
     
+    if args.fast_input:
+        config.anti_detection.fast_mode = True
+    
     if args.debug:
         config.log_level = "DEBUG"
     
     # Setup logging
     setup_logging(config.log_level, config.log_file)
     
-    # Start trading system
+    # Start trading system (imported here so --help doesn't load the browser stack)
+    from src.dfautotrans.app import DeadFrontierAutoTrader
+    
     trader = DeadFrontierAutoTrader(config)
     await trader.start()
 
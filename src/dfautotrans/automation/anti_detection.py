@@ -1,22 +1,119 @@
 """Anti-detection and human behavior simulation for Dead Frontier Auto Trading System."""
 
+from __future__ import annotations
+
 import asyncio
+import math
 import random
 import time
-from typing import Tuple, Optional, List
-from playwright.async_api import Page, Locator
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Tuple, Optional, List, Dict
+
+if TYPE_CHECKING:
+    from playwright.async_api import BrowserContext, Page, Locator
 
 from ..config.settings import AntiDetectionConfig
 from ..utils.logger import get_browser_logger
 
 logger = get_browser_logger()
 
+# Init script that hides common automation fingerprints; registered once per context
+_STEALTH_SCRIPT = """
+    // Override navigator.webdriver
+    Object.defineProperty(navigator, 'webdriver', {
+        get: () => undefined,
+    });
+    
+    // Override navigator.plugins
+    Object.defineProperty(navigator, 'plugins', {
+        get: () => [1, 2, 3, 4, 5],
+    });
+    
+    // Override navigator.languages
+    Object.defineProperty(navigator, 'languages', {
+        get: () => ['en-US', 'en'],
+    });
+    
+    // Override screen properties with realistic values
+    Object.defineProperty(screen, 'availHeight', {
+        get: () => 1040,
+    });
+    Object.defineProperty(screen, 'availWidth', {
+        get: () => 1920,
+    });
+"""
+
+# Headers sent with every request to look like a regular browser
+_STEALTH_HEADERS = {
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Upgrade-Insecure-Requests': '1',
+    'Sec-Fetch-Dest': 'document',
+    'Sec-Fetch-Mode': 'navigate',
+    'Sec-Fetch-Site': 'none',
+    'Cache-Control': 'max-age=0'
+}
+
+
+def _bezier_weights(steps: int) -> Tuple[Tuple[float, float, float, float], ...]:
+    """Cubic Bernstein weights for each of the steps + 1 points along a curve."""
+    weights = []
+    for i in range(steps + 1):
+        t = i / steps
+        u = 1 - t
+        weights.append((u * u * u, 3 * u * u * t, 3 * u * t * t, t * t * t))
+    return tuple(weights)
+
+
+# Mouse paths use 3-7 steps, so the curve weights are computed once per step count
+_BEZIER_WEIGHTS = {steps: _bezier_weights(steps) for steps in range(3, 8)}
+
 
 class HumanBehaviorSimulator:
     """Simulates human-like behavior to avoid detection."""
     
+    # How long a bounding box is reused for repeated moves/clicks on the same element
+    BBOX_CACHE_TTL = 0.5
+    # Targets closer than this to the last mouse position get a single direct move
+    MOUSE_PROXIMITY_PX = 25
+    
     def __init__(self, config: AntiDetectionConfig):
         self.config = config
+        # One generator per simulator so all draws skip the module-level lookups
+        self.rng = random.Random()
+        self._bbox_cache: Dict[str, Tuple[float, Dict[str, float]]] = {}
+        self._last_mouse: Optional[Tuple[float, float]] = None
+    
+    def invalidate_bbox_cache(self) -> None:
+        """Drop cached bounding boxes, e.g. after navigating to another page."""
+        self._bbox_cache.clear()
+    
+    def reset_mouse_position(self) -> None:
+        """Forget the last known mouse position, e.g. after navigating to another page."""
+        self._last_mouse = None
+    
+    def _fresh_bbox(self, key: str) -> Optional[Dict[str, float]]:
+        """Return the cached bounding box for key if it is still within the TTL."""
+        cached = self._bbox_cache.get(key)
+        if cached and time.monotonic() - cached[0] < self.BBOX_CACHE_TTL:
+            return cached[1]
+        return None
+    
+    async def _cached_bbox(self, element: Locator, key: str) -> Optional[Dict[str, float]]:
+        """Get an element's bounding box, reusing a recent result for the same key.
+        
+        Args:
+            element: Playwright locator to measure
+            key: Cache key identifying the page and element
+        """
+        box = self._fresh_bbox(key)
+        if box:
+            return box
+        
+        box = await element.bounding_box()
+        if box:
+            self._bbox_cache[key] = (time.monotonic(), box)
+        return box
         
     async def random_delay(self, min_delay: Optional[int] = None, max_delay: Optional[int] = None) -> None:
         """Add random delay to simulate human thinking time.
@@ -28,14 +125,14 @@ class HumanBehaviorSimulator:
         min_ms = min_delay or self.config.action_delay_min
         max_ms = max_delay or self.config.action_delay_max
         
-        delay_ms = random.randint(min_ms, max_ms)
+        delay_ms = self.rng.randint(min_ms, max_ms)
         logger.debug(f"Random delay: {delay_ms}ms")
         await asyncio.sleep(delay_ms / 1000)
     
     async def random_pause(self) -> None:
         """Randomly pause to simulate human distraction."""
-        if random.random() < self.config.random_pause_probability:
-            pause_duration = random.randint(1000, 5000)  # 1-5 seconds
+        if self.rng.random() < self.config.random_pause_probability:
+            pause_duration = self.rng.randint(1000, 5000)  # 1-5 seconds
             logger.debug(f"Random pause: {pause_duration}ms")
             await asyncio.sleep(pause_duration / 1000)
     
@@ -52,20 +149,21 @@ class HumanBehaviorSimulator:
             if not viewport:
                 viewport = {"width": 1920, "height": 1080}
             
-            # Get target element position
+            # Get target element position (a fresh cached box means the element exists)
             element = page.locator(target_selector)
-            if await element.count() == 0:
+            key = f"{id(page)}:{target_selector}"
+            if self._fresh_bbox(key) is None and await element.count() == 0:
                 logger.warning(f"Target element not found: {target_selector}")
                 return
             
-            box = await element.bounding_box()
+            box = await self._cached_bbox(element, key)
             if not box:
                 logger.warning(f"Could not get bounding box for: {target_selector}")
                 return
             
             # Calculate target position with some randomness
-            target_x = box["x"] + box["width"] / 2 + random.randint(-10, 10)
-            target_y = box["y"] + box["height"] / 2 + random.randint(-5, 5)
+            target_x = box["x"] + box["width"] / 2 + self.rng.randint(-10, 10)
+            target_y = box["y"] + box["height"] / 2 + self.rng.randint(-5, 5)
             
             # Move mouse in curved path
             await self._move_mouse_curved(page, target_x, target_y)
@@ -81,30 +179,42 @@ class HumanBehaviorSimulator:
             target_x: Target X coordinate
             target_y: Target Y coordinate
         """
-        # Get current mouse position (approximate)
-        current_x = random.randint(100, 800)
-        current_y = random.randint(100, 600)
+        if self._last_mouse:
+            current_x, current_y = self._last_mouse
+            # Already on the target, a curved path would add nothing
+            if math.hypot(target_x - current_x, target_y - current_y) < self.MOUSE_PROXIMITY_PX:
+                await page.mouse.move(target_x, target_y)
+                self._last_mouse = (target_x, target_y)
+                return
+        else:
+            # Current mouse position is unknown, approximate it
+            current_x = self.rng.randint(100, 800)
+            current_y = self.rng.randint(100, 600)
         
-        # Calculate intermediate points for curved movement
-        steps = random.randint(3, 7)
-        points = []
+        # Cubic Bezier curve with two randomly offset control points
+        dx = target_x - current_x
+        dy = target_y - current_y
+        c1x = current_x + dx / 3 + self.rng.uniform(-20, 20)
+        c1y = current_y + dy / 3 + self.rng.uniform(-15, 15)
+        c2x = current_x + dx * 2 / 3 + self.rng.uniform(-20, 20)
+        c2y = current_y + dy * 2 / 3 + self.rng.uniform(-15, 15)
         
-        for i in range(steps + 1):
-            progress = i / steps
-            
-            # Add some curve to the movement
-            curve_offset_x = random.randint(-20, 20) * (0.5 - abs(progress - 0.5))
-            curve_offset_y = random.randint(-15, 15) * (0.5 - abs(progress - 0.5))
-            
-            x = current_x + (target_x - current_x) * progress + curve_offset_x
-            y = current_y + (target_y - current_y) * progress + curve_offset_y
-            
-            points.append((x, y))
+        # Sample the whole path and all pauses up front
+        steps = self.rng.randint(3, 7)
+        points = [
+            (
+                a * current_x + b * c1x + c * c2x + d * target_x,
+                a * current_y + b * c1y + c * c2y + d * target_y
+            )
+            for a, b, c, d in _BEZIER_WEIGHTS[steps]
+        ]
+        pauses = [self.rng.randint(10, 50) / 1000 for _ in points]
         
         # Move through each point with slight delays
-        for x, y in points:
+        for (x, y), pause in zip(points, pauses):
             await page.mouse.move(x, y)
-            await asyncio.sleep(random.randint(10, 50) / 1000)
+            await asyncio.sleep(pause)
+        self._last_mouse = (target_x, target_y)
     
     async def human_like_typing(self, element: Locator, text: str, clear_first: bool = True) -> None:
         """Type text in human-like manner with realistic delays.
@@ -115,24 +225,38 @@ class HumanBehaviorSimulator:
             clear_first: Whether to clear the field first
         """
         try:
+            if self.config.fast_mode:
+                # fill replaces the whole value in one call, so no clearing needed
+                await element.fill(text)
+                logger.debug(f"Filled text: '{text}' (fast mode)")
+                return
+            
             if clear_first:
                 await element.clear()
                 await self.random_delay(100, 300)
             
-            # Type each character with random delays
-            for char in text:
-                await element.type(char)
+            if text:
+                # Sample per-character delays and thinking pauses up front, then send
+                # each run between pauses in a single call instead of one per character
+                last = len(text) - 1
+                delays = [
+                    self.rng.randint(self.config.typing_delay_min, self.config.typing_delay_max)
+                    for _ in text
+                ]
+                pause_after = [i for i in range(last) if self.rng.random() < 0.1]  # 10% chance
                 
-                # Random typing delay
-                delay = random.randint(
-                    self.config.typing_delay_min,
-                    self.config.typing_delay_max
-                )
-                await asyncio.sleep(delay / 1000)
-                
-                # Occasional longer pause (thinking)
-                if random.random() < 0.1:  # 10% chance
-                    await asyncio.sleep(random.randint(200, 800) / 1000)
+                start = 0
+                for end in pause_after + [last]:
+                    run_delays = delays[start:end + 1]
+                    await element.press_sequentially(
+                        text[start:end + 1],
+                        delay=sum(run_delays) / len(run_delays)
+                    )
+                    
+                    # Occasional longer pause (thinking)
+                    if end < last:
+                        await asyncio.sleep(self.rng.randint(200, 800) / 1000)
+                    start = end + 1
             
             logger.debug(f"Typed text: '{text}' with human-like delays")
             
@@ -151,14 +275,14 @@ class HumanBehaviorSimulator:
             # Wait for element to be visible and enabled
             await element.wait_for(state="visible", timeout=5000)
             
-            # Get element selector for mouse movement
-            # This is a simplified approach - in practice you'd need the actual selector
-            box = await element.bounding_box()
+            # Get element position for mouse movement
+            box = await self._cached_bbox(element, f"{id(page)}:{element}")
             if box:
                 # Move mouse to element area first
-                target_x = box["x"] + box["width"] / 2 + random.randint(-5, 5)
-                target_y = box["y"] + box["height"] / 2 + random.randint(-3, 3)
+                target_x = box["x"] + box["width"] / 2 + self.rng.randint(-5, 5)
+                target_y = box["y"] + box["height"] / 2 + self.rng.randint(-3, 3)
                 await page.mouse.move(target_x, target_y)
+                self._last_mouse = (target_x, target_y)
                 
                 # Brief pause before clicking
                 await self.random_delay(100, 300)
@@ -184,14 +308,14 @@ class HumanBehaviorSimulator:
         estimated_reading_time = (content_length / 5) / 200 * 60  # seconds
         
         # Add randomness and minimum/maximum bounds
-        reading_time = max(0.5, min(10.0, estimated_reading_time * random.uniform(0.7, 1.3)))
+        reading_time = max(0.5, min(10.0, estimated_reading_time * self.rng.uniform(0.7, 1.3)))
         
         logger.debug(f"Simulating reading delay: {reading_time:.1f}s")
         await asyncio.sleep(reading_time)
     
     async def simulate_decision_making(self) -> None:
         """Simulate time spent making decisions."""
-        decision_time = random.uniform(1.0, 4.0)  # 1-4 seconds
+        decision_time = self.rng.uniform(1.0, 4.0)  # 1-4 seconds
         logger.debug(f"Simulating decision making: {decision_time:.1f}s")
         await asyncio.sleep(decision_time)
 
@@ -206,46 +330,23 @@ class BrowserFingerprinting:
         Args:
             page: Playwright page instance
         """
-        # Override navigator properties
-        await page.add_init_script("""
-            // Override navigator.webdriver
-            Object.defineProperty(navigator, 'webdriver', {
-                get: () => undefined,
-            });
-            
-            // Override navigator.plugins
-            Object.defineProperty(navigator, 'plugins', {
-                get: () => [1, 2, 3, 4, 5],
-            });
-            
-            // Override navigator.languages
-            Object.defineProperty(navigator, 'languages', {
-                get: () => ['en-US', 'en'],
-            });
-            
-            // Override screen properties with realistic values
-            Object.defineProperty(screen, 'availHeight', {
-                get: () => 1040,
-            });
-            Object.defineProperty(screen, 'availWidth', {
-                get: () => 1920,
-            });
-        """)
-        
-        # Set realistic user agent
-        await page.set_extra_http_headers({
-            'Accept-Language': 'en-US,en;q=0.9',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Upgrade-Insecure-Requests': '1',
-            'Sec-Fetch-Dest': 'document',
-            'Sec-Fetch-Mode': 'navigate',
-            'Sec-Fetch-Site': 'none',
-            'Cache-Control': 'max-age=0'
-        })
+        await page.add_init_script(_STEALTH_SCRIPT)
+        await page.set_extra_http_headers(_STEALTH_HEADERS)
         
         logger.debug("Stealth mode configured")
     
+    @staticmethod
+    async def setup_stealth_context(context: BrowserContext) -> None:
+        """Setup stealth mode once for every page of a browser context.
+        
+        Args:
+            context: Playwright browser context
+        """
+        await context.add_init_script(_STEALTH_SCRIPT)
+        await context.set_extra_http_headers(_STEALTH_HEADERS)
+        
+        logger.debug("Stealth mode configured for context")
+    
     @staticmethod
     async def randomize_viewport(page: Page) -> None:
         """Randomize viewport size within realistic bounds.
@@ -280,36 +381,67 @@ class AntiDetectionManager:
         self.behavior_simulator = HumanBehaviorSimulator(config)
         self.fingerprinting = BrowserFingerprinting()
     
-    async def setup_page(self, page: Page) -> None:
+    async def setup_context(self, context: BrowserContext) -> None:
+        """Setup a browser context so all of its pages get the stealth script.
+        
+        Args:
+            context: Playwright browser context
+        """
+        await self.fingerprinting.setup_stealth_context(context)
+    
+    async def setup_page(self, page: Page, include_stealth: bool = True) -> None:
         """Setup page with anti-detection measures.
         
         Args:
             page: Playwright page instance
+            include_stealth: Install the stealth script on the page; pass False when
+                its context was already set up with setup_context
         """
-        await self.fingerprinting.setup_stealth_mode(page)
+        if include_stealth:
+            await self.fingerprinting.setup_stealth_mode(page)
         await self.fingerprinting.randomize_viewport(page)
         logger.info("Anti-detection setup completed")
     
-    async def safe_navigate(self, page: Page, url: str) -> None:
+    async def safe_navigate(
+        self,
+        page: Page,
+        url: str,
+        on_loaded: Optional[Callable[[], Awaitable[Any]]] = None
+    ) -> Any:
         """Navigate to URL with human-like behavior.
         
         Args:
             page: Playwright page instance
             url: URL to navigate to
+            on_loaded: Optional coroutine function run concurrently with the
+                simulated reading delay, e.g. to look up elements on the new page
+            
+        Returns:
+            The result of on_loaded, or None if it was not given
         """
         logger.info(f"Navigating to: {url}")
         
         # Random delay before navigation
         await self.behavior_simulator.random_delay(500, 2000)
         
-        # Navigate
+        # Navigate; element positions from the previous page no longer apply
+        self.behavior_simulator.invalidate_bbox_cache()
+        self.behavior_simulator.reset_mouse_position()
         await page.goto(url, wait_until="domcontentloaded")
         
-        # Simulate page loading and reading time
-        await self.behavior_simulator.simulate_reading_delay(200)
+        # Simulate page loading and reading time, overlapping it with the caller's page work
+        result = None
+        if on_loaded:
+            _, result = await asyncio.gather(
+                self.behavior_simulator.simulate_reading_delay(200),
+                on_loaded()
+            )
+        else:
+            await self.behavior_simulator.simulate_reading_delay(200)
         await self.behavior_simulator.random_pause()
         
         logger.info("Navigation completed")
+        return result
     
     async def safe_click(self, element: Locator, page: Page) -> None:
         """Perform safe click with anti-detection measures.
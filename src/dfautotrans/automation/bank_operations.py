@@ -1,6 +1,5 @@
 """Bank operations module for Dead Frontier Auto Trading System."""
 
-import asyncio
 import re
 from typing import Optional, Dict, Any, Tuple
 from datetime import datetime
@@ -11,6 +10,54 @@ from ..automation.browser_manager import BrowserManager
 from ..core.page_navigator import PageNavigator
 
 
+# 餘額解析用的正則在模組加載時編譯一次；帶標籤的寫法合併成一個正則，只掃描一遍文本
+# 現金只認帶標籤的金額，頁面上其他 "$金額"（物品價格等）不會被誤認為現金
+_CASH_PATTERN = re.compile(r'(?:Cash|現金|Money):\s*\$?(\d[\d,]*)', re.IGNORECASE)
+_BANK_PATTERN = re.compile(r'(?:Bank(?:\s*Balance)?|銀行)[:\s]*\$?(\d{1,3}(?:,\d{3})*)', re.IGNORECASE)
+# 判斷是否到達銀行頁面的關鍵字，一次掃描，不需要複製一份小寫文本
+_BANK_INDICATOR_PATTERN = re.compile(r'bank|withdraw|deposit|cash|\$', re.IGNORECASE)
+# 查找 "withdraw all" 按鈕的候選選擇器
+_WITHDRAW_ALL_SELECTORS = (
+    "button:text('withdraw all')",
+    "input[value='withdraw all']",
+    "button:text('Withdraw All')",
+    "input[value='Withdraw All']",
+    "button:has-text('withdraw all')",
+    "input[type='submit'][value*='withdraw'][value*='all']",
+    ".withdraw-all",
+    "#withdrawAll",
+    "button[onclick*='withdraw'][onclick*='all']",
+)
+_WITHDRAW_ALL_SELECTOR = ", ".join(_WITHDRAW_ALL_SELECTORS)
+# 提取金額輸入框和提取按鈕，各自的候選都指向同一個元素，合併成一次查詢
+_WITHDRAW_INPUT_SELECTOR = "input[type='number']:first-of-type, input[name*='withdraw'], spinbutton:first-of-type"
+_WITHDRAW_BUTTON_SELECTOR = "button:text('withdraw'), input[value='withdraw']"
+# 查找存款金額輸入框的候選選擇器
+_DEPOSIT_INPUT_SELECTORS = (
+    "input[type='number']:nth-of-type(2)",  # Usually second number input
+    "input[name*='deposit']",
+    "spinbutton:nth-of-type(2)",
+    "input[placeholder*='deposit']",
+    "input[id*='deposit']",
+    ".deposit-input",
+    "#depositAmount",
+)
+# 查找存款按鈕的候選選擇器
+_DEPOSIT_BUTTON_SELECTORS = (
+    "button:text('deposit')",
+    "input[value='deposit']",
+    "button:text('Deposit')",
+    "input[value='Deposit']",
+    "button:has-text('deposit')",
+    "input[type='submit'][value*='deposit']",
+    ".deposit-button",
+    "#depositButton",
+    "button[onclick*='deposit']",
+)
+# 去掉金額中的 "$"、逗號和空格，str.translate 比正則替換更快
+_CURRENCY_STRIP = str.maketrans('', '', '$, ')
+
+
 @dataclass
 class BankOperationResult:
     """Result of a bank operation."""
@@ -33,9 +80,10 @@ class BankOperations:
     def __init__(self, browser_manager: BrowserManager):
         self.browser_manager = browser_manager
         
-        # Cache for bank information
-        self._bank_balance_cache: Optional[int] = None
-        self._cache_timestamp: Optional[datetime] = None
+        # Cache for cash/bank balances, keyed by name; entries are only valid
+        # for the cache token they were read under
+        self._balance_cache: Dict[str, Tuple[int, int, datetime]] = {}
+        self._cache_token = 0
         self._cache_duration = 30  # seconds
 
     @property
@@ -52,6 +100,7 @@ class BankOperations:
         # 直接導航到銀行頁面
         try:
             await self.page.goto("https://fairview.deadfrontier.com/onlinezombiemmo/index.php?page=15")
+            self._clear_cache()
             await self.page.wait_for_load_state("networkidle", timeout=10000)
             
             # 驗證是否到達銀行頁面 - 檢查頁面內容而不是標題
@@ -61,12 +110,10 @@ class BankOperations:
                 page_content = await self.page.inner_text("body")
                 
                 # 檢查是否包含銀行相關內容
-                bank_indicators = ["bank", "withdraw", "deposit", "cash", "$"]
-                has_bank_content = any(indicator.lower() in page_content.lower() for indicator in bank_indicators)
+                has_bank_content = bool(_BANK_INDICATOR_PATTERN.search(page_content))
                 
                 if has_bank_content:
                     logger.info("✅ 成功到達銀行頁面")
-                    self._clear_cache()
                     return True
                 else:
                     logger.warning("⚠️ 頁面內容不包含銀行相關信息")
@@ -88,33 +135,15 @@ class BankOperations:
             return None
             
         # Check cache first
-        if self._is_cache_valid():
-            logger.debug(f"使用緩存的銀行餘額: ${self._bank_balance_cache}")
-            return self._bank_balance_cache
-            
+        cached = self._get_cached_balance('bank')
+        if cached is not None:
+            logger.debug(f"使用緩存的銀行餘額: ${cached}")
+            return cached
+        
         try:
-            # Look for bank balance text patterns
-            bank_selectors = [
-                "text=Bank:", 
-                "[class*='bank']",
-                "[id*='bank']"
-            ]
-            
-            for selector in bank_selectors:
-                elements = await self.page.query_selector_all(selector)
-                for element in elements:
-                    text = await element.inner_text()
-                    balance = self._extract_bank_balance_from_text(text)
-                    if balance is not None:
-                        self._update_cache(balance)
-                        logger.debug(f"從選擇器 {selector} 找到銀行餘額: ${balance}")
-                        return balance
-            
-            # Try to find in page text
-            page_text = await self.page.inner_text("body")
-            balance = self._extract_bank_balance_from_text(page_text)
+            # 銀行元素的文本都包含在頁面文本中，一次讀取同時刷新現金和銀行餘額
+            _, balance = await self._read_balances()
             if balance is not None:
-                self._update_cache(balance)
                 logger.debug(f"從頁面文本找到銀行餘額: ${balance}")
                 return balance
                 
@@ -130,28 +159,17 @@ class BankOperations:
         if not await self._ensure_on_bank_page():
             return None
             
+        cached = self._get_cached_balance('cash')
+        if cached is not None:
+            logger.debug(f"使用緩存的現金: ${cached}")
+            return cached
+        
         try:
-            # 直接從頁面提取現金信息
-            page_text = await self.page.inner_text("body")
-            
-            # 查找現金模式
-            cash_patterns = [
-                r'Cash:\s*\$?([\d,]+)',
-                r'現金:\s*\$?([\d,]+)',
-                r'Money:\s*\$?([\d,]+)',
-                r'\$\s*([\d,]+)(?=\s|$)',
-            ]
-            
-            for pattern in cash_patterns:
-                matches = re.findall(pattern, page_text, re.IGNORECASE)
-                for match in matches:
-                    try:
-                        cash = int(match.replace(',', ''))
-                        if 0 <= cash <= 10000000:  # 合理範圍檢查
-                            logger.debug(f"找到現金: ${cash}")
-                            return cash
-                    except ValueError:
-                        continue
+            # 直接從頁面提取現金信息，同時刷新銀行餘額緩存
+            cash, _ = await self._read_balances()
+            if cash is not None:
+                logger.debug(f"找到現金: ${cash}")
+                return cash
             
             logger.warning("無法從頁面找到現金信息")
             return None
@@ -160,83 +178,91 @@ class BankOperations:
             logger.error(f"獲取現金時出錯: {e}")
             return None
     
+    async def get_balances_snapshot(self) -> Dict[str, Optional[int]]:
+        """Read cash and bank balance in a single page round-trip.
+        
+        Returns:
+            Dict with 'cash', 'bank' and 'total' (None when a value is missing)
+        """
+        snapshot = {'cash': None, 'bank': None, 'total': None}
+        if not await self._ensure_on_bank_page():
+            return snapshot
+        
+        try:
+            snapshot['cash'], snapshot['bank'] = await self._read_balances()
+            
+            if snapshot['cash'] is not None and snapshot['bank'] is not None:
+                snapshot['total'] = snapshot['cash'] + snapshot['bank']
+            else:
+                logger.warning("無法獲取完整的資金信息")
+            
+            logger.debug(f"資金快照: 現金 ${snapshot['cash']}, 銀行 ${snapshot['bank']}")
+            return snapshot
+            
+        except Exception as e:
+            logger.error(f"獲取資金快照時出錯: {e}")
+            return snapshot
+    
     async def get_total_available_funds(self) -> Optional[int]:
         """Get total available funds (cash + bank)."""
-        cash = await self.get_cash_on_hand()
-        bank = await self.get_bank_balance()
+        cash = self._get_cached_balance('cash')
+        bank = self._get_cached_balance('bank')
+        if cash is None or bank is None:
+            # One page read for both balances instead of separate cash and bank lookups
+            snapshot = await self.get_balances_snapshot()
+            cash, bank = snapshot['cash'], snapshot['bank']
         
         if cash is None or bank is None:
-            logger.warning("無法獲取完整的資金信息")
             return None
             
         total = cash + bank
         logger.info(f"💰 總可用資金: ${total} (現金: ${cash} + 銀行: ${bank})")
         return total
     
-    async def withdraw_funds(self, amount: int) -> BankOperationResult:
-        """Withdraw specific amount from bank."""
+    async def withdraw_funds(self, amount: int, current_bank: Optional[int] = None) -> BankOperationResult:
+        """Withdraw specific amount from bank.
+        
+        Args:
+            amount: Amount to withdraw
+            current_bank: Bank balance already known by the caller, skips reading it again
+        """
         logger.info(f"🏦 準備從銀行提取 ${amount}...")
         
         if not await self._ensure_on_bank_page():
-            return BankOperationResult(
-                success=False,
-                error_message="無法到達銀行頁面",
-                operation_type="withdraw"
-            )
+            return self._fail("withdraw", "無法到達銀行頁面")
         
         # Check if amount is valid
-        bank_balance = await self.get_bank_balance()
+        bank_balance = current_bank if current_bank is not None else await self.get_bank_balance()
         if bank_balance is None:
-            return BankOperationResult(
-                success=False,
-                error_message="無法獲取銀行餘額",
-                operation_type="withdraw"
-            )
+            return self._fail("withdraw", "無法獲取銀行餘額")
             
         if amount > bank_balance:
-            return BankOperationResult(
-                success=False,
-                error_message=f"提取金額 ${amount} 超過銀行餘額 ${bank_balance}",
-                operation_type="withdraw"
-            )
+            return self._fail("withdraw", f"提取金額 ${amount} 超過銀行餘額 ${bank_balance}")
         
         try:
             # Find withdraw input field
-            withdraw_input = await self.page.query_selector("input[type='number']:first-of-type")
-            if not withdraw_input:
-                # Try alternative selectors
-                withdraw_input = await self.page.query_selector("input[name*='withdraw']")
-                if not withdraw_input:
-                    withdraw_input = await self.page.query_selector("spinbutton:first-of-type")
+            withdraw_input = await self.page.query_selector(_WITHDRAW_INPUT_SELECTOR)
                     
             if not withdraw_input:
-                return BankOperationResult(
-                    success=False,
-                    error_message="找不到提取金額輸入框",
-                    operation_type="withdraw"
-                )
+                return self._fail("withdraw", "找不到提取金額輸入框")
             
             # Clear and fill amount
             await withdraw_input.fill("")  # Clear the input
             await withdraw_input.fill(str(amount))
             
             # Find and click withdraw button
-            withdraw_button = await self.page.query_selector("button:text('withdraw')")
-            if not withdraw_button:
-                withdraw_button = await self.page.query_selector("input[value='withdraw']")
+            withdraw_button = await self.page.query_selector(_WITHDRAW_BUTTON_SELECTOR)
                 
             if not withdraw_button:
-                return BankOperationResult(
-                    success=False,
-                    error_message="找不到提取按鈕",
-                    operation_type="withdraw"
-                )
+                return self._fail("withdraw", "找不到提取按鈕")
             
             # Click withdraw button
+            page_text_before = await self.page.inner_text("body")
             await withdraw_button.click()
             
-            # Wait for page to update
-            await asyncio.sleep(2)
+            # Wait for page to update, then cache the balances shown on the updated page
+            page_text_after = await self._wait_for_page_update(page_text_before)
+            self._refresh_cache_from_text(page_text_after)
             
             # Verify the operation
             new_bank_balance = await self.get_bank_balance()
@@ -250,38 +276,22 @@ class BankOperations:
                     operation_type="withdraw"
                 )
             else:
-                return BankOperationResult(
-                    success=False,
-                    error_message="提取操作可能失敗，餘額未按預期變化",
-                    operation_type="withdraw"
-                )
+                return self._fail("withdraw", "提取操作可能失敗，餘額未按預期變化")
                 
         except Exception as e:
             logger.error(f"提取資金時出錯: {e}")
-            return BankOperationResult(
-                success=False,
-                error_message=f"提取操作異常: {str(e)}",
-                operation_type="withdraw"
-            )
+            return self._fail("withdraw", f"提取操作異常: {str(e)}")
     
     async def withdraw_all_funds(self) -> BankOperationResult:
         """Withdraw all funds from bank."""
         logger.info("🏦 準備提取所有銀行資金...")
         
         if not await self._ensure_on_bank_page():
-            return BankOperationResult(
-                success=False,
-                error_message="無法到達銀行頁面",
-                operation_type="withdraw_all"
-            )
+            return self._fail("withdraw_all", "無法到達銀行頁面")
         
         bank_balance = await self.get_bank_balance()
         if bank_balance is None:
-            return BankOperationResult(
-                success=False,
-                error_message="無法獲取銀行餘額",
-                operation_type="withdraw_all"
-            )
+            return self._fail("withdraw_all", "無法獲取銀行餘額")
             
         if bank_balance == 0:
             logger.info("銀行餘額為 $0，無需提取")
@@ -297,38 +307,23 @@ class BankOperations:
             # Multiple strategies to find withdraw all button
             withdraw_all_button = None
             
-            # Strategy 1: Try common text patterns
-            withdraw_selectors = [
-                "button:text('withdraw all')",
-                "input[value='withdraw all']",
-                "button:text('Withdraw All')",
-                "input[value='Withdraw All']",
-                "button:has-text('withdraw all')",
-                "input[type='submit'][value*='withdraw'][value*='all']",
-                ".withdraw-all",
-                "#withdrawAll",
-                "button[onclick*='withdraw'][onclick*='all']"
-            ]
-            
-            for selector in withdraw_selectors:
-                try:
-                    withdraw_all_button = await self.page.query_selector(selector)
-                    if withdraw_all_button:
-                        logger.debug(f"找到提取所有資金按鈕: {selector}")
-                        break
-                except Exception:
-                    continue
+            # Strategy 1: Try common text patterns; every candidate targets the same
+            # button, so one combined query replaces a round-trip per selector
+            try:
+                withdraw_all_button = await self.page.query_selector(_WITHDRAW_ALL_SELECTOR)
+                if withdraw_all_button:
+                    logger.debug("找到提取所有資金按鈕")
+            except Exception as e:
+                logger.debug(f"查找 withdraw all 按鈕失敗: {e}")
+            
+            page_text_before = await self.page.inner_text("body")
             
             # Strategy 2: If no button found, try to find withdraw input field and max button
             if not withdraw_all_button:
                 logger.debug("未找到 withdraw all 按鈕，嘗試手動輸入最大金額")
                 
                 # Find withdraw input field
-                withdraw_input = await self.page.query_selector("input[type='number']:first-of-type")
-                if not withdraw_input:
-                    withdraw_input = await self.page.query_selector("input[name*='withdraw']")
-                if not withdraw_input:
-                    withdraw_input = await self.page.query_selector("spinbutton:first-of-type")
+                withdraw_input = await self.page.query_selector(_WITHDRAW_INPUT_SELECTOR)
                 
                 if withdraw_input:
                     # Clear and fill with bank balance
@@ -336,35 +331,23 @@ class BankOperations:
                     await withdraw_input.fill(str(bank_balance))
                     
                     # Find regular withdraw button
-                    withdraw_button = await self.page.query_selector("button:text('withdraw')")
-                    if not withdraw_button:
-                        withdraw_button = await self.page.query_selector("input[value='withdraw']")
+                    withdraw_button = await self.page.query_selector(_WITHDRAW_BUTTON_SELECTOR)
                     
                     if withdraw_button:
                         await withdraw_button.click()
                         logger.debug(f"使用手動輸入方式提取 ${bank_balance}")
                     else:
-                        return BankOperationResult(
-                            success=False,
-                            error_message="找不到提取按鈕",
-                            operation_type="withdraw_all"
-                        )
+                        return self._fail("withdraw_all", "找不到提取按鈕")
                 else:
-                    return BankOperationResult(
-                        success=False,
-                        error_message="找不到提取金額輸入框",
-                        operation_type="withdraw_all"
-                    )
+                    return self._fail("withdraw_all", "找不到提取金額輸入框")
             else:
                 # Click withdraw all button
                 await withdraw_all_button.click()
                 logger.debug("點擊 withdraw all 按鈕")
             
-            # Wait for page to update
-            await asyncio.sleep(3)
-            
-            # Clear cache to force fresh data
-            self._clear_cache()
+            # Wait for page to update, then cache the balances shown on the updated page
+            page_text_after = await self._wait_for_page_update(page_text_before)
+            self._refresh_cache_from_text(page_text_after)
             
             # Verify the operation
             new_bank_balance = await self.get_bank_balance()
@@ -391,52 +374,28 @@ class BankOperations:
                         operation_type="withdraw_all"
                     )
                 else:
-                    return BankOperationResult(
-                        success=False,
-                        error_message=f"提取操作未生效，銀行餘額仍為 ${new_bank_balance}",
-                        operation_type="withdraw_all"
-                    )
+                    return self._fail("withdraw_all", f"提取操作未生效，銀行餘額仍為 ${new_bank_balance}")
             else:
-                return BankOperationResult(
-                    success=False,
-                    error_message="無法驗證提取結果，無法獲取銀行餘額",
-                    operation_type="withdraw_all"
-                )
+                return self._fail("withdraw_all", "無法驗證提取結果，無法獲取銀行餘額")
                 
         except Exception as e:
             logger.error(f"提取所有資金時出錯: {e}")
-            return BankOperationResult(
-                success=False,
-                error_message=f"提取所有資金操作異常: {str(e)}",
-                operation_type="withdraw_all"
-            )
+            return self._fail("withdraw_all", f"提取所有資金操作異常: {str(e)}")
     
     async def deposit_funds(self, amount: int) -> BankOperationResult:
         """Deposit specific amount to bank."""
         logger.info(f"🏦 準備存入 ${amount} 到銀行...")
         
         if not await self._ensure_on_bank_page():
-            return BankOperationResult(
-                success=False,
-                error_message="無法到達銀行頁面",
-                operation_type="deposit"
-            )
+            return self._fail("deposit", "無法到達銀行頁面")
         
         # Check if amount is valid
         cash_on_hand = await self.get_cash_on_hand()
         if cash_on_hand is None:
-            return BankOperationResult(
-                success=False,
-                error_message="無法獲取現金餘額",
-                operation_type="deposit"
-            )
+            return self._fail("deposit", "無法獲取現金餘額")
             
         if amount > cash_on_hand:
-            return BankOperationResult(
-                success=False,
-                error_message=f"存款金額 ${amount} 超過現金餘額 ${cash_on_hand}",
-                operation_type="deposit"
-            )
+            return self._fail("deposit", f"存款金額 ${amount} 超過現金餘額 ${cash_on_hand}")
         
         bank_balance = await self.get_bank_balance()
         
@@ -445,17 +404,7 @@ class BankOperations:
             deposit_input = None
             
             # Try various selectors for deposit input
-            deposit_input_selectors = [
-                "input[type='number']:nth-of-type(2)",  # Usually second number input
-                "input[name*='deposit']",
-                "spinbutton:nth-of-type(2)",
-                "input[placeholder*='deposit']",
-                "input[id*='deposit']",
-                ".deposit-input",
-                "#depositAmount"
-            ]
-            
-            for selector in deposit_input_selectors:
+            for selector in _DEPOSIT_INPUT_SELECTORS:
                 try:
                     deposit_input = await self.page.query_selector(selector)
                     if deposit_input:
@@ -465,11 +414,7 @@ class BankOperations:
                     continue
                     
             if not deposit_input:
-                return BankOperationResult(
-                    success=False,
-                    error_message="找不到存款金額輸入框",
-                    operation_type="deposit"
-                )
+                return self._fail("deposit", "找不到存款金額輸入框")
             
             # Clear and fill amount
             await deposit_input.fill("")  # Clear the input
@@ -478,19 +423,7 @@ class BankOperations:
             # Multiple strategies to find deposit button
             deposit_button = None
             
-            deposit_button_selectors = [
-                "button:text('deposit')",
-                "input[value='deposit']",
-                "button:text('Deposit')",
-                "input[value='Deposit']",
-                "button:has-text('deposit')",
-                "input[type='submit'][value*='deposit']",
-                ".deposit-button",
-                "#depositButton",
-                "button[onclick*='deposit']"
-            ]
-            
-            for selector in deposit_button_selectors:
+            for selector in _DEPOSIT_BUTTON_SELECTORS:
                 try:
                     deposit_button = await self.page.query_selector(selector)
                     if deposit_button:
@@ -500,20 +433,15 @@ class BankOperations:
                     continue
                 
             if not deposit_button:
-                return BankOperationResult(
-                    success=False,
-                    error_message="找不到存款按鈕",
-                    operation_type="deposit"
-                )
+                return self._fail("deposit", "找不到存款按鈕")
             
             # Click deposit button
+            page_text_before = await self.page.inner_text("body")
             await deposit_button.click()
             
-            # Wait for page to update
-            await asyncio.sleep(3)
-            
-            # Clear cache to force fresh data
-            self._clear_cache()
+            # Wait for page to update, then cache the balances shown on the updated page
+            page_text_after = await self._wait_for_page_update(page_text_before)
+            self._refresh_cache_from_text(page_text_after)
             
             # Verify the operation
             new_bank_balance = await self.get_bank_balance()
@@ -530,52 +458,33 @@ class BankOperations:
                         operation_type="deposit"
                     )
                 else:
-                    return BankOperationResult(
-                        success=False,
-                        error_message=f"存款操作未生效，銀行餘額從 ${bank_balance} 變為 ${new_bank_balance}",
-                        operation_type="deposit"
-                    )
+                    return self._fail("deposit", f"存款操作未生效，銀行餘額從 ${bank_balance} 變為 ${new_bank_balance}")
             else:
-                return BankOperationResult(
-                    success=False,
-                    error_message="無法驗證存款結果，無法獲取銀行餘額",
-                    operation_type="deposit"
-                )
+                return self._fail("deposit", "無法驗證存款結果，無法獲取銀行餘額")
                 
         except Exception as e:
             logger.error(f"存款時出錯: {e}")
-            return BankOperationResult(
-                success=False,
-                error_message=f"存款操作異常: {str(e)}",
-                operation_type="deposit"
-            )
+            return self._fail("deposit", f"存款操作異常: {str(e)}")
     
     async def deposit_all_funds(self) -> BankOperationResult:
         """Deposit all cash to bank."""
         logger.info("🏦 準備存入所有現金到銀行...")
         
         if not await self._ensure_on_bank_page():
-            return BankOperationResult(
-                success=False,
-                error_message="無法到達銀行頁面",
-                operation_type="deposit_all"
-            )
+            return self._fail("deposit_all", "無法到達銀行頁面")
         
         cash_on_hand = await self.get_cash_on_hand()
         if cash_on_hand is None:
-            return BankOperationResult(
-                success=False,
-                error_message="無法獲取現金餘額",
-                operation_type="deposit_all"
-            )
+            return self._fail("deposit_all", "無法獲取現金餘額")
             
         if cash_on_hand == 0:
             logger.info("現金餘額為 $0，無需存款")
+            bank_balance = await self.get_bank_balance() or 0
             return BankOperationResult(
                 success=True,
                 amount_processed=0,
-                balance_before=await self.get_bank_balance() or 0,
-                balance_after=await self.get_bank_balance() or 0,
+                balance_before=bank_balance,
+                balance_after=bank_balance,
                 operation_type="deposit_all"
             )
         
@@ -588,17 +497,15 @@ class BankOperations:
                 deposit_all_button = await self.page.query_selector("input[value='deposit all']")
                 
             if not deposit_all_button:
-                return BankOperationResult(
-                    success=False,
-                    error_message="找不到 'deposit all' 按鈕",
-                    operation_type="deposit_all"
-                )
+                return self._fail("deposit_all", "找不到 'deposit all' 按鈕")
             
             # Click deposit all button
+            page_text_before = await self.page.inner_text("body")
             await deposit_all_button.click()
             
-            # Wait for page to update
-            await asyncio.sleep(2)
+            # Wait for page to update, then cache the balances shown on the updated page
+            page_text_after = await self._wait_for_page_update(page_text_before)
+            self._refresh_cache_from_text(page_text_after)
             
             # Verify the operation
             new_cash = await self.get_cash_on_hand()
@@ -616,31 +523,27 @@ class BankOperations:
                         operation_type="deposit_all"
                     )
             
-            return BankOperationResult(
-                success=False,
-                error_message="存入所有現金操作可能失敗",
-                operation_type="deposit_all"
-            )
+            return self._fail("deposit_all", "存入所有現金操作可能失敗")
                 
         except Exception as e:
             logger.error(f"存入所有現金時出錯: {e}")
-            return BankOperationResult(
-                success=False,
-                error_message=f"存入所有現金操作異常: {str(e)}",
-                operation_type="deposit_all"
-            )
+            return self._fail("deposit_all", f"存入所有現金操作異常: {str(e)}")
     
-    async def ensure_minimum_funds(self, required_amount: int) -> BankOperationResult:
-        """Ensure minimum funds available in cash."""
+    async def ensure_minimum_funds(self, required_amount: int,
+                                   current_cash: Optional[int] = None,
+                                   current_bank: Optional[int] = None) -> BankOperationResult:
+        """Ensure minimum funds available in cash.
+        
+        Args:
+            required_amount: Cash needed on hand
+            current_cash: Cash already known by the caller, skips reading it again
+            current_bank: Bank balance already known by the caller, skips reading it again
+        """
         logger.info(f"💰 確保現金至少有 ${required_amount}...")
         
-        cash_on_hand = await self.get_cash_on_hand()
+        cash_on_hand = current_cash if current_cash is not None else await self.get_cash_on_hand()
         if cash_on_hand is None:
-            return BankOperationResult(
-                success=False,
-                error_message="無法獲取現金餘額",
-                operation_type="ensure_funds"
-            )
+            return self._fail("ensure_funds", "無法獲取現金餘額")
         
         if cash_on_hand >= required_amount:
             logger.info(f"✅ 現金餘額 ${cash_on_hand} 已滿足需求 ${required_amount}")
@@ -654,26 +557,18 @@ class BankOperations:
         
         # Need to withdraw from bank
         needed_amount = required_amount - cash_on_hand
-        bank_balance = await self.get_bank_balance()
+        bank_balance = current_bank if current_bank is not None else await self.get_bank_balance()
         
         if bank_balance is None:
-            return BankOperationResult(
-                success=False,
-                error_message="無法獲取銀行餘額",
-                operation_type="ensure_funds"
-            )
+            return self._fail("ensure_funds", "無法獲取銀行餘額")
         
         if bank_balance < needed_amount:
             total_available = cash_on_hand + bank_balance
-            return BankOperationResult(
-                success=False,
-                error_message=f"總可用資金 ${total_available} 不足，需要 ${required_amount}",
-                operation_type="ensure_funds"
-            )
+            return self._fail("ensure_funds", f"總可用資金 ${total_available} 不足，需要 ${required_amount}")
         
         # Withdraw needed amount
         logger.info(f"🏦 從銀行提取 ${needed_amount} 以滿足資金需求...")
-        return await self.withdraw_funds(needed_amount)
+        return await self.withdraw_funds(needed_amount, current_bank=bank_balance)
     
     async def get_player_resources(self):
         """Get complete player resources information."""
@@ -725,44 +620,112 @@ class BankOperations:
         logger.info("不在銀行頁面，正在導航...")
         return await self.navigate_to_bank()
     
+    async def _wait_for_page_update(self, previous_text: str, timeout: int = 5000) -> Optional[str]:
+        """Wait until the bank balance shown on the page changes after a bank action.
+        
+        Other text changes (e.g. a status message) don't count, so the returned text
+        already reflects the new balance.
+        
+        Returns:
+            The updated body text, or None if no change was observed
+        """
+        try:
+            handle = await self.page.wait_for_function(
+                """([previous, pattern]) => {
+                    const bankRe = new RegExp(pattern, 'i');
+                    const bankOf = value => (value.match(bankRe) || [])[1];
+                    const text = document.body.innerText;
+                    return text !== previous && bankOf(text) !== bankOf(previous) ? text : false;
+                }""",
+                arg=[previous_text, _BANK_PATTERN.pattern],
+                timeout=timeout
+            )
+            return await handle.json_value()
+        except Exception as e:
+            # The action may reload the page or not change the text at all
+            logger.debug(f"等待頁面文本變化失敗，改為等待網絡空閒: {e}")
+            try:
+                await self.page.wait_for_load_state("networkidle", timeout=1500)
+            except Exception:
+                pass
+            return None
+    
+    def _extract_cash_from_text(self, text: str) -> Optional[int]:
+        """Extract cash on hand from page text."""
+        if not text:
+            return None
+        
+        # 查找 "Cash: $amount" / "現金: $amount" / "Money: $amount"
+        match = _CASH_PATTERN.search(text)
+        return int(match.group(1).translate(_CURRENCY_STRIP)) if match else None
+    
     def _extract_bank_balance_from_text(self, text: str) -> Optional[int]:
         """Extract bank balance from text."""
         if not text:
             return None
         
-        # Look for "Bank: $amount" pattern
-        bank_patterns = [
-            r'Bank:\s*\$?(\d{1,3}(?:,\d{3})*)',
-            r'銀行:\s*\$?(\d{1,3}(?:,\d{3})*)',
-            r'bank[:\s]*\$?(\d{1,3}(?:,\d{3})*)',
-            r'Bank Balance[:\s]*\$?(\d{1,3}(?:,\d{3})*)'
-        ]
-        
-        for pattern in bank_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                amount_str = match.group(1).replace(',', '')
-                try:
-                    return int(amount_str)
-                except ValueError:
-                    continue
+        # Look for "Bank: $amount" / "Bank Balance: $amount" / "銀行: $amount"
+        match = _BANK_PATTERN.search(text)
+        return int(match.group(1).translate(_CURRENCY_STRIP)) if match else None
+    
+    @staticmethod
+    def _fail(operation_type: str, error_message: str) -> BankOperationResult:
+        """Build a failed operation result."""
+        return BankOperationResult(
+            success=False,
+            error_message=error_message,
+            operation_type=operation_type
+        )
+    
+    async def _read_balances(self) -> Tuple[Optional[int], Optional[int]]:
+        """Read cash and bank balance from one body text read and cache both.
         
-        return None
+        Returns:
+            Tuple of (cash, bank), each None when not found on the page
+        """
+        token = self._cache_token
+        page_text = await self.page.inner_text("body")
+        return self._cache_balances_from_text(page_text, token)
     
-    def _is_cache_valid(self) -> bool:
-        """Check if cache is still valid."""
-        if self._bank_balance_cache is None or self._cache_timestamp is None:
-            return False
+    def _cache_balances_from_text(self, text: str, token: int) -> Tuple[Optional[int], Optional[int]]:
+        """Parse cash and bank balance from page text and cache whatever was found."""
+        cash = self._extract_cash_from_text(text)
+        bank = self._extract_bank_balance_from_text(text)
+        if cash is not None:
+            self._update_cache('cash', cash, token)
+        if bank is not None:
+            self._update_cache('bank', bank, token)
+        return cash, bank
+    
+    def _refresh_cache_from_text(self, text: Optional[str]) -> None:
+        """Replace cached balances after a bank action.
         
-        elapsed = (datetime.now() - self._cache_timestamp).total_seconds()
-        return elapsed < self._cache_duration
+        Balances are taken from the updated page text when it is available, so the
+        verification that follows does not need another page read.
+        """
+        self._clear_cache()
+        if text:
+            self._cache_balances_from_text(text, self._cache_token)
+    
+    def _get_cached_balance(self, key: str) -> Optional[int]:
+        """Return a cached balance if it was read under the current token and is fresh."""
+        entry = self._balance_cache.get(key)
+        if entry is None:
+            return None
+        
+        token, value, timestamp = entry
+        elapsed = (datetime.now() - timestamp).total_seconds()
+        if token != self._cache_token or elapsed >= self._cache_duration:
+            return None
+        return value
     
-    def _update_cache(self, balance: int) -> None:
-        """Update balance cache."""
-        self._bank_balance_cache = balance
-        self._cache_timestamp = datetime.now()
+    def _update_cache(self, key: str, value: int, token: int) -> None:
+        """Update balance cache unless the cache was invalidated during the read."""
+        if token != self._cache_token:
+            return
+        self._balance_cache[key] = (token, value, datetime.now())
     
     def _clear_cache(self) -> None:
-        """Clear balance cache."""
-        self._bank_balance_cache = None
-        self._cache_timestamp = None 
\ No newline at end of file
+        """Clear balance cache and invalidate reads that are still in flight."""
+        self._cache_token += 1
+        self._balance_cache.clear() 
\ No newline at end of file
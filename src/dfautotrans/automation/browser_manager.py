@@ -1,8 +1,11 @@
 """Browser management for Dead Frontier Auto Trading System."""
 
 import asyncio
+import time
+from contextlib import asynccontextmanager
 from typing import Optional, List, Dict, Any
 from playwright.async_api import async_playwright, Browser, BrowserContext, Page, Locator
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 
 from ..config.settings import Settings, BrowserConfig
 from ..data.models import MarketItemData, UserProfileData, SearchResult
@@ -11,6 +14,10 @@ from .anti_detection import AntiDetectionManager
 
 logger = get_browser_logger()
 
+# Static assets isolated read-only sessions never need; stylesheets are kept
+# because visibility checks and clicks depend on layout.
+BLOCKED_ASSET_GLOB = "**/*.{png,jpg,jpeg,gif,webp,svg,ico,woff,woff2,ttf,otf}"
+
 
 class DeadFrontierSelectors:
     """CSS selectors for Dead Frontier elements based on MCP testing."""
@@ -69,6 +76,8 @@ class BrowserManager:
         self._error_count = 0
         self._max_errors = 5
         self._last_page_load_time = None
+        self._session_state: Optional[Dict[str, Any]] = None
+        self._named_contexts: Dict[str, BrowserContext] = {}
         
         # Enhanced monitoring
         self._page_load_timeout = settings.browser.timeout
@@ -95,20 +104,18 @@ class BrowserManager:
                 ]
             )
             
-            # Create context
-            self.context = await self.browser.new_context(
-                viewport={
-                    'width': self.browser_config.viewport_width,
-                    'height': self.browser_config.viewport_height
-                },
-                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-            )
+            # Create context, restoring the saved login state when it is recent
+            saved_state = self._saved_storage_state()
+            if saved_state:
+                logger.info("Restoring saved browser storage state")
+            self.context = await self._create_context(saved_state)
+            self._session_state = None
             
             # Create page
             self.page = await self.context.new_page()
             
-            # Setup anti-detection
-            await self.anti_detection.setup_page(self.page)
+            # Setup anti-detection (stealth script is already on the context)
+            await self.anti_detection.setup_page(self.page, include_stealth=False)
             
             # Set default timeout
             self.page.set_default_timeout(self.browser_config.timeout)
@@ -124,9 +131,128 @@ class BrowserManager:
             await self.cleanup()
             raise
     
+    def _saved_storage_state(self) -> Optional[str]:
+        """Path of the saved storage state if it exists and has not expired."""
+        path = self.settings.storage_state_path
+        try:
+            age = time.time() - path.stat().st_mtime
+        except OSError:
+            return None
+        
+        if age > self.settings.session_timeout_hours * 3600:
+            logger.debug("Saved storage state is too old, starting with a fresh context")
+            return None
+        return str(path)
+    
+    async def _create_context(self, storage_state: Optional[Any] = None) -> BrowserContext:
+        """Create a browser context with the standard options and stealth script."""
+        context = await self.browser.new_context(storage_state=storage_state, **self._context_options())
+        await self.anti_detection.setup_context(context)
+        return context
+    
+    def _context_options(self) -> Dict[str, Any]:
+        """Options shared by every browser context this manager creates."""
+        return {
+            'viewport': {
+                'width': self.browser_config.viewport_width,
+                'height': self.browser_config.viewport_height
+            },
+            'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+        }
+    
+    async def capture_session_state(self) -> Dict[str, Any]:
+        """Snapshot the context's cookies and storage for isolated sessions.
+        
+        Call once after login; isolated_session() reuses the snapshot instead
+        of serializing the context again for every child.
+        """
+        if not self.context:
+            raise RuntimeError("Browser not started")
+        
+        self._session_state = await self.context.storage_state()
+        logger.debug("Captured browser session state")
+        return self._session_state
+    
+    async def get_or_create_context(self, name: str) -> BrowserContext:
+        """Return a named context on the running browser, creating it once.
+        
+        New contexts are seeded with the captured login state, so callers can
+        keep one long-lived context per phase instead of relaunching the
+        browser. Named contexts are closed by cleanup().
+        """
+        if not self.browser or not self.context:
+            raise RuntimeError("Browser not started")
+        
+        context = self._named_contexts.get(name)
+        if context is None:
+            storage_state = self._session_state or await self.capture_session_state()
+            context = await self._create_context(storage_state)
+            self._named_contexts[name] = context
+            logger.debug(f"Created browser context '{name}'")
+        return context
+    
+    async def new_page(self, context_name: Optional[str] = None) -> Page:
+        """Open an extra page on the main context or on a named context.
+        
+        The page gets the same anti-detection setup and timeout as the main
+        page; the caller is responsible for closing it.
+        """
+        if not self.context:
+            raise RuntimeError("Browser not started")
+        
+        context = await self.get_or_create_context(context_name) if context_name else self.context
+        page = await context.new_page()
+        await self.anti_detection.setup_page(page, include_stealth=False)
+        page.set_default_timeout(self.browser_config.timeout)
+        return page
+    
+    @asynccontextmanager
+    async def isolated_session(self, block_assets: Optional[bool] = None):
+        """Yield a BrowserManager on its own context that shares this login.
+        
+        The child reuses the running browser; only the context and page are
+        new, seeded with this context's cookies and storage so it does not
+        need to log in again. The child context is closed on exit.
+        
+        Args:
+            block_assets: Abort image and font requests in the child context;
+                defaults to ``browser.block_isolated_assets``
+        """
+        if block_assets is None:
+            block_assets = self.browser_config.block_isolated_assets
+        
+        if not self.browser or not self.context:
+            raise RuntimeError("Browser not started")
+        
+        storage_state = self._session_state or await self.capture_session_state()
+        
+        child = BrowserManager(self.settings)
+        child.playwright = self.playwright
+        child.browser = self.browser
+        child.context = await self._create_context(storage_state)
+        
+        try:
+            if block_assets:
+                await child.context.route(BLOCKED_ASSET_GLOB, lambda route: route.abort())
+            child.page = await child.context.new_page()
+            await child.anti_detection.setup_page(child.page, include_stealth=False)
+            child.page.set_default_timeout(self.browser_config.timeout)
+            child.is_logged_in = self.is_logged_in
+            child._initialized = True
+            logger.debug("Isolated browser session opened")
+            
+            yield child
+            
+        finally:
+            await child.context.close()
+            logger.debug("Isolated browser session closed")
+    
     async def cleanup(self) -> None:
         """Clean up browser resources."""
         try:
+            for context in self._named_contexts.values():
+                await context.close()
+            self._named_contexts.clear()
             if self.page:
                 await self.page.close()
             if self.context:
@@ -136,6 +262,7 @@ class BrowserManager:
             if self.playwright:
                 await self.playwright.stop()
             
+            self._session_state = None
             logger.info("Browser cleanup completed")
             
         except Exception as e:
@@ -177,6 +304,16 @@ class BrowserManager:
             logger.error(f"Error during login process: {e}")
             return False
     
+    async def _wait_for_search_input(self) -> bool:
+        """Wait for the marketplace search input, which may be added after DOMContentLoaded."""
+        try:
+            await self.page.locator(DeadFrontierSelectors.SEARCH_INPUT).first.wait_for(
+                timeout=self._page_load_timeout
+            )
+            return True
+        except PlaywrightTimeoutError:
+            return False
+    
     async def navigate_to_marketplace(self, login_handler=None) -> None:
         """Navigate to Dead Frontier marketplace.
         
@@ -195,7 +332,12 @@ class BrowserManager:
         
         logger.info("Navigating to marketplace...")
         
-        await self.anti_detection.safe_navigate(self.page, self.settings.marketplace_url)
+        # Wait for the search input while the simulated reading delay runs
+        search_input_found = await self.anti_detection.safe_navigate(
+            self.page,
+            self.settings.marketplace_url,
+            on_loaded=self._wait_for_search_input
+        )
         self.current_page_type = "marketplace"
         
         # Wait for page to load
@@ -206,7 +348,7 @@ class BrowserManager:
         logger.info(f"Page title: {page_title}")
         
         # Verify we're on the marketplace
-        if await self.page.locator(DeadFrontierSelectors.SEARCH_INPUT).count() > 0:
+        if search_input_found:
             logger.info("Successfully navigated to marketplace")
         else:
             logger.warning("Marketplace elements not found")
@@ -217,6 +359,7 @@ class BrowserManager:
             if await self.page.locator('input[type="password"]').count() > 0:
                 logger.warning("Login form detected - session may have expired")
                 self.is_logged_in = False
+                self._session_state = None
     
     async def search_items(self, search_term: str, category: str = "Everything") -> SearchResult:
         """Search for items in the marketplace.
@@ -20,14 +20,15 @@ class CookieManager:
         self.database_manager = database_manager
         
         # Cookie storage paths
-        self.cookies_dir = self.settings.project_root / "cache" / "cookies"
+        self.cookies_dir = self.settings.cookies_dir
         self.cookies_dir.mkdir(parents=True, exist_ok=True)
         
         self.session_file = self.cookies_dir / "session.json"
-        self.cookies_file = self.cookies_dir / "cookies.json"
+        self.cookies_file = self.cookies_dir / "cookies.json"  # 舊版本的 cookies 備份，僅用於清理
+        self.storage_state_file = self.settings.storage_state_path
         
         # Session validation settings
-        self.session_timeout = timedelta(hours=24)  # 24小時會話超時
+        self.session_timeout = timedelta(hours=self.settings.session_timeout_hours)
         self.cookie_domains = [
             "deadfrontier.com",
             "www.deadfrontier.com", 
@@ -37,7 +38,11 @@ class CookieManager:
         logger.info(f"Cookie manager initialized, storage: {self.cookies_dir}")
     
     async def save_session(self, context: BrowserContext, page: Page) -> bool:
-        """Save current browser session (cookies + session info)."""
+        """Save current browser session.
+        
+        Cookies and localStorage go to the Playwright storage state file;
+        session.json (and the database) only keep the session metadata.
+        """
         try:
             # Get all cookies
             cookies = await context.cookies()
@@ -58,10 +63,13 @@ class CookieManager:
             # Try to extract user info from page
             user_info = await self._extract_user_info(page)
             
-            # Create session data
+            # Save cookies + localStorage in Playwright's native format
+            await context.storage_state(path=str(self.storage_state_file))
+            
+            # Create session metadata
             session_data = {
                 "timestamp": datetime.now().isoformat(),
-                "cookies": relevant_cookies,
+                "cookie_count": len(relevant_cookies),
                 "last_url": current_url,
                 "user_info": user_info,
                 "session_valid": True,
@@ -72,10 +80,6 @@ class CookieManager:
             with open(self.session_file, 'w', encoding='utf-8') as f:
                 json.dump(session_data, f, indent=2, ensure_ascii=False)
             
-            # Also save cookies separately for backup
-            with open(self.cookies_file, 'w', encoding='utf-8') as f:
-                json.dump(relevant_cookies, f, indent=2, ensure_ascii=False)
-            
             # Save to database if available
             if self.database_manager:
                 await self._save_session_to_db(session_data)
@@ -107,8 +111,9 @@ class CookieManager:
                 await self.clear_session()
                 return False
             
-            # Load cookies into context
-            cookies = session_data.get("cookies", [])
+            # Load cookies into context (contexts started from the storage
+            # state file already have them; adding them again is harmless)
+            cookies = session_data.get("cookies") or self._load_storage_state_cookies()
             if cookies:
                 await context.add_cookies(cookies)
                 logger.info(f"✅ 已恢復會話: {len(cookies)} cookies")
@@ -193,6 +198,10 @@ class CookieManager:
                 self.cookies_file.unlink()
                 logger.debug("已刪除 cookies 文件")
             
+            if self.storage_state_file.exists():
+                self.storage_state_file.unlink()
+                logger.debug("已刪除 storage state 文件")
+            
             # Clear from database
             if self.database_manager:
                 await self._clear_session_from_db()
@@ -215,7 +224,7 @@ class CookieManager:
                 "expires_at": session_data.get("expires_at"),
                 "last_url": session_data.get("last_url"),
                 "user_info": session_data.get("user_info", {}),
-                "cookie_count": len(session_data.get("cookies", [])),
+                "cookie_count": self._cookie_count(session_data),
                 "is_valid": await self._is_session_valid(session_data)
             }
             
@@ -309,32 +318,50 @@ class CookieManager:
                 return False
             
             # Check if cookies exist
-            cookies = session_data.get("cookies", [])
-            if not cookies:
+            if not self._cookie_count(session_data):
                 logger.debug("會話中沒有 cookies")
                 return False
             
+            if "cookies" not in session_data and not self.storage_state_file.exists():
+                logger.debug("storage state 文件不存在")
+                return False
+            
             return True
             
         except Exception as e:
             logger.debug(f"驗證會話數據失敗: {e}")
             return False
     
+    def _cookie_count(self, session_data: Dict[str, Any]) -> int:
+        """Get cookie count from session metadata (older files embed the cookies)."""
+        return session_data.get("cookie_count", len(session_data.get("cookies", [])))
+    
+    def _load_storage_state_cookies(self) -> List[Dict[str, Any]]:
+        """Load cookies from the saved Playwright storage state file."""
+        try:
+            if not self.storage_state_file.exists():
+                return []
+            
+            with open(self.storage_state_file, 'r', encoding='utf-8') as f:
+                return json.load(f).get("cookies", [])
+                
+        except Exception as e:
+            logger.debug(f"從 storage state 文件加載 cookies 失敗: {e}")
+            return []
+    
     async def _save_session_to_db(self, session_data: Dict[str, Any]) -> None:
-        """Save session data to database."""
+        """Save session metadata to database."""
         try:
             if not self.database_manager:
                 return
             
-            # Convert session data to JSON string for storage
+            # Only metadata goes to the database; cookies stay in the storage state file
             session_json = json.dumps(session_data, ensure_ascii=False)
             
-            async with self.database_manager.get_session() as session:
-                # Save as system state
-                await self.database_manager.save_system_state({
-                    "current_state": "SESSION_SAVED",
-                    "state_data": session_json
-                })
+            await self.database_manager.save_system_state({
+                "current_state": "SESSION_SAVED",
+                "state_data": session_json
+            })
             
             logger.debug("會話數據已保存到數據庫")
             
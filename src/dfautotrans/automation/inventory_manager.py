@@ -2,8 +2,10 @@
 
 import asyncio
 import re
+from contextlib import asynccontextmanager
 from typing import Optional, List, Dict, Any
 from datetime import datetime
+from dataclasses import dataclass
 from loguru import logger
 
 from ..config.settings import Settings
@@ -12,17 +14,15 @@ from ..core.page_navigator import PageNavigator
 from ..data.models import InventoryItemData, SellingSlotsStatus
 
 
+@dataclass(slots=True, frozen=True)
 class InventoryItem:
     """Represents an individual inventory item."""
-    
-    def __init__(self, slot: int, item_type: str, item_name: str, quantity: int = 1, 
-                 quality: int = 1, item_category: str = "item"):
-        self.slot = slot
-        self.item_type = item_type  # e.g., "127rifleammo", "freshvegetables_cooked"
-        self.item_name = item_name  # e.g., "12.7 Rifle Bullets", "Cooked Fresh Vegetables"
-        self.quantity = quantity
-        self.quality = quality
-        self.item_category = item_category  # "ammo", "item", etc.
+    slot: int
+    item_type: str  # e.g., "127rifleammo", "freshvegetables_cooked"
+    item_name: str  # e.g., "12.7 Rifle Bullets", "Cooked Fresh Vegetables"
+    quantity: int = 1
+    quality: int = 1
+    item_category: str = "item"  # "ammo", "item", etc.
     
     def __str__(self):
         if self.quantity > 1:
@@ -54,6 +54,9 @@ class InventoryManager:
         self._cache_timestamp: Optional[datetime] = None
         self._cache_duration = 30  # seconds
         
+        # 倉庫頁面會話：期間內已在倉庫頁面時不再重新導航
+        self._in_storage_session = False
+        
         # Item type to name mapping
         self.item_type_mapping = {
             '127rifleammo': '12.7 Rifle Bullets',
@@ -69,11 +72,29 @@ class InventoryManager:
             raise RuntimeError("Browser page not initialized")
         return self.browser_manager.page
     
+    @asynccontextmanager
+    async def storage_session(self):
+        """Stay on the storage page for a block of operations.
+        
+        Navigates once on entry; inside the block status reads re-scrape the
+        current page instead of reloading it. A deposit or withdraw click ends
+        the shortcut, so checks after it see a freshly loaded page.
+        """
+        if self._in_storage_session:
+            yield self
+            return
+        
+        self._in_storage_session = await self.page_navigator.navigate_to_storage()
+        try:
+            yield self
+        finally:
+            self._in_storage_session = False
+    
     async def get_inventory_status(self) -> Dict[str, Any]:
         """Get current inventory status with detailed item information."""
         try:
             # Navigate to storage page to access inventory info
-            if not await self.page_navigator.navigate_to_storage():
+            if not await self._ensure_on_storage_page():
                 return {'used': 0, 'total': 26, 'items': []}
                 
             # Extract inventory information
@@ -96,7 +117,7 @@ class InventoryManager:
         """Get current storage status with detailed item information."""
         try:
             # Navigate to storage page
-            if not await self.page_navigator.navigate_to_storage():
+            if not await self._ensure_on_storage_page():
                 return {'used': 0, 'total': 40, 'items': []}
                 
             # Extract storage information
@@ -115,6 +136,78 @@ class InventoryManager:
             logger.error(f"獲取倉庫狀態時出錯: {e}")
             return {'used': 0, 'total': 40, 'items': []}
     
+    async def get_combined_status(self) -> Dict[str, Dict[str, Any]]:
+        """Get inventory and storage status from a single storage page scrape."""
+        default_status = {
+            'inventory': {'used': 0, 'total': 26, 'items': []},
+            'storage': {'used': 0, 'total': 40, 'items': []}
+        }
+        
+        try:
+            # Navigate to storage page once for both containers
+            if not await self._ensure_on_storage_page():
+                return default_status
+            
+            # 一次頁面執行同時讀取庫存和倉庫槽位
+            slot_data = await self.page.evaluate("""
+                () => {
+                    const readSlots = (selector, slotNumber) => {
+                        const slots = Array.from(document.querySelectorAll(selector));
+                        const items = [];
+                        slots.forEach((slot, index) => {
+                            const item = slot.querySelector('.item');
+                            if (item) {
+                                items.push({
+                                    slot: slotNumber(slot, index),
+                                    type: item.getAttribute('data-type'),
+                                    quantity: item.getAttribute('data-quantity'),
+                                    quality: item.getAttribute('data-quality'),
+                                    category: item.getAttribute('data-itemtype')
+                                });
+                            }
+                        });
+                        return {total: slots.length, items: items};
+                    };
+                    
+                    return {
+                        inventory: readSlots('#inventory td.validSlot', (slot, index) => index + 1),
+                        storage: readSlots('#storage #normalContainer .slot.validSlot',
+                                           (slot) => parseInt(slot.getAttribute('data-slot')) || 0)
+                    };
+                }
+            """)
+            
+            combined = {}
+            for key, data in slot_data.items():
+                if not data['total']:
+                    logger.warning(f"無法找到{'庫存' if key == 'inventory' else '倉庫'}槽位元素")
+                    combined[key] = default_status[key]
+                    continue
+                
+                items = []
+                for raw in data['items']:
+                    try:
+                        items.append(self._build_inventory_item(
+                            raw['slot'], raw['type'], raw['quantity'], raw['quality'], raw['category']
+                        ))
+                    except Exception as e:
+                        logger.error(f"解析物品元素時出錯: {e}")
+                combined[key] = {
+                    'used': len(data['items']),
+                    'total': data['total'],
+                    'items': items
+                }
+            
+            logger.debug(
+                f"合併狀態: 庫存 {combined['inventory']['used']}/{combined['inventory']['total']}，"
+                f"倉庫 {combined['storage']['used']}/{combined['storage']['total']}"
+            )
+            return combined
+            
+        except Exception as e:
+            logger.error(f"獲取合併狀態時出錯: {e}")
+            return default_status
+    
     async def check_inventory_full(self) -> bool:
         """Check if inventory is full."""
         status = await self.get_inventory_status()
@@ -130,7 +223,7 @@ class InventoryManager:
         
         try:
             # Navigate to storage page
-            if not await self.page_navigator.navigate_to_storage():
+            if not await self._ensure_on_storage_page():
                 logger.error("❌ 無法導航到倉庫頁面")
                 return False
             
@@ -205,6 +298,9 @@ class InventoryManager:
                 logger.error("❌ 所有點擊方法都失敗")
                 return False
             
+            # 存入會改變頁面內容，之後的檢查需重新加載倉庫頁面
+            self._in_storage_session = False
+            
             # Wait for operation to complete with longer timeout
             logger.info("⏳ 等待存入操作完成...")
             await asyncio.sleep(5)  # 增加等待時間
@@ -258,7 +354,7 @@ class InventoryManager:
             logger.info("開始從倉庫取出所有物品...")
             
             # 導航到倉庫頁面
-            if not await self.page_navigator.navigate_to_storage():
+            if not await self._ensure_on_storage_page():
                 logger.error("無法導航到倉庫頁面")
                 return False
             
@@ -294,6 +390,8 @@ class InventoryManager:
                     
                     # 點擊取出按鈕
                     await button.click()
+                    # 取出會改變頁面內容，之後的檢查需重新加載倉庫頁面
+                    self._in_storage_session = False
                     
                     # 等待頁面更新
                     await asyncio.sleep(1)
@@ -329,14 +427,18 @@ class InventoryManager:
             logger.error(f"從倉庫取出物品失敗: {e}")
             return False
     
-    async def get_inventory_items(self) -> List[InventoryItem]:
-        """Get list of items currently in inventory with full details."""
+    async def get_inventory_items(self, limit: Optional[int] = None) -> List[InventoryItem]:
+        """Get list of items currently in inventory with full details.
+        
+        Args:
+            limit: Stop parsing after this many items; None parses every slot
+        """
         try:
             if not await self._ensure_on_inventory_accessible_page():
                 return []
             
             # Extract inventory items
-            items = await self._extract_inventory_items()
+            items = await self._extract_inventory_items(limit)
             logger.debug(f"獲取到 {len(items)} 件庫存物品")
             return items
             
@@ -442,6 +544,12 @@ class InventoryManager:
     
     # Private helper methods
     
+    async def _ensure_on_storage_page(self) -> bool:
+        """Navigate to storage page unless a storage session already holds it."""
+        if self._in_storage_session and "page=50" in self.page.url:
+            return True
+        return await self.page_navigator.navigate_to_storage()
+    
     async def _ensure_on_inventory_accessible_page(self) -> bool:
         """Ensure we are on a page where inventory is accessible."""
         if self.page is None:
@@ -456,8 +564,13 @@ class InventoryManager:
         logger.info("不在可訪問庫存的頁面，導航到市場頁面...")
         return await self.page_navigator.navigate_to_marketplace()
     
-    async def _extract_inventory_info(self) -> Optional[Dict[str, Any]]:
-        """Extract inventory information from current page using actual DOM structure."""
+    async def _extract_inventory_info(self, limit: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Extract inventory information from current page using actual DOM structure.
+        
+        Args:
+            limit: Stop scanning after this many items; the slot counts then
+                only cover the slots scanned so far
+        """
         try:
             # 使用實際的HTML結構 - 庫存使用table結構
             inventory_slots = await self.page.query_selector_all("#inventory td.validSlot")
@@ -470,6 +583,9 @@ class InventoryManager:
             items = []
             
             for i, slot in enumerate(inventory_slots, 1):
+                if limit is not None and len(items) >= limit:
+                    break
+                
                 # 檢查槽位中是否有物品
                 item_element = await slot.query_selector('.item')
                 if item_element:
@@ -536,30 +652,13 @@ class InventoryManager:
         """Parse item element to extract detailed item information."""
         try:
             # 提取物品屬性
-            item_type = await item_element.get_attribute('data-type') or 'unknown'
+            item_type = await item_element.get_attribute('data-type')
             quantity_str = await item_element.get_attribute('data-quantity')
             quality_str = await item_element.get_attribute('data-quality')
-            item_category = await item_element.get_attribute('data-itemtype') or 'item'
-            
-            # 處理數量（子彈等有數量，其他物品默認為1）
-            quantity = int(quantity_str) if quantity_str else 1
-            quality = int(quality_str) if quality_str else 1
-            
-            # 使用配置映射獲取物品名稱
-            from ..config.trading_config import config_manager
-            item_name = config_manager.get_item_name_by_id(item_type)
-            
-            # 如果配置映射中沒有找到，使用舊的映射或默認名稱
-            if not item_name:
-                item_name = self.item_type_mapping.get(item_type, item_type.replace('_', ' ').title())
-            
-            item_info = InventoryItem(
-                slot=slot_number,
-                item_type=item_type,
-                item_name=item_name,
-                quantity=quantity,
-                quality=quality,
-                item_category=item_category
+            item_category = await item_element.get_attribute('data-itemtype')
+            
+            item_info = self._build_inventory_item(
+                slot_number, item_type, quantity_str, quality_str, item_category
             )
             
             logger.debug(f"解析物品: 槽位{slot_number} - {item_info}")
@@ -569,6 +668,33 @@ class InventoryManager:
             logger.error(f"解析物品元素時出錯: {e}")
             return None
     
+    def _build_inventory_item(self, slot_number: int, item_type: Optional[str],
+                              quantity_str: Optional[str], quality_str: Optional[str],
+                              item_category: Optional[str]) -> InventoryItem:
+        """Build an InventoryItem from raw item element attributes."""
+        item_type = item_type or 'unknown'
+        
+        # 處理數量（子彈等有數量，其他物品默認為1）
+        quantity = int(quantity_str) if quantity_str else 1
+        quality = int(quality_str) if quality_str else 1
+        
+        # 使用配置映射獲取物品名稱
+        from ..config.trading_config import config_manager
+        item_name = config_manager.get_item_name_by_id(item_type)
+        
+        # 如果配置映射中沒有找到，使用舊的映射或默認名稱
+        if not item_name:
+            item_name = self.item_type_mapping.get(item_type, item_type.replace('_', ' ').title())
+        
+        return InventoryItem(
+            slot=slot_number,
+            item_type=item_type,
+            item_name=item_name,
+            quantity=quantity,
+            quality=quality,
+            item_category=item_category or 'item'
+        )
+    
     async def _extract_selling_slots_info(self) -> Optional[Dict[str, Any]]:
         """Extract selling slots information from marketplace page."""
         try:
@@ -611,10 +737,10 @@ class InventoryManager:
             logger.error(f"提取銷售位信息時出錯: {e}")
             return None
     
-    async def _extract_inventory_items(self) -> List[InventoryItem]:
+    async def _extract_inventory_items(self, limit: Optional[int] = None) -> List[InventoryItem]:
         """Extract list of items in inventory with full details."""
         try:
-            inventory_info = await self._extract_inventory_info()
+            inventory_info = await self._extract_inventory_info(limit)
             if inventory_info and inventory_info.get('items'):
                 return inventory_info['items']
             return []
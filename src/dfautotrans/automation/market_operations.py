@@ -14,6 +14,13 @@ from ..core.page_navigator import PageNavigator
 from ..data.models import MarketItemData, SellingSlotsStatus, TradeType
 
 
+# 文本解析用的正則在模組加載時編譯一次
+_SLOTS_PATTERN = re.compile(r'(\d+)\s*/\s*(\d+)')
+_PRICE_NOISE_PATTERN = re.compile(r'[$,]')
+_PRICE_PATTERN = re.compile(r'(\d+(?:\.\d+)?)')
+_NUMBER_PATTERN = re.compile(r'(\d+)')
+
+
 class MarketOperations:
     """Dead Frontier 市場操作管理器"""
     
@@ -40,6 +47,11 @@ class MarketOperations:
         self._market_cache: List[MarketItemData] = []
         self._cache_duration = 60  # seconds
         
+        # 銷售位狀態短期緩存，上架成功後失效
+        self._selling_slots_cache: Optional[SellingSlotsStatus] = None
+        self._selling_slots_cache_timestamp: Optional[datetime] = None
+        self._selling_slots_cache_duration = 10  # seconds
+        
         # 載入交易配置
         from ..config.trading_config import TradingConfigManager
         self.config_manager = TradingConfigManager()
@@ -110,6 +122,25 @@ class MarketOperations:
             logger.error(f"❌ 確保市場會話狀態失敗: {e}")
             return False
 
+    async def ensure_marketplace_ready(self, required_tab: str = None) -> bool:
+        """確保主頁面已在市場並切換到指定標籤頁
+        
+        已在市場頁面且標籤正確時不會重新導航，可在多個測試步驟間重複調用。
+        
+        Args:
+            required_tab: 需要的標籤頁 ('buy' 或 'sell')，None表示不切換標籤
+            
+        Returns:
+            bool: 市場頁面是否就緒
+        """
+        if self.browser_manager.page is None or self.browser_manager.page.is_closed():
+            logger.error("❌ 瀏覽器頁面不可用，無法進入市場")
+            self._current_page_state['is_on_marketplace'] = False
+            self._current_page_state['current_tab'] = None
+            return False
+        
+        return await self._ensure_marketplace_session(required_tab)
+
     async def scan_market_items(self, search_term: Optional[str] = None, max_items: int = 50) -> List[MarketItemData]:
         """掃描市場物品（優化版）"""
         try:
@@ -140,6 +171,44 @@ class MarketOperations:
             logger.error(f"❌ 掃描市場物品失敗: {e}")
             return []
 
+    async def scan_many(self, search_terms: List[str], max_items: int = 50, concurrency: int = 3) -> Dict[str, List[MarketItemData]]:
+        """在多個獨立瀏覽器上下文中並行掃描多個搜索詞
+        
+        每個搜索詞在共享登錄狀態的獨立上下文中執行，不會影響主頁面。
+        
+        Args:
+            search_terms: 搜索詞列表（重複的詞只搜索一次）
+            max_items: 每個搜索詞最多返回的物品數
+            concurrency: 同時打開的上下文數量上限
+            
+        Returns:
+            Dict[str, List[MarketItemData]]: 以搜索詞為鍵的掃描結果
+        """
+        unique_terms = list(dict.fromkeys(search_terms))
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        logger.info(f"🔍 並行掃描 {len(unique_terms)} 個搜索詞 (並行上限: {concurrency})")
+        
+        async def scan_term(term: str) -> List[MarketItemData]:
+            async with semaphore:
+                async with self.browser_manager.isolated_session() as worker_browser:
+                    worker_navigator = PageNavigator(worker_browser, self.settings)
+                    await worker_navigator.initialize()
+                    worker_market = MarketOperations(self.settings, worker_browser, worker_navigator)
+                    return await worker_market.scan_market_items(search_term=term, max_items=max_items)
+        
+        results = await asyncio.gather(*(scan_term(term) for term in unique_terms), return_exceptions=True)
+        
+        scanned: Dict[str, List[MarketItemData]] = {}
+        for term, result in zip(unique_terms, results):
+            if isinstance(result, Exception):
+                logger.error(f"❌ 並行掃描 '{term}' 失敗: {result}")
+                scanned[term] = []
+            else:
+                scanned[term] = result
+        
+        logger.info(f"✅ 並行掃描完成，共找到 {sum(map(len, scanned.values()))} 個物品")
+        return scanned
+
     async def execute_purchase(self, item: MarketItemData, max_retries: int = 3) -> Dict[str, Any]:
         """執行購買操作（優化版）"""
         try:
@@ -219,6 +288,7 @@ class MarketOperations:
             
             # 執行上架操作（使用總價）
             if await self._execute_listing_process(item_element, total_price):
+                self._invalidate_selling_slots_cache()
                 logger.info(f"✅ 成功上架銷售: {item_name} (單價${unit_price:.2f}, 總價${total_price:.2f})")
                 return True
             else:
@@ -273,6 +343,7 @@ class MarketOperations:
                     
                     # 執行上架（使用總價）
                     if await self._execute_listing_process(item_info['element'], total_price):
+                        self._invalidate_selling_slots_cache()
                         logger.info(f"✅ 第 {i} 個物品上架成功: {sell_order.item.item_name} (單價${unit_price:.2f}, 總價${total_price:.2f})")
                         results.append(True)
                         successful_count += 1
@@ -335,13 +406,20 @@ class MarketOperations:
             logger.error(f"❌ 執行上架流程失敗: {e}")
             return False
 
-    async def get_selling_slots_status(self) -> Optional[SellingSlotsStatus]:
+    async def get_selling_slots_status(self, use_cache: bool = True) -> Optional[SellingSlotsStatus]:
         """獲取當前銷售位狀態。
         
+        Args:
+            use_cache: 是否使用短期緩存（上架成功後緩存會自動失效）
+        
         Returns:
             SellingSlotsStatus: 銷售位狀態信息
         """
         try:
+            if use_cache and self._is_selling_slots_cache_valid():
+                logger.debug("📋 使用緩存的銷售位狀態")
+                return self._selling_slots_cache
+            
             logger.info("📊 檢查銷售位狀態...")
             
             # 修復：使用統一的session管理確保在selling tab
@@ -359,6 +437,8 @@ class MarketOperations:
                     listed_items=slots_info['items']
                 )
                 logger.info(f"✅ 銷售位狀態: {status.current_listings}/{status.max_slots}")
+                self._selling_slots_cache = status
+                self._selling_slots_cache_timestamp = datetime.utcnow()
                 return status
             
             logger.warning("⚠️ 無法獲取銷售位狀態")
@@ -414,6 +494,31 @@ class MarketOperations:
             logger.error(f"❌ 獲取市場概要時出錯: {e}")
             return {}
     
+    async def wait_for_sell_tab_loaded(self, timeout: int = 5000) -> bool:
+        """等待銷售標籤頁激活並顯示銷售位信息
+        
+        頁面已就緒時立即返回，避免固定等待。
+        
+        Args:
+            timeout: 最長等待時間（毫秒）
+            
+        Returns:
+            bool: 銷售標籤頁是否在超時前就緒
+        """
+        try:
+            await self.page.wait_for_function(
+                """() => {
+                    const sellTab = document.getElementById('loadSelling');
+                    const slotDisplay = document.querySelector('.tradeSlotDisplay');
+                    return sellTab && sellTab.disabled && slotDisplay && slotDisplay.offsetParent !== null;
+                }""",
+                timeout=timeout
+            )
+            return True
+        except Exception as e:
+            logger.debug(f"等待銷售標籤頁載入超時: {e}")
+            return False
+    
     # Private helper methods
     
     async def _ensure_buy_tab_active(self) -> bool:
@@ -463,7 +568,7 @@ class MarketOperations:
                     logger.debug(f"普通點擊失敗，嘗試強制點擊: {click_error}")
                     await sell_tab.click(force=True)
                 
-                await asyncio.sleep(2)
+                await self.wait_for_sell_tab_loaded()
                 return True
             
             logger.warning("找不到銷售標籤頁")
@@ -1179,7 +1284,7 @@ class MarketOperations:
         """提取銷售位信息。"""
         try:
             # Wait for selling tab to load
-            await asyncio.sleep(2)
+            await self.wait_for_sell_tab_loaded()
             
             # First try to find the specific tradeSlotDisplay element
             trade_slot_display = await self.page.query_selector(".tradeSlotDisplay")
@@ -1189,7 +1294,7 @@ class MarketOperations:
             if trade_slot_display:
                 text = await trade_slot_display.inner_text()
                 # Look for pattern like "2 / 26" or "6/30"
-                match = re.search(r'(\d+)\s*/\s*(\d+)', text)
+                match = _SLOTS_PATTERN.search(text)
                 if match:
                     used_slots = int(match.group(1))
                     max_slots = int(match.group(2))
@@ -1216,7 +1321,7 @@ class MarketOperations:
                         for element in elements:
                             text = await element.inner_text()
                             # Look for pattern like "6/30" or "0/30"
-                            match = re.search(r'(\d+)\s*/\s*(\d+)', text)
+                            match = _SLOTS_PATTERN.search(text)
                             if match:
                                 used_slots = int(match.group(1))
                                 max_slots = int(match.group(2))
@@ -1337,10 +1442,10 @@ class MarketOperations:
         """從文本中提取價格數字。"""
         try:
             # Remove currency symbols and commas
-            clean_text = re.sub(r'[$,]', '', text.strip())
+            clean_text = _PRICE_NOISE_PATTERN.sub('', text.strip())
             
             # Extract numeric value
-            match = re.search(r'(\d+(?:\.\d+)?)', clean_text)
+            match = _PRICE_PATTERN.search(clean_text)
             if match:
                 return float(match.group(1))
             
@@ -1352,7 +1457,7 @@ class MarketOperations:
     def _extract_number_from_text(self, text: str) -> Optional[int]:
         """從文本中提取數字。"""
         try:
-            match = re.search(r'(\d+)', text.strip())
+            match = _NUMBER_PATTERN.search(text.strip())
             if match:
                 return int(match.group(1))
             return None
@@ -1371,54 +1476,61 @@ class MarketOperations:
         """清除緩存。"""
         self._market_cache = []
         self._cache_timestamp = None
+    
+    def _is_selling_slots_cache_valid(self) -> bool:
+        """檢查銷售位狀態緩存是否有效。"""
+        if self._selling_slots_cache is None or self._selling_slots_cache_timestamp is None:
+            return False
+        
+        time_diff = (datetime.utcnow() - self._selling_slots_cache_timestamp).total_seconds()
+        return time_diff < self._selling_slots_cache_duration
+    
+    def _invalidate_selling_slots_cache(self) -> None:
+        """清除銷售位狀態緩存。"""
+        self._selling_slots_cache = None
+        self._selling_slots_cache_timestamp = None
+
+    async def _find_visible_button(self, selector: str, text: str):
+        """在頁面內一次性查找第一個文本匹配且可見的按鈕，找不到時返回None"""
+        handle = await self.page.evaluate_handle("""([selector, text]) => {
+            for (const button of document.querySelectorAll(selector)) {
+                if ((button.innerText || '').trim().toLowerCase() !== text) {
+                    continue;
+                }
+                const rect = button.getBoundingClientRect();
+                if (rect.width > 0 && rect.height > 0 && getComputedStyle(button).visibility !== 'hidden') {
+                    return button;
+                }
+            }
+            return null;
+        }""", [selector, text])
+        return handle.as_element()
 
     async def _find_sell_button(self):
         """尋找Sell按鈕"""
         try:
             logger.debug("🔍 尋找Sell按鈕...")
             
+            # 每個方法只需一次頁面調用，不再逐個按鈕讀取文本和可見性
             # 方法1: 直接查找width: 100%的按鈕
-            width_100_buttons = await self.page.query_selector_all("button[style*='width: 100%']")
-            for button in width_100_buttons:
-                try:
-                    text = await button.inner_text()
-                    if text and text.strip().lower() == 'sell':
-                        is_visible = await button.is_visible()
-                        if is_visible:
-                            logger.debug("✅ 找到Sell按鈕（width: 100%）")
-                            return button
-                except:
-                    continue
+            button = await self._find_visible_button("button[style*='width: 100%']", "sell")
+            if button:
+                logger.debug("✅ 找到Sell按鈕（width: 100%）")
+                return button
             
             # 方法2: 查找絕對定位菜單中的按鈕
-            context_menus = await self.page.query_selector_all("div[style*='position: absolute'][style*='background-color: black']")
-            for menu in context_menus:
-                try:
-                    is_visible = await menu.is_visible()
-                    if not is_visible:
-                        continue
-                        
-                    menu_buttons = await menu.query_selector_all("button")
-                    for button in menu_buttons:
-                        text = await button.inner_text()
-                        if text and text.strip().lower() == 'sell':
-                            logger.debug("✅ 在右鍵菜單中找到Sell按鈕")
-                            return button
-                except:
-                    continue
+            button = await self._find_visible_button(
+                "div[style*='position: absolute'][style*='background-color: black'] button", "sell"
+            )
+            if button:
+                logger.debug("✅ 在右鍵菜單中找到Sell按鈕")
+                return button
             
             # 方法3: 備用方案 - 查找所有可見的Sell按鈕
-            all_buttons = await self.page.query_selector_all("button")
-            for button in all_buttons:
-                try:
-                    text = await button.inner_text()
-                    if text and text.strip().lower() == 'sell':
-                        is_visible = await button.is_visible()
-                        if is_visible:
-                            logger.debug("✅ 找到Sell按鈕（備用方案）")
-                            return button
-                except:
-                    continue
+            button = await self._find_visible_button("button", "sell")
+            if button:
+                logger.debug("✅ 找到Sell按鈕（備用方案）")
+                return button
             
             return None
             
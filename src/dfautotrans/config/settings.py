@@ -13,6 +13,9 @@ load_dotenv()
 class DatabaseConfig(BaseModel):
     """Database configuration."""
     url: str = Field(default="sqlite:///dfautotrans.db")
+    pool_size: int = Field(default=5, description="連接池保持的連接數")
+    max_overflow: int = Field(default=15, description="連接池滿時可額外建立的連接數")
+    pool_recycle: int = Field(default=300, description="連接閒置多少秒後重建")
 
 
 class LoggingConfig(BaseModel):
@@ -28,6 +31,7 @@ class BrowserConfig(BaseModel):
     timeout: int = Field(default=30000)
     viewport_width: int = Field(default=1920)
     viewport_height: int = Field(default=1080)
+    block_isolated_assets: bool = Field(default=True, description="Skip images and fonts in isolated read-only contexts")
 
 
 class TradingConfig(BaseModel):
@@ -71,6 +75,7 @@ class AntiDetectionConfig(BaseModel):
     action_delay_min: int = Field(default=300)
     action_delay_max: int = Field(default=800)
     random_pause_probability: float = Field(default=0.1)
+    fast_mode: bool = Field(default=False, description="Fill inputs in one call instead of typing like a human")
 
 
 class Settings(BaseModel):
@@ -95,11 +100,19 @@ class Settings(BaseModel):
     username: str = Field(default="to6606687")
     password: str = Field(default="To38044567")
     
+    # Session checks
+    login_status_ttl_seconds: float = Field(default=5.0, description="How long a login status probe result is reused")
+    session_timeout_hours: int = Field(default=24, description="How long a saved browser session is trusted")
+    session_profile: str = Field(default="", description="Subdirectory for saved sessions, keeps accounts apart")
+    
     def __init__(self, **kwargs):
         # Override with environment variables
         env_overrides = {
             "database": DatabaseConfig(
-                url=os.getenv("DATABASE_URL", "sqlite:///dfautotrans.db")
+                url=os.getenv("DATABASE_URL", "sqlite:///dfautotrans.db"),
+                pool_size=int(os.getenv("DB_POOL_SIZE", "5")),
+                max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "15")),
+                pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "300"))
             ),
             "logging": LoggingConfig(
                 level=os.getenv("LOG_LEVEL", "INFO"),
@@ -108,7 +121,8 @@ class Settings(BaseModel):
             "browser": BrowserConfig(
                 headless=os.getenv("HEADLESS", "false").lower() == "true",
                 slow_mo=int(os.getenv("SLOW_MO", "100")),
-                timeout=int(os.getenv("TIMEOUT", "30000"))
+                timeout=int(os.getenv("TIMEOUT", "30000")),
+                block_isolated_assets=os.getenv("BLOCK_ISOLATED_ASSETS", "true").lower() == "true"
             ),
             "trading": TradingConfig(
                 target_items=os.getenv("TARGET_ITEMS", "12.7mm Rifle Bullets").split(",") if os.getenv("TARGET_ITEMS") else ["12.7mm Rifle Bullets"],
@@ -130,11 +144,14 @@ class Settings(BaseModel):
                 typing_delay_max=int(os.getenv("TYPING_DELAY_MAX", "150")),
                 action_delay_min=int(os.getenv("ACTION_DELAY_MIN", "300")),
                 action_delay_max=int(os.getenv("ACTION_DELAY_MAX", "800")),
-                random_pause_probability=float(os.getenv("RANDOM_PAUSE_PROBABILITY", "0.1"))
+                random_pause_probability=float(os.getenv("RANDOM_PAUSE_PROBABILITY", "0.1")),
+                fast_mode=os.getenv("FAST_INPUT", "false").lower() == "true"
             ),
             # Login credentials from environment or defaults
             "username": os.getenv("DF_USERNAME", "to6606687"),
-            "password": os.getenv("DF_PASSWORD", "To38044567")
+            "password": os.getenv("DF_PASSWORD", "To38044567"),
+            "login_status_ttl_seconds": float(os.getenv("LOGIN_STATUS_TTL_SECONDS", "5")),
+            "session_timeout_hours": int(os.getenv("SESSION_TIMEOUT_HOURS", "24"))
         }
         
         super().__init__(**{**env_overrides, **kwargs})
@@ -144,6 +161,19 @@ class Settings(BaseModel):
         """Get project root directory."""
         return Path(__file__).parent.parent.parent.parent
     
+    @property
+    def cookies_dir(self) -> Path:
+        """Get directory for saved browser sessions."""
+        cookies_dir = self.project_root / "cache" / "cookies"
+        if self.session_profile:
+            cookies_dir = cookies_dir / self.session_profile
+        return cookies_dir
+    
+    @property
+    def storage_state_path(self) -> Path:
+        """Get path of the saved Playwright storage state (cookies + localStorage)."""
+        return self.cookies_dir / "storage_state.json"
+    
     @property
     def data_dir(self) -> Path:
         """Get data directory."""
@@ -3,15 +3,39 @@
 處理所有交易相關的配置參數
 """
 
-import json
 from dataclasses import dataclass, asdict
+from functools import cached_property
 from typing import List, Dict, Any, Tuple, Optional
 from pathlib import Path
 import logging
 
+try:
+    import orjson  # 可選依賴，直接處理 bytes，比標準庫 json 更快
+except ImportError:
+    orjson = None
+    import json
+
 logger = logging.getLogger(__name__)
 
-@dataclass
+
+def _read_json(path: Path) -> Dict[str, Any]:
+    """讀取 JSON 文件"""
+    if orjson is not None:
+        return orjson.loads(path.read_bytes())
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _write_json(path: Path, data: Dict[str, Any]) -> None:
+    """寫入 JSON 文件（縮進 2 格，保留非 ASCII 字符）"""
+    if orjson is not None:
+        path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+        return
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+@dataclass(slots=True)
 class MarketSearchConfig:
     """市場搜索配置"""
     target_items: List[str]  # 目標物品清單，精確匹配
@@ -24,7 +48,7 @@ class MarketSearchConfig:
         """返回目標物品清單作為搜索詞 - 向後兼容"""
         return self.target_items
 
-@dataclass
+@dataclass(slots=True)
 class BuyingConfig:
     """購買策略配置"""
     min_profit_margin: float = 0.15  # 最小利潤率
@@ -63,7 +87,7 @@ class BuyingConfig:
         """同類物品最大購買數量 - 向後兼容"""
         return 5
 
-@dataclass
+@dataclass(slots=True)
 class SellingConfig:
     """銷售策略配置"""
     markup_percentage: float = 0.2  # 標準加價比例
@@ -80,7 +104,7 @@ class SellingConfig:
     peak_hours_end: int = 23   # 美國東部時間晚上11點
     peak_hours_selling_multiplier: float = 1.3  # 高峰時段銷售價格提升30%
 
-@dataclass
+@dataclass(slots=True)
 class RiskManagementConfig:
     """風險管理配置"""
     max_consecutive_failures: int = 3
@@ -115,7 +139,7 @@ class RiskManagementConfig:
         """最大登錄重試次數 - 向後兼容"""
         return 5
 
-@dataclass
+@dataclass(slots=True)
 class PerformanceConfig:
     """性能優化配置"""
     market_cache_duration_minutes: int = 1
@@ -125,7 +149,7 @@ class PerformanceConfig:
     retry_delay_seconds: int = 5
     exponential_backoff: bool = True
 
-@dataclass
+@dataclass(slots=True)
 class TradingConfig:
     """完整交易配置"""
     market_search: MarketSearchConfig
@@ -153,6 +177,7 @@ class TradingConfigManager:
         
     def load_config(self) -> TradingConfig:
         """載入配置"""
+        self._invalidate_lookups()
         try:
             if not self.config_file.exists():
                 logger.warning(f"配置文件 {self.config_file} 不存在，使用默認配置")
@@ -160,8 +185,7 @@ class TradingConfigManager:
                 self.save_config()
                 return self.config
                 
-            with open(self.config_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = _read_json(self.config_file)
                 
             # 轉換為配置對象
             self.config = self._dict_to_config(data)
@@ -187,8 +211,7 @@ class TradingConfigManager:
                 
             data = self._config_to_dict(self.config)
             
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            _write_json(self.config_file, data)
                 
             logger.info(f"配置已保存到 {self.config_file}")
             return True
@@ -202,7 +225,8 @@ class TradingConfigManager:
         try:
             if not self.config:
                 self.load_config()
-                
+            
+            self._invalidate_lookups()
             for key, value in updates.items():
                 self._set_nested_value(self.config, key, value)
                 
@@ -253,11 +277,7 @@ class TradingConfigManager:
         if not self.config:
             return None
             
-        try:
-            index = self.config.market_search.target_items.index(item_name)
-            return self.config.market_search.max_price_per_unit[index]
-        except (ValueError, IndexError):
-            return None
+        return self._price_by_item.get(item_name)
     
     def get_item_priority(self, item_name: str) -> int:
         """獲取物品優先級"""
@@ -271,7 +291,7 @@ class TradingConfigManager:
         if not self.config:
             return False
             
-        return item_name in self.config.market_search.target_items
+        return item_name in self._price_by_item
     
     def get_item_id_by_name(self, item_name: str) -> Optional[str]:
         """根據物品名稱獲取data-type ID"""
@@ -279,8 +299,7 @@ class TradingConfigManager:
             return None
             
         try:
-            with open(self.config_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = _read_json(self.config_file)
             return data.get("item_mapping", {}).get("name_to_id", {}).get(item_name)
         except:
             return None
@@ -291,8 +310,7 @@ class TradingConfigManager:
             return None
             
         try:
-            with open(self.config_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = _read_json(self.config_file)
             return data.get("item_mapping", {}).get("id_to_name", {}).get(item_id)
         except:
             return None
@@ -303,12 +321,21 @@ class TradingConfigManager:
             return {}
             
         try:
-            with open(self.config_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = _read_json(self.config_file)
             return data.get("item_mapping", {}).get("name_to_id", {})
         except:
             return {}
     
+    @cached_property
+    def _price_by_item(self) -> Dict[str, float]:
+        """物品名稱 -> 最大價格的查找表，首次使用時構建，配置變更時失效"""
+        market_config = self.config.market_search
+        return dict(zip(market_config.target_items, market_config.max_price_per_unit))
+    
+    def _invalidate_lookups(self) -> None:
+        """清除基於配置構建的查找表"""
+        self.__dict__.pop('_price_by_item', None)
+    
     def _create_default_config(self) -> TradingConfig:
         """創建默認配置"""
         return TradingConfig(
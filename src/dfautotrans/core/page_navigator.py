@@ -1,6 +1,7 @@
 """Page navigation controller for Dead Frontier Auto Trading System."""
 
 import re
+import time
 from typing import Optional, Dict, Any
 from playwright.async_api import Page, Browser
 from loguru import logger
@@ -9,6 +10,19 @@ from ..config.settings import Settings
 from ..automation.browser_manager import BrowserManager
 
 
+# 現金解析用的正則在模組加載時編譯一次
+_SCRIPT_CASH_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'cash["\']?\s*[:=]\s*(\d+)',
+    r'money["\']?\s*[:=]\s*(\d+)',
+    r'funds["\']?\s*[:=]\s*(\d+)',
+    r'\$(\d+)',
+    r'Cash:\s*\$?(\d+)',
+))
+_TEXT_CASH_PATTERN = re.compile(r'Cash:\s*\$?(\d+)|Money:\s*\$?(\d+)|\$(\d+)', re.IGNORECASE)
+_NUMBER_NOISE_PATTERN = re.compile(r'[$,\s]')
+_NUMBER_PATTERN = re.compile(r'(\d+)')
+
+
 class NavigationError(Exception):
     """Navigation-related error."""
     pass
@@ -24,6 +38,7 @@ class PageNavigator:
         self._current_url = ""
         self._cash_cache: Optional[int] = None
         self._login_status_cache: Optional[bool] = None
+        self._login_status_checked_at: Optional[float] = None
         
     async def initialize(self) -> bool:
         """Initialize page navigator."""
@@ -38,8 +53,16 @@ class PageNavigator:
             logger.error(f"Failed to initialize page navigator: {e}")
             return False
     
-    async def navigate_to_url(self, url: str, expected_indicators: Optional[list] = None) -> bool:
-        """Navigate to a specific URL with validation."""
+    async def navigate_to_url(self, url: str, expected_indicators: Optional[list] = None,
+                              wait_until: str = "networkidle") -> bool:
+        """Navigate to a specific URL with validation.
+        
+        Args:
+            url: URL to open
+            expected_indicators: Selectors that should appear once the page is ready
+            wait_until: Load state to wait for after the DOM is parsed; "domcontentloaded"
+                returns as soon as the document is ready and relies on expected_indicators
+        """
         if self.page is None:
             raise NavigationError("Page not initialized")
         
@@ -54,7 +77,8 @@ class PageNavigator:
                 return False
             
             # Wait for page to be ready
-            await self.page.wait_for_load_state("networkidle", timeout=10000)
+            if wait_until != "domcontentloaded":
+                await self.page.wait_for_load_state(wait_until, timeout=10000)
             
             # Update current URL
             self._current_url = self.page.url
@@ -123,11 +147,23 @@ class PageNavigator:
         if self.page is None:
             return False
         
-        # Use cache if available and not forcing refresh
-        if not force_refresh and self._login_status_cache is not None:
+        # Use cache if available, still fresh and not forcing refresh
+        if not force_refresh and self._is_login_status_cache_fresh():
             logger.debug(f"Using cached login status: {self._login_status_cache}")
             return self._login_status_cache
         
+        is_logged_in = await self._probe_login_status()
+        self._login_status_checked_at = time.monotonic()
+        return is_logged_in
+    
+    def _is_login_status_cache_fresh(self) -> bool:
+        """Check whether the cached login status is within its TTL."""
+        if self._login_status_cache is None or self._login_status_checked_at is None:
+            return False
+        return time.monotonic() - self._login_status_checked_at < self.settings.login_status_ttl_seconds
+    
+    async def _probe_login_status(self) -> bool:
+        """Inspect the current page for login indicators and cache the result."""
         try:
             # Check current URL
             current_url = self.page.url
@@ -294,16 +330,8 @@ class PageNavigator:
                 content = await script.inner_text()
                 
                 # Look for cash patterns in JavaScript
-                cash_patterns = [
-                    r'cash["\']?\s*[:=]\s*(\d+)',
-                    r'money["\']?\s*[:=]\s*(\d+)',
-                    r'funds["\']?\s*[:=]\s*(\d+)',
-                    r'\$(\d+)',
-                    r'Cash:\s*\$?(\d+)'
-                ]
-                
-                for pattern in cash_patterns:
-                    match = re.search(pattern, content, re.IGNORECASE)
+                for pattern in _SCRIPT_CASH_PATTERNS:
+                    match = pattern.search(content)
                     if match:
                         cash = int(match.group(1))
                         self._cash_cache = cash
@@ -312,7 +340,7 @@ class PageNavigator:
             
             # Try to find cash in page text
             page_text = await self.page.inner_text("body")
-            cash_match = re.search(r'Cash:\s*\$?(\d+)|Money:\s*\$?(\d+)|\$(\d+)', page_text, re.IGNORECASE)
+            cash_match = _TEXT_CASH_PATTERN.search(page_text)
             if cash_match:
                 cash = int(next(group for group in cash_match.groups() if group is not None))
                 self._cash_cache = cash
@@ -336,10 +364,10 @@ class PageNavigator:
             return None
         
         # Remove common currency symbols and formatting
-        cleaned = re.sub(r'[$,\s]', '', text)
+        cleaned = _NUMBER_NOISE_PATTERN.sub('', text)
         
         # Extract number
-        match = re.search(r'(\d+)', cleaned)
+        match = _NUMBER_PATTERN.search(cleaned)
         if match:
             return int(match.group(1))
         
@@ -382,6 +410,7 @@ class PageNavigator:
         """Clear cached values."""
         self._cash_cache = None
         self._login_status_cache = None
+        self._login_status_checked_at = None
         logger.debug("Page navigator cache cleared")
     
     async def is_page_responsive(self) -> bool:
@@ -5,11 +5,13 @@ from typing import Optional, List, Dict, Any, Type, TypeVar
 from contextlib import asynccontextmanager
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.pool import QueuePool
 from loguru import logger
 
-from .models import Base, TradingSession, Trade as TradeRecord, MarketPrice, SystemState, ResourceSnapshot
+from .models import Base, TradingSession, Trade as TradeRecord, MarketPrice, MarketItemData, SystemState, ResourceSnapshot
 from ..config.settings import Settings
 
 T = TypeVar('T', bound=Base)
@@ -40,7 +42,8 @@ class DatabaseManager:
                 self.database_url,
                 echo=False,  # Set to True for SQL debugging
                 pool_pre_ping=True,
-                connect_args={"check_same_thread": False} if "sqlite" in self.database_url else {}
+                connect_args={"check_same_thread": False} if "sqlite" in self.database_url else {},
+                **self._pool_options()
             )
             
             # Create session factory
@@ -64,6 +67,24 @@ class DatabaseManager:
             logger.error(f"Failed to initialize database: {e}")
             return False
     
+    def _pool_options(self) -> Dict[str, Any]:
+        """Connection pool sizing for the async engine.
+        
+        Pool sizing only applies when the dialect's default pool is a
+        QueuePool; in-memory SQLite (including an empty database path)
+        uses a single static connection instead.
+        """
+        url = make_url(self.database_url)
+        if not issubclass(url.get_dialect().get_pool_class(url), QueuePool):
+            return {}
+        
+        db_config = self.settings.database
+        return {
+            "pool_size": db_config.pool_size,
+            "max_overflow": db_config.max_overflow,
+            "pool_recycle": db_config.pool_recycle,
+        }
+    
     async def create_tables(self) -> None:
         """Create all database tables."""
         try:
@@ -177,6 +198,29 @@ class DatabaseManager:
             logger.error(f"Failed to record market price: {e}")
             return False
     
+    async def record_market_prices(self, items: List[MarketItemData]) -> bool:
+        """Record prices for a batch of scanned market items in one statement."""
+        if not items:
+            return True
+        
+        try:
+            rows = [
+                {
+                    "item_name": item.item_name,
+                    "price": item.price,
+                    "quantity": item.quantity,
+                    "seller": item.seller,
+                }
+                for item in items
+            ]
+            async with self.get_session() as session:
+                await session.execute(insert(MarketPrice), rows)
+                logger.debug(f"Recorded {len(rows)} market prices")
+                return True
+        except Exception as e:
+            logger.error(f"Failed to record market prices: {e}")
+            return False
+    
     async def save_system_state(self, state_data: Dict[str, Any]) -> bool:
         """Save system state to database."""
         try:
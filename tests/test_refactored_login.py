@@ -179,7 +179,7 @@ class TestRefactoredLogin:
         
         # Mock anti-detection
         browser_manager.anti_detection = Mock()
-        browser_manager.anti_detection.safe_navigate = AsyncMock()
+        browser_manager.anti_detection.safe_navigate = AsyncMock(return_value=True)
         
         # Mock login handler
         mock_login_handler = Mock()
@@ -193,6 +193,20 @@ class TestRefactoredLogin:
         assert browser_manager.is_logged_in is True
         browser_manager.anti_detection.safe_navigate.assert_called_once()
     
+    @pytest.mark.asyncio
+    async def test_wait_for_search_input_timeout(self, settings):
+        """A search input that never appears reports False instead of raising."""
+        from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+        
+        browser_manager = BrowserManager(settings)
+        browser_manager.page = Mock()
+        browser_manager.page.locator().first.wait_for = AsyncMock(side_effect=PlaywrightTimeoutError("timeout"))
+        
+        assert await browser_manager._wait_for_search_input() is False
+        
+        browser_manager.page.locator().first.wait_for = AsyncMock()
+        assert await browser_manager._wait_for_search_input() is True
+    
     def test_refactoring_summary(self):
         """Document the refactoring changes."""
         print("\n=== 登錄邏輯重構總結 ===")
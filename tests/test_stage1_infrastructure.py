@@ -4,13 +4,18 @@ import pytest
 import asyncio
 from datetime import datetime, timedelta
 from unittest.mock import Mock, AsyncMock, patch
+from sqlalchemy import text as sql_text
 
 from src.dfautotrans.config.settings import Settings
 from src.dfautotrans.core.state_machine import StateMachine, StateTransitionError
 from src.dfautotrans.core.page_navigator import PageNavigator, NavigationError
-from src.dfautotrans.data.models import TradingState, InventoryStatus, PlayerResources, SellingSlotsStatus, StorageStatus
+from src.dfautotrans.data.models import TradingState, InventoryStatus, PlayerResources, SellingSlotsStatus, StorageStatus, MarketItemData
 from src.dfautotrans.data.database import DatabaseManager
 from src.dfautotrans.automation.browser_manager import BrowserManager
+from src.dfautotrans.automation.anti_detection import HumanBehaviorSimulator
+from src.dfautotrans.automation.bank_operations import BankOperations
+from src.dfautotrans.automation.inventory_manager import InventoryManager
+from src.dfautotrans.utils.event_loop import run_async
 
 
 class TestStateMachine:
@@ -167,6 +172,27 @@ class TestPageNavigator:
         assert result is True
         mock_page.goto.assert_called_once()
     
+    @pytest.mark.asyncio
+    async def test_navigate_to_url_domcontentloaded_skips_networkidle(self, page_navigator):
+        """Test navigation can return once the DOM is ready."""
+        mock_page = Mock()
+        mock_response = Mock()
+        mock_response.ok = True
+        mock_page.goto = AsyncMock(return_value=mock_response)
+        mock_page.wait_for_load_state = AsyncMock()
+        mock_page.wait_for_selector = AsyncMock()
+        mock_page.url = "https://example.com"
+        
+        page_navigator.page = mock_page
+        
+        result = await page_navigator.navigate_to_url(
+            "https://example.com", expected_indicators=["#ready"], wait_until="domcontentloaded"
+        )
+        
+        assert result is True
+        mock_page.wait_for_load_state.assert_not_called()
+        mock_page.wait_for_selector.assert_awaited_once_with("#ready", timeout=5000)
+    
     @pytest.mark.asyncio
     async def test_navigate_to_url_failure(self, page_navigator):
         """Test URL navigation failure."""
@@ -199,6 +225,25 @@ class TestPageNavigator:
         # Should return True for fairview domain
         assert result is True
     
+    @pytest.mark.asyncio
+    async def test_check_login_status_cache_ttl(self, page_navigator):
+        """Test login status is reused within the TTL and re-probed after it."""
+        mock_page = Mock()
+        mock_page.url = "https://fairview.deadfrontier.com/onlinezombiemmo/index.php"
+        mock_page.query_selector = AsyncMock(return_value=None)
+        mock_page.query_selector_all = AsyncMock(return_value=[])
+        page_navigator.page = mock_page
+        
+        first = await page_navigator.check_login_status()
+        probes = mock_page.query_selector.await_count
+        
+        assert await page_navigator.check_login_status() is first
+        assert mock_page.query_selector.await_count == probes
+        
+        page_navigator._login_status_checked_at -= page_navigator.settings.login_status_ttl_seconds
+        assert await page_navigator.check_login_status() is first
+        assert mock_page.query_selector.await_count > probes
+    
     def test_extract_number_from_text(self, page_navigator):
         """Test number extraction from text."""
         test_cases = [
@@ -243,6 +288,17 @@ class TestDatabaseManager:
         
         await db_manager.close()
     
+    @pytest.mark.asyncio
+    async def test_initialization_empty_sqlite_path(self, settings):
+        """An empty SQLite path is in-memory too and must not get pool sizing."""
+        settings.database.url = "sqlite://"
+        db_manager = DatabaseManager(settings)
+        
+        assert db_manager._pool_options() == {}
+        assert await db_manager.initialize() is True
+        
+        await db_manager.close()
+    
     @pytest.mark.asyncio
     async def test_create_trading_session(self, db_manager):
         """Test creating a trading session."""
@@ -299,6 +355,21 @@ class TestDatabaseManager:
         assert stats["total_trades"] == 3
         assert stats["total_profit"] == 30.0
         assert stats["average_profit"] == 10.0
+    
+    @pytest.mark.asyncio
+    async def test_record_market_prices(self, db_manager):
+        """Test recording a batch of scanned market prices."""
+        items = [
+            MarketItemData(item_name="12.7mm Rifle Bullets", seller=f"Seller {i}", price=10.0 + i, quantity=100)
+            for i in range(3)
+        ]
+        
+        result = await db_manager.record_market_prices(items)
+        assert result is True
+        
+        async with db_manager.get_session() as session:
+            count = await session.execute(sql_text("SELECT COUNT(*) FROM market_prices"))
+            assert count.scalar() == 3
 
 
 class TestBrowserManagerEnhancements:
@@ -357,8 +428,236 @@ class TestBrowserManagerEnhancements:
         assert "error_count" in metrics
         assert "network_errors" in metrics
         assert "is_logged_in" in metrics
+    
+    @pytest.mark.asyncio
+    async def test_isolated_session_shares_login(self, browser_manager):
+        """Test isolated session reuses the browser and login state."""
+        child_page = AsyncMock()
+        child_page.set_default_timeout = Mock()
+        child_context = Mock()
+        child_context.new_page = AsyncMock(return_value=child_page)
+        child_context.close = AsyncMock()
+        child_context.route = AsyncMock()
+        child_context.add_init_script = AsyncMock()
+        child_context.set_extra_http_headers = AsyncMock()
+        
+        browser_manager.browser = Mock()
+        browser_manager.browser.new_context = AsyncMock(return_value=child_context)
+        browser_manager.context = Mock()
+        browser_manager.context.storage_state = AsyncMock(return_value={"cookies": [{"name": "sid"}]})
+        browser_manager.is_logged_in = True
+        
+        async with browser_manager.isolated_session() as child:
+            assert child is not browser_manager
+            assert child.browser is browser_manager.browser
+            assert child.page is child_page
+            assert child.is_logged_in is True
+        
+        new_context_kwargs = browser_manager.browser.new_context.call_args.kwargs
+        assert new_context_kwargs["storage_state"] == {"cookies": [{"name": "sid"}]}
+        child_context.close.assert_awaited_once()
+        child_context.route.assert_awaited_once()
+        child_context.add_init_script.assert_awaited_once()
+    
+    @pytest.mark.asyncio
+    async def test_isolated_sessions_reuse_captured_state(self, browser_manager):
+        """Test session state is serialized once and reused by isolated sessions."""
+        child_page = AsyncMock()
+        child_page.set_default_timeout = Mock()
+        child_context = Mock()
+        child_context.new_page = AsyncMock(return_value=child_page)
+        child_context.close = AsyncMock()
+        child_context.route = AsyncMock()
+        child_context.add_init_script = AsyncMock()
+        child_context.set_extra_http_headers = AsyncMock()
+        
+        browser_manager.browser = Mock()
+        browser_manager.browser.new_context = AsyncMock(return_value=child_context)
+        browser_manager.context = Mock()
+        browser_manager.context.storage_state = AsyncMock(return_value={"cookies": []})
+        
+        await browser_manager.capture_session_state()
+        for _ in range(2):
+            async with browser_manager.isolated_session():
+                pass
+        
+        browser_manager.context.storage_state.assert_awaited_once()
+        assert browser_manager.browser.new_context.await_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_get_or_create_context_reuses_named_context(self, browser_manager):
+        """Test named contexts are created once and closed on cleanup."""
+        named_context = Mock()
+        named_context.close = AsyncMock()
+        named_context.add_init_script = AsyncMock()
+        named_context.set_extra_http_headers = AsyncMock()
+        
+        browser_manager.browser = Mock()
+        browser_manager.browser.new_context = AsyncMock(return_value=named_context)
+        browser_manager.browser.close = AsyncMock()
+        browser_manager.context = Mock()
+        browser_manager.context.storage_state = AsyncMock(return_value={"cookies": []})
+        browser_manager.context.close = AsyncMock()
+        
+        first = await browser_manager.get_or_create_context("scan")
+        second = await browser_manager.get_or_create_context("scan")
+        
+        assert first is second is named_context
+        browser_manager.browser.new_context.assert_awaited_once()
+        
+        await browser_manager.cleanup()
+        named_context.close.assert_awaited_once()
+
+
+class TestHumanBehaviorSimulator:
+    """Test human behavior simulation helpers."""
+    
+    @pytest.fixture
+    def simulator(self):
+        return HumanBehaviorSimulator(Settings().anti_detection)
+    
+    @pytest.mark.asyncio
+    async def test_human_like_typing_sends_text_in_runs(self, simulator):
+        """Test typing sends whole runs between pauses and covers the full text."""
+        element = Mock()
+        element.press_sequentially = AsyncMock()
+        
+        with patch("asyncio.sleep", new=AsyncMock()):
+            await simulator.human_like_typing(element, "correct horse battery", clear_first=False)
+        
+        calls = element.press_sequentially.await_args_list
+        assert "".join(call.args[0] for call in calls) == "correct horse battery"
+        assert len(calls) < len("correct horse battery")
+        for call in calls:
+            assert simulator.config.typing_delay_min <= call.kwargs["delay"] <= simulator.config.typing_delay_max
+    
+    @pytest.mark.asyncio
+    async def test_human_like_typing_fast_mode_fills(self, simulator):
+        """Test fast mode fills the field in one call."""
+        simulator.config.fast_mode = True
+        element = Mock()
+        element.fill = AsyncMock()
+        element.press_sequentially = AsyncMock()
+        
+        await simulator.human_like_typing(element, "correct horse battery")
+        
+        element.fill.assert_awaited_once_with("correct horse battery")
+        element.press_sequentially.assert_not_awaited()
+    
+    @pytest.mark.asyncio
+    async def test_bounding_box_cache(self, simulator):
+        """Test bounding boxes are reused within the TTL and dropped on invalidation."""
+        element = Mock()
+        element.bounding_box = AsyncMock(return_value={"x": 10, "y": 20, "width": 100, "height": 30})
+        
+        first = await simulator._cached_bbox(element, "page:#button")
+        second = await simulator._cached_bbox(element, "page:#button")
+        assert first == second
+        assert element.bounding_box.await_count == 1
+        
+        simulator.invalidate_bbox_cache()
+        await simulator._cached_bbox(element, "page:#button")
+        assert element.bounding_box.await_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_mouse_move_near_last_position_is_direct(self, simulator):
+        """Test a target next to the last mouse position gets one direct move."""
+        page = Mock()
+        page.mouse.move = AsyncMock()
+        
+        with patch("asyncio.sleep", new=AsyncMock()):
+            await simulator._move_mouse_curved(page, 500, 400)
+            curved_moves = page.mouse.move.await_count
+            await simulator._move_mouse_curved(page, 510, 405)
+        
+        assert curved_moves >= 4
+        assert page.mouse.move.await_count == curved_moves + 1
+        page.mouse.move.assert_awaited_with(510, 405)
+        
+        simulator.reset_mouse_position()
+        assert simulator._last_mouse is None
 
 
+class TestBankOperations:
+    """Test bank balance reading and caching."""
+    
+    @pytest.fixture
+    def bank_operations(self):
+        browser_manager = Mock()
+        browser_manager.page = Mock()
+        browser_manager.page.url = "https://fairview.deadfrontier.com/onlinezombiemmo/index.php?page=15"
+        browser_manager.page.inner_text = AsyncMock(return_value="Cash: $1,500 Bank: $20,000")
+        return BankOperations(browser_manager)
+    
+    @pytest.mark.asyncio
+    async def test_balances_share_one_page_read(self, bank_operations):
+        """Test cash and bank balance are cached from the same body text read."""
+        assert await bank_operations.get_cash_on_hand() == 1500
+        assert await bank_operations.get_bank_balance() == 20000
+        bank_operations.page.inner_text.assert_awaited_once()
+    
+    @pytest.mark.asyncio
+    async def test_refresh_cache_from_updated_text(self, bank_operations):
+        """Test balances after a bank action come from the updated page text."""
+        assert await bank_operations.get_bank_balance() == 20000
+        
+        bank_operations._refresh_cache_from_text("Cash: $2,500 Bank: $19,000")
+        assert await bank_operations.get_bank_balance() == 19000
+        assert await bank_operations.get_cash_on_hand() == 2500
+        bank_operations.page.inner_text.assert_awaited_once()
+        
+        bank_operations._refresh_cache_from_text(None)
+        assert await bank_operations.get_bank_balance() == 20000
+        assert bank_operations.page.inner_text.await_count == 2
+
+
+
+class TestInventoryManager:
+    """Test storage page reuse in the inventory manager."""
+    
+    @pytest.fixture
+    def inventory_manager(self):
+        browser_manager = Mock()
+        browser_manager.page = Mock()
+        browser_manager.page.url = "https://fairview.deadfrontier.com/onlinezombiemmo/index.php?page=50"
+        page_navigator = Mock()
+        page_navigator.navigate_to_storage = AsyncMock(return_value=True)
+        return InventoryManager(Settings(), browser_manager, page_navigator)
+    
+    @pytest.mark.asyncio
+    async def test_storage_session_reloads_after_withdraw(self, inventory_manager):
+        """Test the check after a withdraw click reloads the storage page."""
+        button = Mock()
+        button.is_disabled = AsyncMock(return_value=False)
+        button.click = AsyncMock()
+        inventory_manager.page.query_selector = AsyncMock(return_value=button)
+        inventory_manager._extract_storage_info = AsyncMock(side_effect=[
+            {'current': 2, 'max': 40, 'items': []},
+            {'current': 0, 'max': 40, 'items': []},
+        ])
+        
+        with patch("src.dfautotrans.automation.inventory_manager.asyncio.sleep", new=AsyncMock()):
+            async with inventory_manager.storage_session():
+                assert await inventory_manager.withdraw_all_from_storage() is True
+        
+        # Once on entry, once more for the check after the click
+        assert inventory_manager.page_navigator.navigate_to_storage.await_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_combined_status_skips_malformed_item(self, inventory_manager):
+        """Test one unparsable item is skipped without losing either container."""
+        item = {'type': '127rifleammo', 'quantity': '100', 'quality': None, 'category': 'ammo'}
+        inventory_manager.page.evaluate = AsyncMock(return_value={
+            'inventory': {'total': 26, 'items': [{**item, 'slot': 1}, {**item, 'slot': 2, 'quantity': 'bad'}]},
+            'storage': {'total': 40, 'items': [{**item, 'slot': 5}]},
+        })
+        
+        status = await inventory_manager.get_combined_status()
+        
+        assert status['inventory']['used'] == 2
+        assert [i.slot for i in status['inventory']['items']] == [1]
+        assert [i.slot for i in status['storage']['items']] == [5]
+
 class TestDataModels:
     """Test data model functionality."""
     
@@ -473,6 +772,15 @@ async def test_integration_state_machine_with_database():
     await db_manager.close()
 
 
+def test_run_async_returns_coroutine_result():
+    """Test run_async runs a coroutine on a fresh loop and returns its result."""
+    async def answer():
+        await asyncio.sleep(0)
+        return 42
+    
+    assert run_async(answer()) == 42
+
+
 if __name__ == "__main__":
     # Run specific test for debugging
     pytest.main([__file__, "-v"]) 
\ No newline at end of file